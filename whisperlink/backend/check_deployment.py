@@ -78,7 +78,8 @@ def check_static_files():
             return False
         
         # Check if WhiteNoise is in middleware
-        if 'whitenoise.middleware.WhiteNoiseMiddleware' not in settings.MIDDLEWARE:
+        whitenoise_middleware = {'whitenoise.middleware.WhiteNoiseMiddleware', 'feedback.middleware.StaticFilesMiddleware'}
+        if not whitenoise_middleware.intersection(settings.MIDDLEWARE):
             print("❌ WhiteNoise middleware is not configured")
             return False
         
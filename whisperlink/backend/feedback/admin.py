@@ -13,7 +13,3 @@ class AnonymousFeedbackAdmin(admin.ModelAdmin):
     list_display = ['recipient', 'submitted_at', 'ip_address']
     list_filter = ['submitted_at']
     readonly_fields = ['submitted_at', 'ip_address']
-    
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.select_related('recipient__user')
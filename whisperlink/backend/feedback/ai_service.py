@@ -1,21 +1,442 @@
-import requests
+import hashlib
 import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import timedelta
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, cached_property
+from .instrumentation import record_http
+
+logger = logging.getLogger(__name__)
+
+
+class StreamInterrupted(Exception):
+    """The API stream broke off after part of the generation was yielded"""
+
+
+class ResponseCache:
+    """
+    Two-tier cache for generated feedback.
+
+    The memory tier is an LRU bounded by max_entries with a per-entry TTL.
+    The optional persistent tier stores entries in AIResponseCacheEntry so
+    they survive restarts and are shared between worker processes. Every
+    purge_every writes, its expired rows are deleted.
+    """
+
+    def __init__(self, max_entries=512, ttl=86400, persistent=False, clock=time.monotonic, purge_every=100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent = persistent
+        self.clock = clock
+        self.purge_every = purge_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.persistent:
+            from .models import AIResponseCacheEntry
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            value = (
+                AIResponseCacheEntry.objects
+                .filter(key=key, created_at__gte=cutoff)
+                .values_list('response', flat=True)
+                .first()
+            )
+            if value is not None:
+                self._set_memory(key, value)
+                with self._lock:
+                    self.persistent_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._set_memory(key, value)
+        if self.persistent:
+            from .models import AIResponseCacheEntry
+            AIResponseCacheEntry.objects.update_or_create(
+                key=key, defaults={'response': value, 'created_at': timezone.now()}
+            )
+            with self._lock:
+                self._writes += 1
+                purge_due = self._writes % self.purge_every == 0
+            if purge_due:
+                self.purge_expired()
+
+    def purge_expired(self):
+        """Delete persistent entries older than the TTL, which reads already ignore; returns how many"""
+        from .models import AIResponseCacheEntry
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        deleted, _ = AIResponseCacheEntry.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
+
+    def _set_memory(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.persistent_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'memory_hits': self.memory_hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+            }
+
+
+class LatencyStats:
+    """Rolling window of call latencies with percentile lookups"""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.hedged = 0
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self._samples.append(seconds)
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+
+    def record_hedge(self):
+        with self._lock:
+            self.hedged += 1
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, percent):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percent / 100))
+        return samples[index]
+
+    def snapshot(self):
+        def as_ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 2)
+
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'hedged': self.hedged,
+            'p50_ms': as_ms(self.percentile(50)),
+            'p95_ms': as_ms(self.percentile(95)),
+            'p99_ms': as_ms(self.percentile(99)),
+        }
 
 
 class TogetherAIService:
+    MODEL = "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo"
+    # Bump whenever the prompt below changes so cached responses are not reused
+    PROMPT_VERSION = 1
+
     def __init__(self):
         self.api_key = settings.TOGETHER_API_KEY
-        self.base_url = "https://api.together.xyz/v1/chat/completions"
+        self.base_url = getattr(settings, 'TOGETHER_API_URL', "https://api.together.xyz/v1/chat/completions")
+        cache_config = getattr(settings, 'AI_RESPONSE_CACHE', {})
+        self.cache = ResponseCache(
+            max_entries=cache_config.get('MAX_ENTRIES', 512),
+            ttl=cache_config.get('TTL', 86400),
+            persistent=cache_config.get('PERSISTENT', False),
+        )
         
+        http_config = getattr(settings, 'AI_HTTP', {})
+        self.timeout = http_config.get('TIMEOUT', 30)
+        self._stream_clients = weakref.WeakKeyDictionary()
+        self.pool_size = http_config.get('POOL_SIZE', 10)
+        # Hedge a request that is slower than this percentile of recent calls;
+        # None disables hedging
+        self.hedge_percentile = http_config.get('HEDGE_PERCENTILE')
+        self.hedge_min_samples = http_config.get('HEDGE_MIN_SAMPLES', 20)
+        self.max_retries = http_config.get('MAX_RETRIES', 3)
+        self.backoff_max = http_config.get('BACKOFF_MAX', 4)
+        self.latency = LatencyStats()
+        self.session = self._build_session(
+            max_retries=self.max_retries,
+            backoff_factor=http_config.get('BACKOFF_FACTOR', 0.5),
+        )
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+
+    def _build_session(self, max_retries, backoff_factor):
+        """
+        A keep-alive session so calls reuse pooled TCP/TLS connections, with
+        bounded exponential-backoff retries on rate limiting, server errors and
+        failed connects. A POST that was sent is not retried after a read
+        timeout or a broken connection, since the API may already be working
+        on it.
+        """
+        # HTTP clients are imported on first use to keep cold starts fast
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        class BoundedRetry(Retry):
+            """Retry that never sleeps longer than backoff_max, even when Retry-After asks to"""
+            def get_retry_after(self, response):
+                retry_after = super().get_retry_after(response)
+                return None if retry_after is None else min(retry_after, self.backoff_max)
+        
+        retry = BoundedRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            backoff_max=self.backoff_max,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def max_request_seconds(self):
+        """
+        Worst-case duration of one generation: every attempt running into the
+        timeout with the longest backoff in between. A hedged call may fire
+        its second request as late as that, so hedging doubles it.
+        """
+        worst_case = (self.max_retries + 1) * self.timeout + self.max_retries * self.backoff_max
+        return worst_case * 2 if self.hedge_percentile else worst_case
+
+    @property
+    def is_configured(self):
+        return bool(self.api_key) and self.api_key != "your-together-api-key-here"
+
+    def cache_key(self, user_input, recipient_name):
+        """Content address of a generation request"""
+        normalized_input = ' '.join(user_input.split())
+        material = '\x1f'.join([self.MODEL, str(self.PROMPT_VERSION), recipient_name, normalized_input])
+        return hashlib.sha256(material.encode()).hexdigest()
+
     def generate_feedback(self, user_input, recipient_name):
         """
-        Generate polished feedback from user's raw thoughts using Together AI
+        Generate polished feedback from user's raw thoughts using Together AI.
+
+        Successful generations are cached by content, so repeating the same
+        request for the same recipient does not call the API again.
         """
-        if not self.api_key or self.api_key == "your-together-api-key-here":
+        if not self.is_configured:
             # Fallback to original input if API key not configured
             return user_input
         
+        key = self.cache_key(user_input, recipient_name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        generated_text = self._request_generation(user_input, recipient_name)
+        if generated_text is None:
+            # Don't cache fallbacks, the next attempt may succeed
+            return user_input
+        
+        self.cache.set(key, generated_text)
+        return generated_text
+
+    @cached_property
+    def ssl_context(self):
+        """
+        TLS context shared by the streaming clients. Building one loads the CA
+        bundle, which would otherwise cost every open stream time and memory.
+        """
+        import httpx
+        return httpx.create_ssl_context()
+
+    def stream_client(self):
+        """
+        httpx.AsyncClient for the running event loop, built on first use so
+        streams on one loop share its connection pool. A client can't be used
+        from another loop, so each gets its own, dropped along with the loop.
+        """
+        import asyncio
+        import httpx
+        loop = asyncio.get_running_loop()
+        client = self._stream_clients.get(loop)
+        if client is None:
+            client = self._stream_clients[loop] = httpx.AsyncClient(timeout=self.timeout, verify=self.ssl_context)
+        return client
+
+    async def stream_feedback(self, user_input, recipient_name):
+        """
+        Async generator yielding the generated feedback chunk by chunk as the
+        model produces it. Cached generations are yielded in one chunk. If the
+        API fails before any text arrives the original input is yielded instead;
+        if it breaks off later, StreamInterrupted is raised. Only generations
+        the API finished are cached.
+        """
+        if not self.is_configured:
+            yield user_input
+            return
+        
+        key = self.cache_key(user_input, recipient_name)
+        cached = await sync_to_async(self.cache.get)(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        import httpx
+        
+        headers, data = self._build_request(user_input, recipient_name)
+        data["stream"] = True
+        chunks = []
+        finished = False
+        start = time.perf_counter()
+        try:
+            async with self.stream_client().stream("POST", self.base_url, headers=headers, json=data) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        finished = True
+                        break
+                    choice = json.loads(payload)['choices'][0]
+                    delta = choice.get('delta', {}).get('content')
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+                    if choice.get('finish_reason'):
+                        finished = True
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from Together AI API: {e}")
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing streamed API response: {e}")
+        record_http(time.perf_counter() - start)
+        
+        generated_text = ''.join(chunks).strip()
+        if not chunks:
+            yield user_input
+        elif not finished:
+            raise StreamInterrupted(f"Stream ended after {len(chunks)} chunk(s) without finishing")
+        elif generated_text:
+            await sync_to_async(self.cache.set)(key, generated_text)
+
+    def _request_generation(self, user_input, recipient_name):
+        """Call the Together AI API, returning None when no usable text came back"""
+        import requests
+        
+        headers, data = self._build_request(user_input, recipient_name)
+        
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self._post(headers, data)
+            response.raise_for_status()
+            
+            result = response.json()
+            generated_text = result['choices'][0]['message']['content'].strip()
+            ok = True
+            
+            # Ensure the generated text is not empty
+            if generated_text:
+                return generated_text
+            else:
+                return None
+                
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error calling Together AI API: {e}")
+            return None
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing API response: {e}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unexpected error calling Together AI API: {e}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed, ok=ok)
+            record_http(elapsed)
+
+    def _post(self, headers, data):
+        """
+        POST through the pooled session. When hedging is enabled and the call
+        outlives the configured latency percentile, a second identical request
+        is fired and whichever finishes first wins.
+        """
+        import requests
+        
+        threshold = None
+        if self.hedge_percentile and len(self.latency) >= self.hedge_min_samples:
+            threshold = self.latency.percentile(self.hedge_percentile)
+        
+        def send():
+            return self.session.post(self.base_url, headers=headers, json=data, timeout=self.timeout)
+        
+        if threshold is None:
+            return send()
+        
+        executor = self._get_hedge_executor()
+        primary = executor.submit(send)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+        
+        self.latency.record_hedge()
+        pending = {primary, executor.submit(send)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+        raise error
+
+    def _get_hedge_executor(self):
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.pool_size, thread_name_prefix='ai-hedge'
+                    )
+        return self._hedge_executor
+
+    def _build_request(self, user_input, recipient_name):
+        """Build the headers and chat completion payload for a generation"""
         prompt = f"""
         You are an expert feedback coach helping someone give constructive, comprehensive feedback to {recipient_name}.
         
@@ -46,7 +467,7 @@ class TogetherAIService:
         }
         
         data = {
-            "model": "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo",
+            "model": self.MODEL,
             "messages": [
                 {
                     "role": "system",
@@ -61,29 +482,15 @@ class TogetherAIService:
             "temperature": 0.7
         }
         
-        try:
-            response = requests.post(self.base_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            generated_text = result['choices'][0]['message']['content'].strip()
-            
-            # Ensure the generated text is not empty
-            if generated_text:
-                return generated_text
-            else:
-                return user_input
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Error calling Together AI API: {e}")
-            return user_input
-        except (KeyError, IndexError) as e:
-            print(f"Error parsing API response: {e}")
-            return user_input
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            return user_input
+        return headers, data
+
+
+# The service (and its HTTP client imports) is built on first use, so cold
+# starts that never generate feedback don't pay for it
+ai_service = SimpleLazyObject(TogetherAIService)
 
 
-# Initialize the service
-ai_service = TogetherAIService()
+def warm_up():
+    """Build the AI service and import its HTTP clients ahead of the first request"""
+    import httpx  # noqa: F401
+    ai_service.session
@@ -7,3 +7,14 @@ class FeedbackConfig(AppConfig):
     
     def ready(self):
         import feedback.signals
+        
+        # Rendered even on lazy starts: the first error often comes with a
+        # database outage, when the page should already be in memory
+        from .error_pages import error_pages
+        error_pages.build()
+        
+        from django.conf import settings
+        if not getattr(settings, 'LAZY_STARTUP', True):
+            # Long-running servers can pay for the heavy imports up front
+            from .ai_service import warm_up
+            warm_up()
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from django.conf import settings
+
+# Runs in a fresh interpreter: import the WSGI entry point exactly like the
+# serverless runtime does, then serve one request through it.
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from whisperlink_backend.wsgi import application
+imported = time.perf_counter()
+
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'REQUEST_METHOD': 'GET'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'status': status[0],
+    'bytes': len(body),
+}))
+"""
+
+
+def run_cold_start(path='/', python_flags=()):
+    """
+    Start a fresh interpreter, import the WSGI application and serve one GET
+    for path. Returns (wall_ms, child_timings, stderr).
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE
+    ))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *python_flags, '-c', CHILD_SCRIPT, path],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{result.stderr}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return wall_ms, timings, result.stderr
@@ -1,33 +1,26 @@
-from django.contrib.auth.models import AnonymousUser
-from django.db.utils import OperationalError
-import logging
-
-logger = logging.getLogger(__name__)
+from .health import db_health
 
 
 def safe_user_context(request):
     """
     Context processor that provides additional safe user context
-    and database connectivity status
+    and database connectivity status.
+
+    The status comes from the shared circuit breaker in feedback.health,
+    so rendering a template never probes the database.
     """
-    try:
-        # Try to test database connectivity
-        from django.db import connection
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-        db_available = True
-    except OperationalError as e:
-        logger.error(f"Database error in context processor: {e}")
-        db_available = False
-    except Exception as e:
-        # Check if it's a database-related error
-        if any(keyword in str(e).lower() for keyword in ['connection', 'server', 'database']):
-            logger.error(f"Database error in context processor: {e}")
-            db_available = False
-        else:
-            db_available = True
+    db_available = db_health.is_available()
     
     return {
         'db_available': db_available,
         'is_database_connected': db_available,
     }
+
+
+def page_cache_csrf(request):
+    """
+    While a page is rendered for the page cache, render a placeholder instead
+    of the visitor's CSRF token (see feedback.page_cache)
+    """
+    placeholder = getattr(request, 'csrf_token_placeholder', None)
+    return {'csrf_token': placeholder} if placeholder else {}
@@ -0,0 +1,65 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from .models import UserProfile, AnonymousFeedback
+
+
+def record_feedback_created(profile_id, count=1, ai_count=0, submitted_at=None):
+    """Bump a profile's counters after feedback was created for it"""
+    updates = {
+        'feedback_count': F('feedback_count') + count,
+        'ai_feedback_count': F('ai_feedback_count') + ai_count,
+    }
+    if submitted_at is not None:
+        updates['last_feedback_at'] = Greatest(Coalesce('last_feedback_at', Value(submitted_at)), Value(submitted_at))
+    UserProfile.objects.filter(pk=profile_id).update(**updates)
+
+
+def record_feedback_deleted(profile_id, count=1, ai_count=0):
+    """
+    Decrement a profile's counters after feedback was deleted. Call this in
+    the same transaction as the delete so last_feedback_at sees the remaining
+    rows.
+    """
+    UserProfile.objects.filter(pk=profile_id).update(
+        feedback_count=Greatest(F('feedback_count') - count, 0),
+        ai_feedback_count=Greatest(F('ai_feedback_count') - ai_count, 0),
+        last_feedback_at=Subquery(
+            AnonymousFeedback.objects.filter(recipient=OuterRef('pk'))
+            .order_by('-submitted_at')
+            .values('submitted_at')[:1]
+        ),
+    )
+
+
+def rebuild_counters(profiles=None):
+    """
+    Recompute the counters from AnonymousFeedback with one set-based UPDATE
+    over the given profile queryset (all profiles by default). Returns the
+    number of profiles updated.
+    """
+    if profiles is None:
+        profiles = UserProfile.objects.all()
+
+    per_recipient = (
+        AnonymousFeedback.objects.filter(recipient=OuterRef('pk'))
+        .order_by()
+        .values('recipient')
+    )
+    return profiles.update(
+        feedback_count=Coalesce(
+            Subquery(per_recipient.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            0,
+        ),
+        ai_feedback_count=Coalesce(
+            Subquery(
+                per_recipient.annotate(total=Count('id', filter=Q(is_ai_generated=True))).values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        last_feedback_at=Subquery(
+            AnonymousFeedback.objects.filter(recipient=OuterRef('pk'))
+            .order_by('-submitted_at')
+            .values('submitted_at')[:1]
+        ),
+    )
@@ -1,8 +1,13 @@
 from functools import wraps
-from django.db.utils import OperationalError
-from django.db import connection
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import JsonResponse
+from .error_pages import error_response
+from .health import db_health, is_database_error
+from .ratelimit import limiter, CacheBackend
+from .routers import use_primary
+from .utils import get_client_ip
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,75 +15,167 @@ logger = logging.getLogger(__name__)
 
 def database_required(view_func):
     """
-    Decorator that checks database connectivity before executing the view
+    Decorator that fails fast while the database circuit is open and reports
+    database failures raised by the view to the shared health state.
+    Works on both sync and async views.
     """
+    def record_failure(e):
+        """Report e if it is a database error; returns whether it was"""
+        if is_database_error(e):
+            logger.error("Database connection failed in %s: %s", view_func.__name__, e)
+            db_health.record_failure(e)
+            return True
+        return False
+    
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not db_health.is_available():
+                error = db_health.last_error or 'Database unavailable'
+                return handle_database_error(request, error)
+            try:
+                return await view_func(request, *args, **kwargs)
+            except Exception as e:
+                if not record_failure(e):
+                    # Re-raise non-database errors
+                    raise
+                return handle_database_error(request, e)
+        return async_wrapper
+    
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
+        if not db_health.is_available():
+            return handle_database_error(request, db_health.last_error or 'Database unavailable')
         try:
-            # Test database connection
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
             return view_func(request, *args, **kwargs)
-        except OperationalError as e:
-            logger.error(f"Database connection failed in {view_func.__name__}: {e}")
-            return handle_database_error(request, e)
         except Exception as e:
-            # Check if it's a database-related error
-            if any(keyword in str(e).lower() for keyword in ['connection', 'server', 'database']):
-                logger.error(f"Database connection failed in {view_func.__name__}: {e}")
-                return handle_database_error(request, e)
-            # Re-raise non-database errors
-            raise
+            if not record_failure(e):
+                # Re-raise non-database errors
+                raise
+            return handle_database_error(request, e)
     return wrapper
 
 
-def handle_database_error(request, error):
+def primary_database(view_func):
     """
-    Handle database connection errors with user-friendly response
+    Decorator sending all reads of the view to the primary database, for
+    read-only views that must not see replication lag (e.g. status polling).
+    Works on both sync and async views.
     """
-    context = {
-        'error_type': 'Database Connection Error',
-        'error_message': 'Unable to connect to the database. Please try again later.',
-        'suggestion': 'This is usually a temporary issue. Please refresh the page or try again in a few moments.',
-        'technical_details': str(error),
-    }
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            use_primary()
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+    
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        use_primary()
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def request_charges(request, kwargs):
+    """One hit on the client IP and, for views taking a link_id, one on the feedback link"""
+    charges = {('ip', get_client_ip(request)): 1}
+    if 'link_id' in kwargs:
+        charges[('link', kwargs['link_id'])] = 1
+    return charges
+
+
+def rate_limited(json=False, charges=request_charges, count_rejected=True):
+    """
+    Decorator applying the FEEDBACK_RATE_LIMITS sliding windows to POST
+    requests. charges(request, kwargs) maps the (scope, value) keys a request
+    is counted against to the hits it spends, by default request_charges.
+    Over-limit requests get a 429 with Retry-After. With count_rejected=False
+    only requests allowed on every key are counted. A request costing more
+    than a whole limit could never pass; it gets a 413 and is not counted.
+    Works on both sync and async views.
+    """
+    def check_limits(request, kwargs):
+        if request.method != 'POST':
+            return None
+        
+        limits = settings.FEEDBACK_RATE_LIMITS
+        hits = [
+            (f'{scope}:{value}', cost, *limits[scope])
+            for (scope, value), cost in charges(request, kwargs).items()
+            if scope in limits
+        ]
+        if any(cost > limit for _, cost, limit, _ in hits):
+            logger.warning(f"Request from {get_client_ip(request)} on {request.path} exceeds a whole rate limit")
+            return too_large(request, json)
+        
+        if count_rejected:
+            results = [limiter.hit(key, limit, window, cost) for key, cost, limit, window in hits]
+        else:
+            results = [limiter.peek(key, limit, window, cost) for key, cost, limit, window in hits]
+            if all(allowed for allowed, _ in results):
+                for key, cost, limit, window in hits:
+                    limiter.hit(key, limit, window, cost)
+        
+        retry_after = max((wait for allowed, wait in results if not allowed), default=0)
+        if retry_after:
+            logger.warning(f"Rate limit exceeded for {get_client_ip(request)} on {request.path}")
+            return too_many_requests(request, retry_after, json)
+        return None
     
-    try:
-        return render(request, 'feedback/error.html', context, status=503)
-    except:
-        # Fallback to simple HTTP response if template rendering fails
-        return HttpResponse(
-            """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Database Connection Error</title>
-                <style>
-                    body { font-family: Arial, sans-serif; margin: 50px; background-color: #f8f9fa; }
-                    .container { max-width: 600px; margin: 0 auto; padding: 20px; background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-                    .error-icon { color: #dc3545; font-size: 48px; }
-                    .btn { display: inline-block; padding: 10px 20px; margin: 10px 5px; text-decoration: none; border-radius: 5px; }
-                    .btn-primary { background-color: #007bff; color: white; }
-                    .btn-secondary { background-color: #6c757d; color: white; }
-                    .alert { padding: 15px; margin: 20px 0; border-radius: 5px; background-color: #fff3cd; border: 1px solid #ffeaa7; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="error-icon">⚠️</div>
-                    <h1>Database Connection Error</h1>
-                    <div class="alert">
-                        <p><strong>Unable to connect to the database.</strong></p>
-                        <p>This is usually a temporary issue. Please try again in a few moments.</p>
-                    </div>
-                    <div>
-                        <a href="/" class="btn btn-primary">Return to Home</a>
-                        <a href="javascript:window.location.reload()" class="btn btn-secondary">Refresh Page</a>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """,
-            status=503,
-            content_type='text/html'
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if isinstance(limiter.backend, CacheBackend):
+                    # Shared cache backends do network I/O
+                    response = await sync_to_async(check_limits)(request, kwargs)
+                else:
+                    response = check_limits(request, kwargs)
+                return response or await view_func(request, *args, **kwargs)
+            return async_wrapper
+        
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return check_limits(request, kwargs) or view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def too_many_requests(request, retry_after, json=False):
+    """429 response telling the client when it may try again"""
+    if json:
+        response = JsonResponse(
+            {'error': 'Too many requests. Please slow down.', 'retry_after': retry_after},
+            status=429,
         )
+    else:
+        context = {
+            'error_type': 'Too Many Requests',
+            'error_message': 'You are sending feedback too quickly.',
+            'suggestion': f'Please wait {retry_after} seconds and try again.',
+            'technical_details': f'Retry after {retry_after} seconds',
+        }
+        response = render(request, 'feedback/error.html', context, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def too_large(request, json=False):
+    """413 response for a request larger than a rate limit allows at once"""
+    if json:
+        return JsonResponse({'error': 'Request exceeds the rate limit on its own; split it up.'}, status=413)
+    context = {
+        'error_type': 'Request Too Large',
+        'error_message': 'This request is larger than the rate limit allows at once.',
+        'suggestion': 'Please split it into smaller requests.',
+        'technical_details': 'Cost exceeds the rate limit',
+    }
+    return render(request, 'feedback/error.html', context, status=413)
+
+
+def handle_database_error(request, error):
+    """
+    Handle database connection errors with the pre-rendered 503 page,
+    which needs neither the database nor the session
+    """
+    return error_response(503)
@@ -0,0 +1,120 @@
+"""
+Error pages rendered once and served from memory.
+
+The pages are rendered without a request, so no context processor runs and
+nothing reads the session, the user or the messages - all of which need the
+database. That keeps the 503 page cheap while the database is down, when
+every request ends up here.
+"""
+import logging
+import threading
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from .health import db_health
+
+logger = logging.getLogger(__name__)
+
+ERROR_TEMPLATE = 'feedback/error.html'
+
+ERROR_PAGES = {
+    503: {
+        'error_type': 'Database Connection Error',
+        'error_message': 'Unable to connect to the database. Please try again later.',
+        'suggestion': 'This is usually a temporary issue. Please refresh the page or try again in a few moments.',
+        'technical_details': 'The database is temporarily unavailable.',
+    },
+    500: {
+        'error_type': 'Internal Server Error',
+        'error_message': 'Something went wrong on our end. We\'re working to fix it.',
+        'suggestion': 'Please try again later. If the problem persists, contact support.',
+        'technical_details': 'The server encountered an internal error and could not complete your request.',
+    },
+    404: {
+        'error_type': 'Page Not Found',
+        'error_message': 'The page you requested could not be found.',
+        'suggestion': 'Please check the URL and try again, or use the navigation links to find what you\'re looking for.',
+    },
+    403: {
+        'error_type': 'Access Forbidden',
+        'error_message': 'You don\'t have permission to access this resource.',
+        'suggestion': 'Please log in or contact support if you believe this is an error.',
+    },
+}
+
+# Served when the template itself cannot be rendered
+FALLBACK_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{error_type}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 50px; background-color: #f8f9fa; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background: white; border-radius: 8px; }}
+        .alert {{ padding: 15px; margin: 20px 0; border-radius: 5px; background-color: #fff3cd; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>{error_type}</h1>
+        <div class="alert">
+            <p><strong>{error_message}</strong></p>
+            <p>{suggestion}</p>
+        </div>
+        <a href="/">Return to Home</a>
+    </div>
+</body>
+</html>
+"""
+
+
+class ErrorPageCache:
+    """Rendered error pages by status code, built at startup by build() or on first use"""
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def get(self, status):
+        page = self._pages.get(status)
+        if page is None:
+            with self._lock:
+                page = self._pages.get(status)
+                if page is None:
+                    page = self._render(status)
+        return page
+
+    def _render(self, status, prebuild=False):
+        context = dict(ERROR_PAGES[status], db_available=status != 503)
+        try:
+            page = render_to_string(ERROR_TEMPLATE, context).encode()
+        except Exception as e:
+            # Not cached, so the real page is used once it can be rendered
+            if prebuild:
+                # e.g. management commands run before collectstatic wrote the manifest
+                logger.warning(f"Could not prebuild the {status} error page, rendering it on first use: {e}")
+            else:
+                logger.exception(f"Could not render the {status} error page")
+            return FALLBACK_PAGE.format(**ERROR_PAGES[status]).encode()
+        self._pages[status] = page
+        return page
+
+    def build(self):
+        """Render every page ahead of the first error"""
+        with self._lock:
+            for status in ERROR_PAGES:
+                if status not in self._pages:
+                    self._render(status, prebuild=True)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+
+error_pages = ErrorPageCache()
+
+
+def error_response(status):
+    """The cached error page for status; 503s tell clients when to retry"""
+    response = HttpResponse(error_pages.get(status), status=status, content_type='text/html; charset=utf-8')
+    if status == 503:
+        response['Retry-After'] = str(db_health.reset_timeout)
+    return response
@@ -0,0 +1,83 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Spreadsheets evaluate a cell starting with one of these as a formula, and
+# feedback messages are written by anonymous senders
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Columns exported to recipients. IP addresses and delete tokens never leave
+# the server; admin exports add the recipient's username.
+EXPORT_FIELDS = ['id', 'submitted_at', 'message', 'is_ai_generated', 'original_input']
+ADMIN_EXPORT_FIELDS = ['id', 'recipient__user__username'] + EXPORT_FIELDS[1:]
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iterate_rows(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield value tuples for fields in id order, holding at most one chunk in
+    memory. Uses a server-side cursor (.iterator(chunk_size)) where the
+    database allows one; behind a transaction-mode pooler, which can't keep
+    a cursor open across transactions (DISABLE_SERVER_SIDE_CURSORS), it
+    walks the table in keyset-paginated batches instead.
+    """
+    queryset = queryset.order_by('id').values_list(*fields)
+    connection = connections[queryset.db]
+    if not connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    id_index = fields.index('id')
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        yield from batch
+        if len(batch) < chunk_size:
+            return
+        last_id = batch[-1][id_index]
+
+
+def _header(fields):
+    return [field.replace('recipient__user__username', 'recipient') for field in fields]
+
+
+def _csv_cell(value):
+    """Value as written to CSV; text a spreadsheet would run as a formula is prefixed with '"""
+    if isinstance(value, str):
+        return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(_header(fields))
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def jsonl_lines(rows, fields):
+    header = _header(fields)
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+# format -> (content type, line generator)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_lines),
+    'jsonl': ('application/x-ndjson; charset=utf-8', jsonl_lines),
+}
+
+
+def export_lines(queryset, fmt, fields=EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """Lazily render queryset as lines of fmt ('csv' or 'jsonl')"""
+    _, write_lines = EXPORT_FORMATS[fmt]
+    return write_lines(iterate_rows(queryset, fields, chunk_size), fields)
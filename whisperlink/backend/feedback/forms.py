@@ -35,3 +35,45 @@ class AIFeedbackForm(forms.Form):
         help_text='Describe what you think about this person in your own words. AI will help refine it into constructive feedback.',
         max_length=500
     )
+
+
+class FeedbackFilterForm(forms.Form):
+    """Search and filters for the dashboard's received feedback"""
+    SOURCE_CHOICES = [
+        ('', 'All feedback'),
+        ('ai', 'AI enhanced'),
+        ('human', 'Written directly'),
+    ]
+
+    q = forms.CharField(
+        required=False,
+        max_length=200,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search feedback...', 'type': 'search'}),
+        label='Search',
+    )
+    date_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label='From',
+    )
+    date_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label='To',
+    )
+    source = forms.ChoiceField(
+        required=False,
+        choices=SOURCE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Type',
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        return cleaned_data
+
+    def is_filtering(self):
+        return self.is_bound and self.is_valid() and any(self.cleaned_data.values())
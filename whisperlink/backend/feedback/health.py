@@ -0,0 +1,194 @@
+import functools
+import importlib
+import logging
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections, utils as db_utils
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+def _connectivity_error_classes():
+    """
+    Exception classes meaning the database could not be reached or the
+    connection broke, as opposed to errors in the query itself (integrity,
+    programming, data errors). Django wraps driver errors in its own DB-API
+    classes; raw driver errors are included for code that bypasses the ORM.
+    """
+    classes = [db_utils.OperationalError, db_utils.InterfaceError]
+    for driver in ('psycopg2', 'psycopg', 'sqlite3'):
+        try:
+            module = importlib.import_module(driver)
+        except ImportError:
+            continue
+        classes += [module.OperationalError, module.InterfaceError]
+    return tuple(classes)
+
+
+CONNECTIVITY_ERRORS = _connectivity_error_classes()
+
+# Links of the __cause__/__context__ chain inspected before giving up
+MAX_CHAIN_DEPTH = 8
+
+
+@functools.lru_cache(maxsize=256)
+def _is_connectivity_error_class(exception_class):
+    return issubclass(exception_class, CONNECTIVITY_ERRORS)
+
+
+def is_database_error(exception):
+    """
+    Whether exception, or one of the first MAX_CHAIN_DEPTH exceptions it was
+    raised from, is a database connectivity error. Classification is by type
+    only, cached per class, and the chain walk stops on cycles.
+    """
+    seen = set()
+    current = exception
+    while current is not None and len(seen) < MAX_CHAIN_DEPTH and id(current) not in seen:
+        if _is_connectivity_error_class(type(current)):
+            return True
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class DatabaseHealth:
+    """
+    Process-local database health state with a circuit breaker.
+
+    The state is fed passively: real query failures are reported by
+    DatabaseErrorMiddleware and database_required, and every new connection
+    and every query that returns reports a success, so only consecutive
+    failures add up. Readers (context processor, decorator) only look at
+    the cached state and never touch the database. Only probe() performs I/O,
+    and its result is cached for a short TTL.
+
+    closed    - database is healthy, requests go through
+    open      - too many consecutive failures, requests fail fast
+    half_open - reset timeout elapsed, requests go through as a trial; one
+                success closes the circuit, one failure re-opens it
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30, probe_ttl=5, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_ttl = probe_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._last_error = None
+        self._last_probe_at = None
+        self._last_probe_ok = True
+
+    @property
+    def state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            with self._lock:
+                if self._state == self.OPEN:
+                    self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def last_error(self):
+        return self._last_error
+
+    def is_available(self):
+        """Return the cached availability flag without doing any I/O"""
+        return self.state != self.OPEN
+
+    def record_success(self):
+        if self._state == self.CLOSED and not self._failures:
+            return
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Database connectivity restored, closing circuit")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._last_error = None
+
+    def record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error(f"Database marked unavailable after {self._failures} failure(s): {error}")
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+    def probe(self):
+        """
+        Actively check connectivity with SELECT 1, at most once per probe_ttl
+        seconds. Returns whether the most recent probe succeeded.
+        """
+        now = self.clock()
+        if self._last_probe_at is not None and now - self._last_probe_at < self.probe_ttl:
+            return self._last_probe_ok
+        self._last_probe_at = now
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Exception as e:
+            self._last_probe_ok = False
+            self.record_failure(e)
+        else:
+            self._last_probe_ok = True
+            self.record_success()
+        return self._last_probe_ok
+
+    async def aprobe(self):
+        """Async probe(); a cached result is returned without leaving the event loop"""
+        if self._last_probe_at is not None and self.clock() - self._last_probe_at < self.probe_ttl:
+            return self._last_probe_ok
+        return await sync_to_async(self.probe)()
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._last_error = None
+            self._last_probe_at = None
+            self._last_probe_ok = True
+
+
+_config = getattr(settings, 'DATABASE_HEALTH', {})
+
+db_health = DatabaseHealth(
+    failure_threshold=_config.get('FAILURE_THRESHOLD', 3),
+    reset_timeout=_config.get('RESET_TIMEOUT', 30),
+    probe_ttl=_config.get('PROBE_TTL', 5),
+)
+
+
+def report_query(execute, sql, params, many, context):
+    """Execute wrapper reporting every query that returns as a success"""
+    result = execute(sql, params, many, context)
+    db_health.record_success()
+    return result
+
+
+def install_query_reporter(connection):
+    # First in the list, like the instrumentation's query counter, so a
+    # caller's execute_wrapper() block can never remove it
+    if report_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, report_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    db_health.record_success()
+    install_query_reporter(connection)
+
+
+connection_created.connect(_on_connection_created, dispatch_uid='feedback.health.connection_created')
+for _connection in connections.all(initialized_only=True):
+    install_query_reporter(_connection)
@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request being handled in the current thread/task, if any
+_current = ContextVar('feedback_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Timings gathered while handling a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.http_calls = 0
+        self.http_time = 0.0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Value for the Server-Timing response header, in milliseconds"""
+        return ', '.join([
+            f'app;dur={self.elapsed * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'http;dur={self.http_time * 1000:.1f};desc="{self.http_calls} calls"',
+        ])
+
+
+class Histogram:
+    """Rolling window of samples with percentile lookups"""
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+
+    def add(self, value):
+        self._samples.append(value)
+
+    def percentile(self, percent):
+        samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def summary(self):
+        return {f'p{p}': self.percentile(p) for p in (50, 90, 95, 99)}
+
+
+class ViewStats:
+    """Per-view histograms of wall time, DB time, query count and HTTP time"""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.over_budget = 0
+        self.wall_ms = Histogram(window)
+        self.db_ms = Histogram(window)
+        self.queries = Histogram(window)
+        self.http_ms = Histogram(window)
+
+    def record(self, metrics, over_budget):
+        self.requests += 1
+        self.over_budget += over_budget
+        self.wall_ms.add(round(metrics.elapsed * 1000, 2))
+        self.db_ms.add(round(metrics.db_time * 1000, 2))
+        self.queries.add(metrics.db_queries)
+        self.http_ms.add(round(metrics.http_time * 1000, 2))
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'over_query_budget': self.over_budget,
+            'wall_ms': self.wall_ms.summary(),
+            'db_ms': self.db_ms.summary(),
+            'queries': self.queries.summary(),
+            'http_ms': self.http_ms.summary(),
+        }
+
+
+class MetricsRegistry:
+    """Process-local store of ViewStats keyed by URL name"""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def record(self, url_name, metrics, over_budget=False):
+        with self._lock:
+            stats = self._views.get(url_name)
+            if stats is None:
+                stats = self._views[url_name] = ViewStats(self.window)
+            stats.record(metrics, over_budget)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in sorted(self._views.items())}
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+_config = getattr(settings, 'PERFORMANCE_METRICS', {})
+
+registry = MetricsRegistry(window=_config.get('WINDOW', 500))
+
+
+def query_budget(url_name):
+    """Maximum number of queries url_name may run before a warning is logged"""
+    config = getattr(settings, 'PERFORMANCE_METRICS', {})
+    return config.get('QUERY_BUDGETS', {}).get(url_name, config.get('QUERY_BUDGET', 10))
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection, charging queries to the
+    request being tracked in the current context. Async views run their ORM
+    calls in worker threads; sync_to_async copies the context over, so those
+    queries are counted too.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_counter(connection):
+    # First in the list, so a caller's own execute_wrapper() block (which
+    # pops the last wrapper on exit) can never remove it
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+connection_created.connect(_on_connection_created, dispatch_uid='feedback.instrumentation.connection_created')
+
+
+@contextmanager
+def track_request():
+    """
+    Collect RequestMetrics for the enclosed block: every query on any
+    database connection made from this context (including the worker
+    threads of sync_to_async), and any HTTP time reported through
+    record_http().
+    """
+    for connection in connections.all(initialized_only=True):
+        install_query_counter(connection)
+
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_request(request, metrics):
+    """
+    Add a finished request to the registry under its URL name and warn when
+    it exceeded its query budget. Unresolved requests (404s) are skipped.
+    """
+    match = request.resolver_match
+    if match is None or not match.url_name:
+        return
+
+    budget = query_budget(match.url_name)
+    over_budget = metrics.db_queries > budget
+    if over_budget:
+        logger.warning(
+            f"{match.url_name} ran {metrics.db_queries} queries "
+            f"(budget {budget}) for {request.method} {request.path}"
+        )
+    registry.record(match.url_name, metrics, over_budget)
+
+
+def record_http(seconds):
+    """Attribute an outbound HTTP call to the request being tracked, if any"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.http_calls += 1
+        metrics.http_time += seconds
@@ -0,0 +1,131 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .ai_service import ai_service
+from .models import AIPreviewJob
+
+logger = logging.getLogger(__name__)
+
+# A pending job that is not queued in this process and older than this was
+# probably lost (e.g. the worker process was recycled), so a status poll
+# dispatches it again. Well above the queue wait behind busy workers, so jobs
+# queued in another process are left alone.
+PENDING_REDISPATCH_AFTER = timedelta(minutes=5)
+# A running job that outlived the AI request, retries included, by more than
+# this is presumed lost (see running_stale_after).
+RUNNING_STALE_GRACE = timedelta(seconds=10)
+# Finished jobs are purged after this long.
+JOB_RETENTION = timedelta(days=1)
+
+_executor = None
+_executor_lock = threading.Lock()
+# Ids of jobs handed to this process's executor and not yet finished
+_queued = set()
+_queued_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AI_PREVIEW_WORKERS,
+                    thread_name_prefix='ai-preview',
+                )
+    return _executor
+
+
+def submit_preview_job(profile_id, user_input):
+    """Queue an AI preview for a recipient profile and return the job without waiting on it"""
+    job = AIPreviewJob.objects.create(recipient_id=profile_id, user_input=user_input)
+    dispatch(job.id)
+    return job
+
+
+def dispatch(job_id):
+    """
+    Hand a job to the worker pool, unless it is already queued there. With
+    AI_PREVIEW_WORKERS = 0 the job runs inline, which is what the test suite
+    uses.
+    """
+    if settings.AI_PREVIEW_WORKERS <= 0:
+        run_preview_job(job_id)
+        return
+    with _queued_lock:
+        if job_id in _queued:
+            return
+        _queued.add(job_id)
+    get_executor().submit(_run_in_worker, job_id)
+
+
+def is_queued(job_id):
+    """Whether this process has the job queued or running"""
+    return job_id in _queued
+
+
+def _run_in_worker(job_id):
+    try:
+        run_preview_job(job_id)
+        purge_expired_jobs()
+    except Exception:
+        logger.exception(f"AI preview job {job_id} crashed")
+    finally:
+        with _queued_lock:
+            _queued.discard(job_id)
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def run_preview_job(job_id):
+    """Claim a pending job, generate the preview and store the result"""
+    claimed = AIPreviewJob.objects.filter(
+        id=job_id, status=AIPreviewJob.STATUS_PENDING
+    ).update(status=AIPreviewJob.STATUS_RUNNING, started_at=timezone.now())
+    if not claimed:
+        # Another worker already has it, or it is finished
+        return
+
+    job = AIPreviewJob.objects.select_related('recipient__user').get(id=job_id)
+    try:
+        result = ai_service.generate_feedback(job.user_input, job.recipient.user.username)
+        status = AIPreviewJob.STATUS_DONE
+    except Exception as e:
+        logger.error(f"AI preview job {job_id} failed: {e}")
+        result = job.user_input
+        status = AIPreviewJob.STATUS_FAILED
+
+    AIPreviewJob.objects.filter(id=job_id).update(
+        status=status, result=result, finished_at=timezone.now()
+    )
+
+
+def running_stale_after():
+    """How long a job may stay running: the AI client's worst case plus RUNNING_STALE_GRACE"""
+    return timedelta(seconds=ai_service.max_request_seconds) + RUNNING_STALE_GRACE
+
+
+def recover_stale_job(job):
+    """
+    Re-dispatch a job whose worker appears to be gone. Jobs this process
+    still has queued are left to it. The conditional claim in run_preview_job
+    keeps a job from running twice concurrently.
+    """
+    now = timezone.now()
+    if job.status == AIPreviewJob.STATUS_RUNNING and job.started_at < now - running_stale_after():
+        reset = AIPreviewJob.objects.filter(
+            id=job.id, status=AIPreviewJob.STATUS_RUNNING, started_at=job.started_at
+        ).update(status=AIPreviewJob.STATUS_PENDING, started_at=None)
+        if reset:
+            dispatch(job.id)
+    elif (job.status == AIPreviewJob.STATUS_PENDING and job.created_at < now - PENDING_REDISPATCH_AFTER
+          and not is_queued(job.id)):
+        dispatch(job.id)
+
+
+def purge_expired_jobs():
+    AIPreviewJob.objects.filter(created_at__lt=timezone.now() - JOB_RETENTION).delete()
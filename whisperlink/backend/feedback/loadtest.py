@@ -0,0 +1,330 @@
+import os
+import random
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.db import connection
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from .ai_service import TogetherAIService, ai_service
+from .counters import rebuild_counters
+from .models import AnonymousFeedback, UserProfile
+from .recipients import recipient_cache
+from .stub_server import FakeTogetherServer
+
+# Seeded accounts share this prefix so a run (or a crashed one) can be cleaned up
+SEED_PREFIX = 'bench_flows_'
+
+# Database hosts on this machine; an empty host or a socket directory is local too
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+WORDS = (
+    'great presentation clear slides could improve pacing helpful feedback meeting '
+    'code review thorough kind supportive deadline communication listen team '
+    'thanks always appreciated documentation questions answers patient'
+).split()
+
+Seed = namedtuple('Seed', ['users', 'profiles', 'delete_tokens'])
+Request = namedtuple('Request', ['method', 'path', 'data', 'cookies', 'headers'])
+
+
+class Scenario:
+    """A named flow: build(i) returns the i-th Request, expected the acceptable status codes"""
+
+    def __init__(self, name, build, expected=(200,)):
+        self.name = name
+        self.build = build
+        self.expected = expected
+
+
+def _message(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(words // 2, words * 2))).capitalize()
+
+
+def is_local_database():
+    """Whether the default database is SQLite or a server on this machine"""
+    host = connection.settings_dict.get('HOST') or ''
+    return connection.vendor == 'sqlite' or host in LOCAL_HOSTS or host.startswith('/')
+
+
+def check_seed_database(allow_remote=False):
+    """
+    Refuse to write or delete seed data on a remote database, which with the
+    default settings is the production one, unless allow_remote is set
+    """
+    if not allow_remote and not is_local_database():
+        raise CommandError(
+            f"Refusing to seed or clean up benchmark data on the remote database host "
+            f"{connection.settings_dict.get('HOST')!r}. Use DB_ENGINE=sqlite3 or a local "
+            f"PostgreSQL, or pass --allow-remote."
+        )
+
+
+def seed_data(users=100, feedback=20000, delete_pool=1000, seed=0, allow_remote=False):
+    """
+    Create users with profiles and feedback spread over them with a Zipf-like
+    skew, so the first profile has the biggest inbox. delete_pool extra rows
+    on the busiest profile provide one delete token per delete_feedback
+    request. Committed, because the HTTP driver's threads must see it; see
+    check_seed_database.
+    """
+    cleanup_seed_data(allow_remote)
+    rng = random.Random(seed)
+    created = [User.objects.create_user(username=f'{SEED_PREFIX}{i:05d}') for i in range(users)]
+    profiles = list(UserProfile.objects.filter(user__in=created).order_by('user__username'))
+
+    weights = [1 / (rank + 1) for rank in range(len(profiles))]
+    recipients = rng.choices(profiles, weights=weights, k=feedback)
+    AnonymousFeedback.objects.bulk_create(
+        [
+            AnonymousFeedback(
+                recipient=recipient, message=_message(rng), is_ai_generated=rng.random() < 0.2,
+                ip_address=f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+            )
+            for recipient in recipients
+        ],
+        batch_size=1000,
+    )
+    deletable = AnonymousFeedback.objects.bulk_create(
+        [AnonymousFeedback(recipient=profiles[0], message=_message(rng)) for _ in range(delete_pool)],
+        batch_size=1000,
+    )
+    rebuild_counters(UserProfile.objects.filter(user__username__startswith=SEED_PREFIX))
+    return Seed(created, profiles, [row.delete_token for row in deletable])
+
+
+def cleanup_seed_data(allow_remote=False):
+    check_seed_database(allow_remote)
+    User.objects.filter(username__startswith=SEED_PREFIX).delete()
+    recipient_cache.clear()
+
+
+@contextmanager
+def fake_ai_service(latency):
+    """
+    Point the shared ai_service at a local FakeTogetherServer answering after
+    latency seconds, so AI flows are measured without the real API.
+    """
+    with FakeTogetherServer(latency=latency) as stub:
+        with override_settings(TOGETHER_API_KEY='bench-key', TOGETHER_API_URL=stub.url):
+            service = TogetherAIService()
+        previous = ai_service._wrapped
+        ai_service._wrapped = service
+        try:
+            yield stub
+        finally:
+            ai_service._wrapped = previous
+
+
+def login_cookies(user):
+    """Cookies of a logged-in session for user, usable by either driver"""
+    client = Client()
+    client.force_login(user)
+    return {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+
+
+def build_scenarios(seed, seed_value=0):
+    """The benchmarked flows, in the order they run"""
+    rng = random.Random(seed_value)
+    links = [profile.unique_link for profile in seed.profiles]
+    busiest = seed.users[0]
+    session = login_cookies(busiest)
+
+    def visitor(i):
+        # Every simulated visitor submits from its own address
+        return {'X-Forwarded-For': f'10.200.{i // 250 % 256}.{i % 250 + 1}'}
+
+    def form_get(i):
+        return Request('GET', reverse('feedback_form', args=[links[i % len(links)]]), None, {}, visitor(i))
+
+    def form_post(i):
+        data = {'message': _message(rng)}
+        return Request('POST', reverse('feedback_form', args=[links[i % len(links)]]), data, {}, visitor(i))
+
+    def ai_preview(i):
+        data = {'user_input': f'{_message(rng)} #{i}', 'generate_preview': ''}
+        return Request('POST', reverse('feedback_form', args=[links[i % len(links)]]), data, {}, visitor(i))
+
+    def dashboard(i):
+        return Request('GET', reverse('dashboard'), None, session, {})
+
+    def delete(i):
+        token = seed.delete_tokens[i % len(seed.delete_tokens)]
+        return Request('POST', reverse('delete_feedback', args=[token]), {}, {}, visitor(i))
+
+    def health(i):
+        return Request('GET', reverse('health_check'), None, {}, {})
+
+    return [
+        Scenario('feedback_form GET', form_get),
+        Scenario('feedback_form POST', form_post, expected=(302,)),
+        Scenario('feedback_form AI preview', ai_preview),
+        Scenario('dashboard', dashboard),
+        Scenario('delete_feedback POST', delete, expected=(302,)),
+        Scenario('health_check', health),
+    ]
+
+
+def summarize(name, driver, latencies, statuses, expected, elapsed):
+    """Machine-readable result of one scenario run; latencies in seconds"""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+
+    def percentile(percent):
+        return round(latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * percent / 100))], 3)
+
+    return {
+        'scenario': name,
+        'driver': driver,
+        'requests': len(latencies_ms),
+        'errors': sum(count for status, count in statuses.items() if status not in expected),
+        'status_codes': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'throughput_rps': round(len(latencies_ms) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies_ms), 3),
+            'p50': percentile(50),
+            'p90': percentile(90),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': round(latencies_ms[-1], 3),
+        } if latencies_ms else {},
+    }
+
+
+def run_client(scenario, count, offset=0):
+    """Drive scenario sequentially through the Django test client, in process"""
+    client = Client(HTTP_HOST='localhost')
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    for i in range(offset, offset + count):
+        request = scenario.build(i)
+        client.cookies.clear()
+        for name, value in request.cookies.items():
+            client.cookies[name] = value
+        start = time.perf_counter()
+        if request.method == 'POST':
+            response = client.post(request.path, request.data, headers=request.headers)
+        else:
+            response = client.get(request.path, headers=request.headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+    return summarize(scenario.name, 'client', latencies, statuses, scenario.expected, time.perf_counter() - started)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def live_server():
+    """Serve the project's WSGI application on a free local port, one thread per request"""
+    httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler)
+    httpd.set_app(get_internal_wsgi_application())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{httpd.server_port}'
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server_process(command, port, env=None, timeout=30):
+    """
+    Run a server command (e.g. runserver or uvicorn) in a subprocess from
+    the project directory and yield the Popen once it answers /health/.
+    """
+    import requests
+
+    # A file rather than a pipe, so a chatty server can never block on a full pipe
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR, env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL, stderr=log,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                log.seek(0)
+                raise RuntimeError(f"{command[0]} exited: {log.read().decode(errors='replace')[-2000:]}")
+            try:
+                requests.get(f'http://127.0.0.1:{port}{reverse("health_check")}', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{' '.join(command)} did not start within {timeout}s")
+                time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        log.close()
+
+
+def run_http(scenario, count, base_url, concurrency=8, offset=0):
+    """
+    Drive scenario over real HTTP with concurrency keep-alive clients. POSTs
+    carry a CSRF cookie and header, like a browser's would.
+    """
+    import requests
+
+    local = threading.local()
+    csrf_secret = get_random_string(CSRF_SECRET_LENGTH, allowed_chars=CSRF_ALLOWED_CHARS)
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return local.session
+
+    def send(i):
+        request = scenario.build(i)
+        http = session()
+        http.cookies.clear()
+        cookies, headers = request.cookies, request.headers
+        if request.method == 'POST':
+            cookies = dict(cookies, **{settings.CSRF_COOKIE_NAME: csrf_secret})
+            headers = dict(headers, **{'X-CSRFToken': csrf_secret})
+        start = time.perf_counter()
+        try:
+            response = http.request(
+                request.method, f'{base_url}{request.path}', data=request.data,
+                cookies=cookies, headers=headers, allow_redirects=False, timeout=60,
+            )
+            status = response.status_code
+        except requests.RequestException as exc:
+            status = type(exc).__name__
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(offset, offset + count)))
+    elapsed = time.perf_counter() - started
+    statuses = Counter(status for _, status in results)
+    return summarize(scenario.name, 'http', [latency for latency, _ in results], statuses, scenario.expected, elapsed)
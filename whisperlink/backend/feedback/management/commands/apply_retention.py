@@ -0,0 +1,61 @@
+import itertools
+from django.core.management.base import BaseCommand, CommandError
+from feedback.ai_service import ai_service
+from feedback.models import AnonymousFeedback
+from feedback.retention import (
+    SCRUBBED_FIELDS, archive_expired_feedback, expired_before, retention_policy, scrub_expired_field,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply FEEDBACK_RETENTION: clear expired IP addresses and original "
+        "input, then archive fully expired feedback. Works in batched "
+        "transactions; an interrupted run resumes where it stopped. Also "
+        "purges expired persistent AI response cache entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows have expired')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default: FEEDBACK_RETENTION BATCH_SIZE)')
+        parser.add_argument(
+            '--max-batches', type=int,
+            help='Stop each step after this many batches, to bound a run (default: no limit)',
+        )
+        parser.add_argument('--archive-to', choices=['table', 'jsonl'], help='Override FEEDBACK_RETENTION ARCHIVE_TO')
+
+    def handle(self, *args, **options):
+        policy = retention_policy()
+        batch_size = options['batch_size'] or policy['BATCH_SIZE']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        target = options['archive_to'] or policy['ARCHIVE_TO']
+
+        if ai_service.cache.persistent and not options['dry_run']:
+            self.stdout.write(f"AI response cache: purged {ai_service.cache.purge_expired()} expired entry(ies)")
+
+        for field, setting in SCRUBBED_FIELDS.items():
+            cutoff = expired_before(policy[setting])
+            if cutoff is None:
+                continue
+            if options['dry_run']:
+                count = AnonymousFeedback.objects.filter(submitted_at__lt=cutoff, **{f'{field}__isnull': False}).count()
+                self.stdout.write(f"{field}: {count} row(s) older than {policy[setting]} days would be cleared")
+                continue
+            batches = itertools.islice(scrub_expired_field(field, cutoff, batch_size), options['max_batches'])
+            self.stdout.write(f"{field}: cleared on {sum(batches)} row(s)")
+
+        cutoff = expired_before(policy['ARCHIVE_AFTER_DAYS'])
+        if cutoff is None:
+            return
+        if options['dry_run']:
+            count = AnonymousFeedback.objects.filter(submitted_at__lt=cutoff).count()
+            self.stdout.write(f"{count} row(s) older than {policy['ARCHIVE_AFTER_DAYS']} days would be archived")
+            return
+
+        batches = archive_expired_feedback(cutoff, batch_size, target, policy['ARCHIVE_DIR'])
+        archived = 0
+        for archived_batch in itertools.islice(batches, options['max_batches']):
+            archived += archived_batch
+            self.stdout.write(f"Archived {archived} row(s) so far")
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} row(s) to {target}."))
@@ -0,0 +1,54 @@
+import time
+import requests
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from feedback.ai_service import LatencyStats, TogetherAIService
+from feedback.stub_server import FakeTogetherServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the Together AI HTTP client against a local stub server: "
+        "a new connection per call (the old behaviour) versus the pooled "
+        "session, with and without hedging. The stub speaks plain HTTP, so "
+        "the TLS handshake saved against the real API is not included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Calls per scenario (default: 200)')
+        parser.add_argument('--latency', type=float, default=0.005, help='Typical stub latency in seconds')
+        parser.add_argument('--slow-fraction', type=float, default=0.05, help='Fraction of slow stub responses')
+        parser.add_argument('--slow-latency', type=float, default=0.25, help='Latency of slow stub responses')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'scenario':<18} {'p50 ms':>8} {'p99 ms':>8} {'hedged':>7} {'connections':>12}")
+        self.run_scenario('unpooled', options, pooled=False)
+        self.run_scenario('pooled', options, pooled=True)
+        self.run_scenario('pooled + hedge p95', options, pooled=True, hedge_percentile=95)
+
+    def run_scenario(self, name, options, pooled, hedge_percentile=None):
+        stub = FakeTogetherServer(
+            latency=options['latency'],
+            slow_fraction=options['slow_fraction'],
+            slow_latency=options['slow_latency'],
+        )
+        with stub:
+            http_config = {'HEDGE_PERCENTILE': hedge_percentile, 'HEDGE_MIN_SAMPLES': 20}
+            with override_settings(TOGETHER_API_KEY='bench-key', TOGETHER_API_URL=stub.url, AI_HTTP=http_config):
+                service = TogetherAIService()
+
+            stats = LatencyStats()
+            for i in range(options['calls']):
+                start = time.perf_counter()
+                if pooled:
+                    service._request_generation(f'benchmark input {i}', 'bench')
+                else:
+                    headers, data = service._build_request(f'benchmark input {i}', 'bench')
+                    requests.post(stub.url, headers=headers, json=data, timeout=30).json()
+                stats.record(time.perf_counter() - start)
+
+        snapshot = stats.snapshot()
+        self.stdout.write(
+            f"{name:<18} {snapshot['p50_ms']:>8.2f} {snapshot['p99_ms']:>8.2f} "
+            f"{service.latency.hedged:>7} {stub.connections:>12}"
+        )
@@ -0,0 +1,189 @@
+import importlib.util
+import json
+import shlex
+import sys
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from feedback.loadtest import build_scenarios, cleanup_seed_data, free_port, run_http, seed_data, server_process
+from feedback.stub_server import FakeTogetherServer
+
+# Scenarios driven for requests/sec; the write flows are left to bench_flows
+THROUGHPUT_SCENARIOS = ('feedback_form GET', 'dashboard', 'health_check')
+
+DEFAULT_COMMANDS = {
+    # Django's threaded WSGI server: one thread per connection
+    'wsgi': f'{sys.executable} manage.py runserver --noreload --skip-checks 127.0.0.1:{{port}}',
+    'asgi': (
+        f'{sys.executable} -m uvicorn whisperlink_backend.asgi:application '
+        '--host 127.0.0.1 --port {port} --no-access-log --log-level warning'
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the project served over WSGI and over ASGI: requests/sec on "
+        "the hot read views, and server memory per concurrent connection "
+        "while many streaming AI previews are held open. Each server runs in "
+        "a subprocess against seeded data in the configured database, which "
+        "must be local unless --allow-remote is passed. The ASGI default "
+        "needs uvicorn and memory sampling needs psutil."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Seeded users (default: 50)')
+        parser.add_argument('--feedback', type=int, default=5000, help='Seeded feedback rows (default: 5000)')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per throughput scenario (default: 500)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients for throughput (default: 16)')
+        parser.add_argument(
+            '--connections', type=int, default=200,
+            help='Streaming previews held open at once for the memory test (default: 200)',
+        )
+        parser.add_argument('--hold', type=float, default=3.0, help='Seconds each preview stream stays open (default: 3)')
+        parser.add_argument('--modes', default='wsgi,asgi', help='Comma-separated modes to run (default: wsgi,asgi)')
+        parser.add_argument('--wsgi-cmd', default=DEFAULT_COMMANDS['wsgi'], help='WSGI server command; {port} is filled in')
+        parser.add_argument('--asgi-cmd', default=DEFAULT_COMMANDS['asgi'], help='ASGI server command; {port} is filled in')
+        parser.add_argument('--output', '-o', help='Write the results as JSON to this file')
+        parser.add_argument(
+            '--allow-remote', action='store_true',
+            help='Allow seeding and cleaning up a database that is not on this machine',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import psutil
+        except ImportError:
+            raise CommandError("bench_asgi needs psutil to sample server memory (pip install psutil).")
+        modes = [mode.strip() for mode in options['modes'].split(',')]
+        if set(modes) - set(DEFAULT_COMMANDS):
+            raise CommandError(f"--modes must be a subset of {','.join(DEFAULT_COMMANDS)}.")
+        if (
+            'asgi' in modes and options['asgi_cmd'] == DEFAULT_COMMANDS['asgi']
+            and importlib.util.find_spec('uvicorn') is None
+        ):
+            raise CommandError("The default ASGI server is uvicorn (pip install uvicorn), or pass --asgi-cmd.")
+
+        self.stderr.write(f"Seeding {options['users']} users and {options['feedback']} feedback rows...")
+        seed = seed_data(options['users'], options['feedback'], delete_pool=0, allow_remote=options['allow_remote'])
+        tokens = ('Thanks', ' for', ' the', ' feedback', '!')
+        stub = FakeTogetherServer(tokens=tokens, token_delay=options['hold'] / len(tokens))
+
+        results = {}
+        try:
+            scenarios = [scenario for scenario in build_scenarios(seed) if scenario.name in THROUGHPUT_SCENARIOS]
+            links = [profile.unique_link for profile in seed.profiles]
+            with stub:
+                for mode in modes:
+                    port = free_port()
+                    command = shlex.split(options[f'{mode}_cmd'].format(port=port))
+                    env = {'TOGETHER_API_URL': stub.url, 'TOGETHER_API_KEY': 'bench-key'}
+                    self.stderr.write(f"Starting {mode} server: {' '.join(command)}")
+                    with server_process(command, port, env) as process:
+                        base_url = f'http://127.0.0.1:{port}'
+                        throughput = [
+                            run_http(scenario, options['requests'], base_url, options['concurrency'])
+                            for scenario in scenarios
+                        ]
+                        memory = self.measure_memory(
+                            psutil.Process(process.pid), base_url, links, options['connections'], options['hold'],
+                        )
+                    results[mode] = {'command': command, 'throughput': throughput, 'memory': memory}
+        finally:
+            cleanup_seed_data(options['allow_remote'])
+
+        self.print_table(results)
+        if options['output']:
+            report = {
+                'meta': {
+                    'timestamp': timezone.now().isoformat(),
+                    'database': connection.vendor,
+                    'options': {
+                        name: options[name]
+                        for name in ('users', 'feedback', 'requests', 'concurrency', 'connections', 'hold')
+                    },
+                },
+                'results': results,
+            }
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+                output.write('\n')
+            self.stderr.write(f"Wrote results to {options['output']}")
+
+    def measure_memory(self, process, base_url, links, connections, hold):
+        """
+        Hold connections streaming previews open at once and sample the
+        server's RSS and thread count until they finish. The growth over the
+        idle server, divided by the streams that completed, is the memory per
+        connection; servers with a short accept backlog may refuse some.
+        """
+        import requests
+        from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+        from django.utils.crypto import get_random_string
+
+        secret = get_random_string(CSRF_SECRET_LENGTH, allowed_chars=CSRF_ALLOWED_CHARS)
+        idle_rss = process.memory_info().rss
+        idle_threads = process.num_threads()
+        completed = []
+        started = threading.Barrier(connections + 1)
+
+        def stream(i):
+            started.wait()
+            try:
+                response = requests.post(
+                    f"{base_url}{reverse('stream_preview', args=[links[i % len(links)]])}",
+                    data={'user_input': f'memory test {i} {time.time_ns()}'},
+                    cookies={settings.CSRF_COOKIE_NAME: secret},
+                    headers={'X-CSRFToken': secret, 'X-Forwarded-For': f'10.201.{i // 250}.{i % 250 + 1}'},
+                    timeout=hold * 10 + 30,
+                )
+                completed.append(response.status_code == 200 and 'event: done' in response.text)
+            except requests.RequestException:
+                completed.append(False)
+
+        clients = [threading.Thread(target=stream, args=(i,), daemon=True) for i in range(connections)]
+        for client in clients:
+            client.start()
+        started.wait()
+
+        peak_rss, peak_threads = idle_rss, idle_threads
+        while any(client.is_alive() for client in clients):
+            peak_rss = max(peak_rss, process.memory_info().rss)
+            peak_threads = max(peak_threads, process.num_threads())
+            time.sleep(0.05)
+        for client in clients:
+            client.join()
+
+        return {
+            'connections': connections,
+            'completed': sum(completed),
+            'idle_rss_mb': round(idle_rss / 2 ** 20, 1),
+            'peak_rss_mb': round(peak_rss / 2 ** 20, 1),
+            'kb_per_connection': round((peak_rss - idle_rss) / 1024 / max(sum(completed), 1), 1),
+            'idle_threads': idle_threads,
+            'peak_threads': peak_threads,
+        }
+
+    def print_table(self, results):
+        self.stdout.write(f"{'mode':<6} {'scenario':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for mode, result in results.items():
+            for row in result['throughput']:
+                self.stdout.write(
+                    f"{mode:<6} {row['scenario']:<20} {row['throughput_rps']:>9.1f} "
+                    f"{row['latency_ms']['p50']:>8.2f} {row['latency_ms']['p95']:>8.2f} {row['errors']:>7}"
+                )
+        self.stdout.write(
+            f"\n{'mode':<6} {'open streams':>12} {'completed':>10} {'idle MB':>8} {'peak MB':>8} "
+            f"{'KB/conn':>8} {'threads':>10}"
+        )
+        for mode, result in results.items():
+            memory = result['memory']
+            self.stdout.write(
+                f"{mode:<6} {memory['connections']:>12} {memory['completed']:>10} {memory['idle_rss_mb']:>8.1f} "
+                f"{memory['peak_rss_mb']:>8.1f} {memory['kb_per_connection']:>8.1f} "
+                f"{memory['idle_threads']:>4} -> {memory['peak_threads']:<4}"
+            )
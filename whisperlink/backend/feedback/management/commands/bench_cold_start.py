@@ -0,0 +1,39 @@
+import statistics
+from django.core.management.base import BaseCommand, CommandError
+from feedback.coldstart import run_cold_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start time to first byte of the WSGI entry point over "
+        "several fresh interpreters and fail if the median exceeds a budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Number of cold starts (default: 5)')
+        parser.add_argument('--path', default='/', help='Path of the first request (default: /)')
+        parser.add_argument(
+            '--budget-ms', type=float, default=1500,
+            help='Fail when the median process wall time exceeds this (default: 1500)',
+        )
+
+    def handle(self, *args, **options):
+        walls, imports, requests = [], [], []
+        for run in range(options['runs']):
+            wall_ms, timings, _ = run_cold_start(options['path'])
+            walls.append(wall_ms)
+            imports.append(timings['import_ms'])
+            requests.append(timings['first_request_ms'])
+            self.stdout.write(
+                f"run {run + 1}: {wall_ms:7.1f} ms total, {timings['import_ms']:7.1f} ms import, "
+                f"{timings['first_request_ms']:7.1f} ms first request ({timings['status']})"
+            )
+
+        median = statistics.median(walls)
+        self.stdout.write(
+            f"median: {median:.1f} ms total, {statistics.median(imports):.1f} ms import, "
+            f"{statistics.median(requests):.1f} ms first request"
+        )
+        if median > options['budget_ms']:
+            raise CommandError(f"Cold start median {median:.1f} ms exceeds the {options['budget_ms']:.0f} ms budget.")
+        self.stdout.write(self.style.SUCCESS(f"Within the {options['budget_ms']:.0f} ms budget."))
@@ -0,0 +1,66 @@
+import statistics
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from feedback.models import AnonymousFeedback
+from feedback.utils import attach_user, resolve_view
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark dashboard render time against growing inbox sizes. "
+        "Seed data is written inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='100,1000,10000',
+            help='Comma-separated inbox sizes to benchmark (default: 100,1000,10000)',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of timed renders per inbox size (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        factory = RequestFactory()
+        dashboard = resolve_view('/dashboard/')
+
+        self.stdout.write(f"{'inbox size':>12} {'queries':>8} {'median ms':>10} {'p95 ms':>8} {'html KB':>8}")
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench_dashboard_user')
+            profile = user.userprofile
+            seeded = 0
+
+            for size in sizes:
+                AnonymousFeedback.objects.bulk_create(
+                    [
+                        AnonymousFeedback(recipient=profile, message=f'Benchmark feedback {i}')
+                        for i in range(seeded, size)
+                    ],
+                    batch_size=1000,
+                )
+                seeded = max(seeded, size)
+
+                request = attach_user(factory.get('/dashboard/', HTTP_HOST='localhost'), user)
+                request.session = {}
+
+                timings = []
+                for _ in range(options['repeat']):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = dashboard(request)
+                        timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f"{seeded:>12} {len(queries):>8} {statistics.median(timings):>10.2f} "
+                    f"{p95:>8.2f} {len(response.content) / 1024:>8.1f}"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,90 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+def request_cycle(wrapper):
+    """
+    What Django does to a connection around one request that runs a query:
+    close_old_connections() on request_started, the query, and again on
+    request_finished
+    """
+    wrapper.close_if_unusable_or_obsolete()
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    wrapper.close_if_unusable_or_obsolete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request cost of getting a database connection for "
+        "each connection strategy: a new connection per request "
+        "(CONN_MAX_AGE=0, the old setting), persistent connections with and "
+        "without health checks, and psycopg 3's pool when it is installed. "
+        "Every request runs SELECT 1, so the difference is the connection "
+        "setup (TCP, TLS, authentication). Point it at the real database host "
+        "to see TLS costs; a local server mostly shows the TCP and auth part."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per strategy (default: 200)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to connect with')
+
+    def handle(self, *args, **options):
+        base = connections[options['database']].settings_dict
+        if base['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError("Connection strategies are only compared on PostgreSQL.")
+        options_without_pool = {name: value for name, value in base['OPTIONS'].items() if name != 'pool'}
+
+        strategies = [
+            ('new connection per request', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}, options_without_pool),
+            ('persistent', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': False}, options_without_pool),
+            ('persistent + health checks', {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True}, options_without_pool),
+        ]
+        from django.db.backends.postgresql.base import is_psycopg3
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            psycopg_pool = None
+        if is_psycopg3 and psycopg_pool:
+            strategies.append((
+                'psycopg pool',
+                {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+                dict(options_without_pool, pool={'min_size': 1, 'max_size': 2}),
+            ))
+        else:
+            self.stderr.write("Skipping the psycopg pool: it needs psycopg 3 and psycopg[pool].")
+
+        self.stdout.write(f"{'strategy':<30} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'connects':>9}")
+        for name, overrides, db_options in strategies:
+            wrapper = connections.create_connection(options['database'])
+            wrapper.settings_dict.update(overrides, OPTIONS=db_options)
+            connects = []
+
+            def count_connect(sender, connection, **kwargs):
+                if connection is wrapper:
+                    connects.append(1)
+
+            connection_created.connect(count_connect)
+            try:
+                request_cycle(wrapper)  # warm-up, e.g. opens the pool
+                connects.clear()
+                latencies = []
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    request_cycle(wrapper)
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connection_created.disconnect(count_connect)
+                wrapper.close()
+                if getattr(wrapper, 'pool', None) is not None:
+                    wrapper.close_pool()
+
+            latencies.sort()
+            self.stdout.write(
+                f"{name:<30} {statistics.fmean(latencies):>8.3f} {latencies[len(latencies) // 2]:>8.3f} "
+                f"{latencies[int(len(latencies) * 0.95)]:>8.3f} {len(connects):>9}"
+            )
@@ -0,0 +1,110 @@
+import logging
+import time
+import psycopg2
+from django.core.management.base import BaseCommand
+from django.db import utils as db_utils
+from django.test import RequestFactory
+from feedback.health import db_health, is_database_error
+from feedback.middleware import DatabaseErrorMiddleware
+
+# The message-scanning classifier DatabaseErrorMiddleware used before, kept
+# here as the baseline
+LEGACY_INDICATORS = [
+    'connection to server',
+    'server closed the connection',
+    'timeout while waiting',
+    'scram exchange',
+    'connection failed',
+    'operationalerror',
+    'database connection',
+    'connection reset'
+]
+
+
+def legacy_is_database_error(exception):
+    if any(indicator in str(exception).lower() for indicator in LEGACY_INDICATORS):
+        return True
+    current = exception
+    while current.__cause__ or current.__context__:
+        current = current.__cause__ or current.__context__
+        if current and any(indicator in str(current).lower() for indicator in LEGACY_INDICATORS):
+            return True
+    return False
+
+
+def chained(*exceptions):
+    """Link exceptions so each was raised while handling the next; returns the first"""
+    for outer, inner in zip(exceptions, exceptions[1:]):
+        outer.__context__ = inner
+    return exceptions[0]
+
+
+def connection_refused():
+    """A Django OperationalError raised from the driver's, as the ORM raises it"""
+    message = (
+        'connection to server at "db.internal" (10.0.0.5), port 5432 failed: Connection refused\n'
+        '\tIs the server running on that host and accepting TCP/IP connections?'
+    )
+    error = db_utils.OperationalError(message)
+    error.__cause__ = psycopg2.OperationalError(message)
+    return error
+
+
+def cycle():
+    first, second = KeyError('first'), ValueError('second')
+    first.__context__, second.__context__ = second, first
+    return first
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the database error path: classifying an exception as a "
+        "database connectivity error (type-based classifier vs the old "
+        "message scan) for typical exception shapes, and the whole "
+        "DatabaseErrorMiddleware path that answers with the 503 page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000, help='Calls per case (default: 20000)')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        cases = [
+            ('connection refused (wrapped)', connection_refused(), True),
+            ('ValueError, 10 KB message', ValueError('x' * 10240), True),
+            ('non-DB chain of 3', chained(KeyError('a'), TypeError('b'), ValueError('c' * 2048)), True),
+            ('non-DB chain of 50', chained(*[RuntimeError(f'link {i}') for i in range(50)]), True),
+            # The old scan follows a cyclic chain forever
+            ('cyclic chain', cycle(), False),
+        ]
+
+        self.stdout.write(f"{'case':<30} {'legacy µs':>10} {'typed µs':>10} {'speedup':>8}")
+        for name, exception, legacy_terminates in cases:
+            typed = self.time_per_call(is_database_error, exception, iterations)
+            if legacy_terminates:
+                legacy = self.time_per_call(legacy_is_database_error, exception, iterations)
+                self.stdout.write(f"{name:<30} {legacy:>10.2f} {typed:>10.2f} {legacy / typed:>7.1f}x")
+            else:
+                self.stdout.write(f"{name:<30} {'hangs':>10} {typed:>10.2f} {'':>8}")
+
+        error = connection_refused()
+
+        middleware = DatabaseErrorMiddleware(lambda request: None)
+        request = RequestFactory().get('/dashboard/')
+        logging.disable(logging.ERROR)
+        try:
+            responses = min(iterations, 2000)
+            start = time.perf_counter()
+            for _ in range(responses):
+                middleware.process_exception(request, error)
+            per_response = (time.perf_counter() - start) / responses * 1e6
+        finally:
+            logging.disable(logging.NOTSET)
+            db_health.reset()
+        self.stdout.write(f"\nDatabaseErrorMiddleware, 503 response: {per_response:.1f} µs/request")
+
+    def time_per_call(self, classify, exception, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            classify(exception)
+        return (time.perf_counter() - start) / iterations * 1e6
@@ -0,0 +1,69 @@
+import time
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from feedback.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from feedback.models import AnonymousFeedback
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark streaming feedback exports: rows per second and peak Python "
+        "memory while draining the export, for growing inbox sizes. Peak "
+        "memory should stay flat as the row count grows. Seed data is written "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10000,50000,200000',
+            help='Comma-separated inbox sizes to benchmark (default: 10000,50000,200000)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        server_side = not connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+        self.stdout.write(f"Reading with {'server-side cursors' if server_side else 'keyset batches'}, "
+                          f"chunk size {options['chunk_size']}")
+        self.stdout.write(f"{'rows':>10} {'format':>6} {'rows/s':>10} {'MB/s':>7} {'peak KB':>8}")
+
+        with transaction.atomic():
+            profile = User.objects.create_user(username='bench_export_user').userprofile
+            seeded = 0
+            for size in sizes:
+                AnonymousFeedback.objects.bulk_create(
+                    [
+                        AnonymousFeedback(
+                            recipient=profile,
+                            message=f'Benchmark feedback {i}, with a comma and "quotes"',
+                            is_ai_generated=i % 3 == 0,
+                            original_input=f'raw thoughts {i}' if i % 3 == 0 else None,
+                        )
+                        for i in range(seeded, size)
+                    ],
+                    batch_size=5000,
+                )
+                seeded = max(seeded, size)
+
+                for fmt in sorted(EXPORT_FORMATS):
+                    queryset = AnonymousFeedback.objects.filter(recipient=profile)
+                    start = time.perf_counter()
+                    written = self.drain(queryset, fmt, options['chunk_size'])
+                    elapsed = time.perf_counter() - start
+
+                    # Memory is traced in a second pass; tracing slows the export down
+                    tracemalloc.start()
+                    self.drain(queryset, fmt, options['chunk_size'])
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    self.stdout.write(
+                        f"{seeded:>10} {fmt:>6} {seeded / elapsed:>10.0f} "
+                        f"{written / elapsed / 1e6:>7.1f} {peak / 1024:>8.0f}"
+                    )
+
+            transaction.set_rollback(True)
+
+    def drain(self, queryset, fmt, chunk_size):
+        return sum(len(line) for line in export_lines(queryset, fmt, chunk_size=chunk_size))
@@ -0,0 +1,171 @@
+import json
+import platform
+import subprocess
+import time
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from feedback.loadtest import (
+    build_scenarios, cleanup_seed_data, fake_ai_service, live_server, run_client, run_http, seed_data,
+)
+from feedback.models import AIPreviewJob
+
+# Limits high enough that the limiter still runs on every POST but never
+# rejects the benchmark's traffic
+UNTHROTTLED = {'ip': (10 ** 9, 60), 'link': (10 ** 9, 60)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the end-to-end feedback flows (feedback form GET/POST, AI "
+        "preview, dashboard, delete_feedback, health check) against seeded "
+        "data in the configured database (which must be local unless "
+        "--allow-remote is passed), through the Django test client "
+        "and/or a concurrent HTTP driver. The Together AI API is replaced by "
+        "a local stub. Seeded users are removed afterwards. Writes JSON "
+        "results with --output; compare two runs with --baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Seeded users (default: 100)')
+        parser.add_argument('--feedback', type=int, default=20000, help='Seeded feedback rows (default: 20000)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and driver (default: 200)')
+        parser.add_argument(
+            '--driver', choices=['client', 'http', 'both'], default='both',
+            help='Test client (in process, sequential), HTTP (live server, concurrent) or both (default)',
+        )
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent HTTP clients (default: 8)')
+        parser.add_argument(
+            '--url',
+            help='Base URL of an already running server using the same database, e.g. gunicorn '
+                 '(default: an in-process server, which shares the GIL with the HTTP driver)',
+        )
+        parser.add_argument('--ai-latency', type=float, default=0.2, help='Stub AI API latency in seconds (default: 0.2)')
+        parser.add_argument('--scenarios', help='Comma-separated scenario names to run (default: all)')
+        parser.add_argument('--output', '-o', help='Write the results as JSON to this file')
+        parser.add_argument(
+            '--allow-remote', action='store_true',
+            help='Allow seeding and cleaning up a database that is not on this machine',
+        )
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['users'] < 1:
+            raise CommandError("--requests and --users must be at least 1.")
+        drivers = ['client', 'http'] if options['driver'] == 'both' else [options['driver']]
+
+        self.stderr.write(f"Seeding {options['users']} users and {options['feedback']} feedback rows...")
+        start = time.perf_counter()
+        seed = seed_data(
+            options['users'], options['feedback'],
+            delete_pool=options['requests'] * len(drivers), seed=options['seed'],
+            allow_remote=options['allow_remote'],
+        )
+        seed_seconds = time.perf_counter() - start
+
+        results = []
+        try:
+            scenarios = build_scenarios(seed, options['seed'])
+            if options['scenarios']:
+                wanted = {name.strip() for name in options['scenarios'].split(',')}
+                scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+                if not scenarios:
+                    raise CommandError(f"No scenario matches {options['scenarios']!r}.")
+
+            with override_settings(FEEDBACK_RATE_LIMITS=UNTHROTTLED), fake_ai_service(options['ai_latency']):
+                for offset, driver in enumerate(drivers):
+                    results += self.run_driver(driver, scenarios, options, offset * options['requests'])
+                self.wait_for_preview_jobs(seed)
+        finally:
+            cleanup_seed_data(options['allow_remote'])
+
+        report = {
+            'meta': self.metadata(options, seed_seconds),
+            'results': results,
+        }
+        self.print_table(results)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline:
+                self.print_comparison(json.load(baseline), results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+                output.write('\n')
+            self.stderr.write(f"Wrote results to {options['output']}")
+
+    def run_driver(self, driver, scenarios, options, offset):
+        if driver == 'client':
+            return [run_client(scenario, options['requests'], offset) for scenario in scenarios]
+        if options['url']:
+            return self.run_http_scenarios(options['url'].rstrip('/'), scenarios, options, offset)
+        with live_server() as base_url:
+            return self.run_http_scenarios(base_url, scenarios, options, offset)
+
+    def run_http_scenarios(self, base_url, scenarios, options, offset):
+        return [
+            run_http(scenario, options['requests'], base_url, options['concurrency'], offset)
+            for scenario in scenarios
+        ]
+
+    def wait_for_preview_jobs(self, seed, timeout=60):
+        """Let queued AI previews finish before their recipients are deleted"""
+        pending = AIPreviewJob.objects.filter(
+            recipient__in=seed.profiles, status=AIPreviewJob.STATUS_PENDING,
+        )
+        deadline = time.monotonic() + timeout
+        while pending.exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def metadata(self, options, seed_seconds):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'git_commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed_seconds': round(seed_seconds, 2),
+            'options': {
+                name: options[name]
+                for name in ('users', 'feedback', 'requests', 'driver', 'concurrency', 'url', 'ai_latency', 'seed')
+            },
+        }
+
+    def print_table(self, results):
+        self.stdout.write(
+            f"{'scenario':<26} {'driver':<7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for result in results:
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{result['scenario']:<26} {result['driver']:<7} {result['throughput_rps']:>9.1f} "
+                f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} {result['errors']:>7}"
+            )
+
+    def print_comparison(self, baseline, results):
+        """Percent change of each result against the baseline run's matching scenario"""
+        earlier = {(result['scenario'], result['driver']): result for result in baseline['results']}
+        self.stdout.write(f"\n{'vs baseline':<26} {'driver':<7} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+
+        for result in results:
+            old = earlier.get((result['scenario'], result['driver']))
+            if old is None:
+                continue
+            self.stdout.write(
+                f"{result['scenario']:<26} {result['driver']:<7} "
+                f"{change(result['throughput_rps'], old['throughput_rps']):>9} "
+                + ' '.join(
+                    f"{change(result['latency_ms'][p], old['latency_ms'][p]):>8}" for p in ('p50', 'p95', 'p99')
+                )
+            )
@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from feedback.decorators import rate_limited
+from feedback.ratelimit import CacheBackend, MemoryBackend, SlidingWindowLimiter
+from feedback import decorators
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of the feedback rate limiter: the "
+        "raw sliding-window check for each backend and the full decorator on "
+        "a no-op view. The budget is 100µs per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000, help='Requests per run (default: 100000)')
+        parser.add_argument('--clients', type=int, default=5000, help='Distinct client IPs (default: 5000)')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        clients = options['clients']
+        ips = [f'10.{i // 65536}.{i // 256 % 256}.{i % 256}' for i in range(clients)]
+        # High limits so the benchmark measures the accounting, not rejections
+        limits = {'ip': (10 ** 9, 60), 'link': (10 ** 9, 60)}
+
+        for name, backend in [('memory', MemoryBackend()), ('cache (default alias)', CacheBackend())]:
+            limiter = SlidingWindowLimiter(backend)
+            start = time.perf_counter()
+            for i in range(total):
+                limiter.hit(f'ip:{ips[i % clients]}', *limits['ip'])
+                limiter.hit('link:bench', *limits['link'])
+            self.report(f'limiter, {name} backend', (time.perf_counter() - start) / total)
+            backend.clear()
+
+        factory = RequestFactory()
+        requests = [factory.post('/feedback/x/', REMOTE_ADDR=ip) for ip in ips]
+        view = rate_limited()(lambda request, link_id: None)
+        original = decorators.limiter
+        decorators.limiter = SlidingWindowLimiter(MemoryBackend())
+        try:
+            with override_settings(FEEDBACK_RATE_LIMITS=limits):
+                start = time.perf_counter()
+                for i in range(total):
+                    view(requests[i % clients], link_id='bench')
+                self.report('decorator, memory backend', (time.perf_counter() - start) / total)
+        finally:
+            decorators.limiter = original
+
+    def report(self, label, seconds_per_request):
+        micros = seconds_per_request * 1e6
+        style = self.style.SUCCESS if micros < 100 else self.style.ERROR
+        self.stdout.write(style(f"{label:<40} {micros:8.2f} µs/request"))
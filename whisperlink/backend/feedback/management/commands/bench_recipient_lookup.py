@@ -0,0 +1,68 @@
+import statistics
+import time
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from feedback.recipients import recipient_cache
+from feedback.utils import attach_user, resolve_view
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the feedback link request path (feedback form GET and "
+        "WhatsApp share) with a cold and a hot recipient cache, counting the "
+        "queries that touch the recipient's profile or user. The page cache is "
+        "disabled so every request runs the view. Seed data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Requests per scenario (default: 200)')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        self.stdout.write(f"{'scenario':<10} {'recipient queries/req':>22} {'median ms':>10} {'p95 ms':>8}")
+
+        with override_settings(PAGE_CACHE={}), transaction.atomic():
+            link = User.objects.create_user(username='bench_recipient_user').userprofile.unique_link
+            views = []
+            for path in (f'/feedback/{link}/', f'/share-whatsapp/{link}/'):
+                request = attach_user(factory.get(path, HTTP_HOST='localhost'), AnonymousUser())
+                views.append((resolve_view(path), request))
+
+            hot_queries = None
+            for scenario in ('cold', 'hot'):
+                recipient_cache.clear()
+                if scenario == 'hot':
+                    recipient_cache.get(link)
+
+                timings, recipient_queries = [], 0
+                for _ in range(options['repeat']):
+                    if scenario == 'cold':
+                        recipient_cache.invalidate(link)
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        for view, request in views:
+                            view(request, link_id=link)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    recipient_queries += sum(
+                        'feedback_userprofile' in query['sql'] or 'auth_user' in query['sql']
+                        for query in queries.captured_queries
+                    )
+
+                timings.sort()
+                per_request = recipient_queries / (options['repeat'] * len(views))
+                if scenario == 'hot':
+                    hot_queries = recipient_queries
+                self.stdout.write(
+                    f"{scenario:<10} {per_request:>22.2f} {statistics.median(timings):>10.3f} "
+                    f"{timings[int(len(timings) * 0.95)]:>8.3f}"
+                )
+
+            recipient_cache.clear()
+            transaction.set_rollback(True)
+
+        if hot_queries:
+            raise CommandError(f"The hot link path ran {hot_queries} recipient queries; expected none.")
+        self.stdout.write(self.style.SUCCESS("The hot link path runs no recipient queries."))
@@ -0,0 +1,98 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from feedback.models import UserProfile
+from feedback.pagination import paginate_feedback
+from feedback.utils import attach_user, resolve_view
+
+
+# PostgreSQL reports "Seq Scan", SQLite reports "SCAN <table>" without "USING"
+FULL_SCAN_PATTERN = re.compile(r'Seq Scan|^\s*SCAN \S+$', re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the read paths of the feedback views against a sample inbox "
+        "and print the EXPLAIN plan of every query they issue. Plans that fall "
+        "back to a full table scan are flagged. Note that PostgreSQL may still "
+        "prefer a sequential scan on very small tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Recipient whose inbox is used for the sample requests (default: the largest inbox)',
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Run EXPLAIN ANALYZE (PostgreSQL only, executes each query)',
+        )
+
+    def handle(self, *args, **options):
+        profile = self.get_profile(options['username'])
+        feedback = profile.received_feedback.first()
+        if feedback is None:
+            raise CommandError(f"{profile.user.username} has no feedback to sample; seed some first.")
+        _, cursor = paginate_feedback(profile.received_feedback.all(), page_size=1)
+
+        view_calls = [
+            ('dashboard', {}, {}),
+            ('dashboard_feed', {}, {'cursor': cursor} if cursor else {}),
+            ('feedback_form', {'link_id': profile.unique_link}, {}),
+            ('profile_settings', {}, {}),
+            ('delete_feedback', {'delete_token': feedback.delete_token}, {}),
+            ('delete_received_feedback', {'feedback_id': feedback.id}, {}),
+        ]
+
+        factory = RequestFactory()
+        full_scans = 0
+        for url_name, kwargs, params in view_calls:
+            path = reverse(url_name, kwargs=kwargs)
+            view = resolve_view(path)
+            request = attach_user(factory.get(path, params, HTTP_HOST='localhost'), profile.user)
+            request.session = {}
+
+            with CaptureQueriesContext(connection) as queries:
+                view(request, **kwargs)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {url_name} =="))
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT') or sql.strip() == 'SELECT 1':
+                    continue
+                plan = self.explain(sql, options['analyze'])
+                self.stdout.write(sql)
+                if FULL_SCAN_PATTERN.search(plan):
+                    full_scans += 1
+                    self.stdout.write(self.style.WARNING(plan))
+                else:
+                    self.stdout.write(self.style.SUCCESS(plan))
+                self.stdout.write('')
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING(f"{full_scans} query plan(s) use a full table scan."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All query plans use an index."))
+
+    def get_profile(self, username):
+        if username:
+            try:
+                return UserProfile.objects.get(user__username=username)
+            except UserProfile.DoesNotExist:
+                raise CommandError(f"No profile found for user {username!r}.")
+
+        profile = UserProfile.objects.order_by('-feedback_count').first()
+        if profile is None:
+            raise CommandError("No user profiles exist yet.")
+        return profile
+
+    def explain(self, sql, analyze):
+        explain_options = {'analyze': True} if analyze else {}
+        prefix = connection.ops.explain_query_prefix(**explain_options)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}")
+            rows = cursor.fetchall()
+        return '\n'.join(str(row[-1]) for row in rows)
@@ -0,0 +1,43 @@
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from feedback.export import ADMIN_EXPORT_FIELDS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from feedback.models import AnonymousFeedback, UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream received feedback to a CSV or JSONL file (or stdout) in "
+        "constant memory. Exports everything unless --username is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', help='Output format (default: csv)')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--username', help='Only export feedback received by this user')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched per round trip (default: {EXPORT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        queryset = AnonymousFeedback.objects.all()
+        if options['username']:
+            if not UserProfile.objects.filter(user__username=options['username']).exists():
+                raise CommandError(f"No profile found for user {options['username']!r}.")
+            queryset = queryset.filter(recipient__user__username=options['username'])
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        start = time.perf_counter()
+        lines = 0
+        try:
+            for line in export_lines(queryset, options['format'], ADMIN_EXPORT_FIELDS, options['chunk_size']):
+                output.write(line)
+                lines += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        rows = lines - 1 if options['format'] == 'csv' else lines
+        elapsed = time.perf_counter() - start
+        self.stderr.write(f"Exported {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s).")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from feedback.coldstart import run_cold_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold-start the WSGI entry point in a fresh interpreter with "
+        "-X importtime and report the slowest module imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Path of the first request (default: /)')
+        parser.add_argument('--top', type=int, default=25, help='Number of modules to list (default: 25)')
+        parser.add_argument(
+            '--sort', choices=['cumulative', 'self'], default='cumulative',
+            help='Rank by cumulative time (module and its imports) or self time',
+        )
+        parser.add_argument(
+            '--package', default='',
+            help='Only list modules whose name starts with this prefix, e.g. feedback',
+        )
+
+    def handle(self, *args, **options):
+        wall_ms, timings, stderr = run_cold_start(options['path'], python_flags=('-X', 'importtime'))
+
+        modules = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            if name.startswith(options['package']):
+                modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+
+        key = 2 if options['sort'] == 'cumulative' else 1
+        modules.sort(key=lambda module: module[key], reverse=True)
+
+        self.stdout.write(f"{'module':<60} {'self ms':>9} {'cumul. ms':>10}")
+        for name, self_ms, cumulative_ms in modules[:options['top']]:
+            self.stdout.write(f"{name:<60} {self_ms:>9.1f} {cumulative_ms:>10.1f}")
+
+        self.stdout.write('')
+        self.stdout.write(
+            f"Process wall time {wall_ms:.0f} ms: import {timings['import_ms']:.0f} ms, "
+            f"first request {timings['first_request_ms']:.0f} ms ({timings['status']}). "
+            f"Timings are inflated by -X importtime; use bench_cold_start for real numbers."
+        )
@@ -0,0 +1,85 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from feedback.models import ArchivedFeedback, UserProfile
+
+
+def month_start(day, offset=0):
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL only. Convert the feedback archive table to monthly RANGE "
+        "partitions on submitted_at (first run, takes an exclusive lock while "
+        "rows are copied), then create partitions for the coming months. Safe "
+        "to run repeatedly, e.g. from the same cron job as apply_retention."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=3,
+            help='Create partitions up to this many months past the current one (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Partitioning is only supported on PostgreSQL.")
+
+        table = ArchivedFeedback._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            row = cursor.fetchone()
+            if row is None:
+                raise CommandError(f"Table {table} does not exist; run migrate first.")
+            if row[0] != 'p':
+                self._convert(cursor, table)
+                self.stdout.write(f"Converted {table} to a table partitioned by month.")
+
+            today = timezone.now().date()
+            created = 0
+            for offset in range(options['months_ahead'] + 1):
+                created += self._create_partition(cursor, table, month_start(today, offset))
+        self.stdout.write(self.style.SUCCESS(f"Created {created} new partition(s)."))
+
+    def _convert(self, cursor, table):
+        old = f'{table}_old'
+        cursor.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        cursor.execute(
+            f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (submitted_at)'
+        )
+        cursor.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        # One partition per month that already holds archived rows
+        cursor.execute(f"SELECT DISTINCT date_trunc('month', submitted_at AT TIME ZONE 'UTC') FROM {old}")
+        for (month,) in cursor.fetchall():
+            self._create_partition(cursor, table, month.date())
+
+        cursor.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+        cursor.execute(f'DROP TABLE {old}')
+
+        # A partitioned table's primary key must include the partition key;
+        # ids stay unique because they come from the live table's sequence.
+        cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, submitted_at)')
+        cursor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_recipient_id_fk FOREIGN KEY (recipient_id) '
+            f'REFERENCES {UserProfile._meta.db_table} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+        with connection.schema_editor() as editor:
+            for index in ArchivedFeedback._meta.indexes:
+                editor.add_index(ArchivedFeedback, index)
+
+    def _create_partition(self, cursor, table, start):
+        """Create the partition for the month starting at start; returns 1 if it was new"""
+        name = f'{table}_y{start:%Y}m{start:%m}'
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return 0
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d} 00:00+00') TO ('{month_start(start, 1):%Y-%m-%d} 00:00+00')"
+        )
+        return 1
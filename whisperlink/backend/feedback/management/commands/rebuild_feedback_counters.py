@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from feedback.counters import rebuild_counters
+from feedback.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized feedback counters on every UserProfile "
+        "from AnonymousFeedback, in batches of profile ids."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of profile ids updated per statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        max_id = UserProfile.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        updated = 0
+
+        for start in range(0, max_id, batch_size):
+            with transaction.atomic():
+                updated += rebuild_counters(
+                    UserProfile.objects.filter(id__gt=start, id__lte=start + batch_size)
+                )
+            self.stdout.write(f"Rebuilt counters for profiles {start + 1}-{min(start + batch_size, max_id)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} profile(s)."))
@@ -1,116 +1,183 @@
-from django.http import HttpResponse
-from django.shortcuts import render
-from django.db import connection
-from django.db.utils import OperationalError
-from django.template import TemplateDoesNotExist
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .error_pages import error_response
+from .health import db_health, is_database_error
+from .instrumentation import record_request, track_request
+from .routers import replica_aliases, route_request
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+class PerformanceMiddleware:
+    """
+    Per-request instrumentation: wall time, database query count and time,
+    and outbound HTTP time (AI service calls). The totals are sent in a
+    Server-Timing header and recorded per URL name in the in-memory registry
+    served by the performance_metrics view. Requests that run more queries
+    than their budget are logged, so N+1 regressions show up right away.
+
+    For streaming responses only the work done before the first byte is
+    measured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with track_request() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        with track_request() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        response['Server-Timing'] = metrics.server_timing()
+        record_request(request, metrics)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets read-only requests (GET, HEAD, OPTIONS) read from the replicas in
+    DATABASE_REPLICATION; see feedback.routers.PrimaryReplicaRouter.
+
+    A request that writes sets a cookie pinning the client to the primary
+    for PIN_SECONDS, so e.g. the dashboard shown right after a deletion
+    doesn't come from a replica that hasn't replayed it yet. Sits outside
+    SessionMiddleware so session writes count too.
+    """
+    sync_capable = True
+    async_capable = True
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    COOKIE_NAME = 'db_primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with route_request(self.may_use_replica(request)) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with route_request(self.may_use_replica(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def may_use_replica(self, request):
+        if request.method not in self.SAFE_METHODS:
+            return False
+        try:
+            return int(request.COOKIES.get(self.COOKIE_NAME, 0)) < time.time()
+        except ValueError:
+            return True
+
+    def finish(self, response, state):
+        if state.wrote and replica_aliases():
+            pin_seconds = settings.DATABASE_REPLICATION['PIN_SECONDS']
+            response.set_cookie(
+                self.COOKIE_NAME, str(int(time.time()) + pin_seconds),
+                max_age=pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also sit in an async middleware chain. WhiteNoise
+    itself is sync-only, which under ASGI would push every request through a
+    thread; here only the static file hits are served from one.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=None):
+        if settings is None:
+            super().__init__(get_response)
+        else:
+            super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
 class DatabaseErrorMiddleware:
     """
-    Middleware to handle database connection errors gracefully
+    Middleware to handle database connection errors gracefully.
+
+    Every database error a view raises is reported to the shared health state,
+    which is what the context processor and database_required read from.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        try:
-            response = self.get_response(request)
-            return response
-        except OperationalError as e:
-            logger.error(f"Database connection error: {e}")
-            return self.handle_database_error(request, e)
-        except Exception as e:
-            # Check if it's a database-related error in the exception chain
-            if self.is_database_error(e):
-                logger.error(f"Database connection error: {e}")
-                return self.handle_database_error(request, e)
-            raise
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
 
-    def is_database_error(self, exception):
-        """Check if an exception is related to database connectivity"""
-        error_str = str(exception).lower()
-        error_indicators = [
-            'connection to server',
-            'server closed the connection',
-            'timeout while waiting',
-            'scram exchange',
-            'connection failed',
-            'operationalerror',
-            'database connection',
-            'connection reset'
-        ]
-        
-        # Check the current exception
-        if any(indicator in error_str for indicator in error_indicators):
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        """
+        Answer database errors raised by the view. Django converts view
+        exceptions into responses before they reach __call__, so this hook is
+        the only place the middleware sees them.
+        """
+        if self.record_database_error(exception):
+            return self.handle_database_error(request, exception)
+        return None
+
+    def record_database_error(self, exception):
+        """Report exception to the health state if it is a database error; returns whether it was"""
+        if self.is_database_error(exception):
+            logger.error("Database connection error: %s", exception)
+            db_health.record_failure(exception)
             return True
-            
-        # Check the exception chain
-        current = exception
-        while current.__cause__ or current.__context__:
-            current = current.__cause__ or current.__context__
-            if current and any(indicator in str(current).lower() for indicator in error_indicators):
-                return True
-                
         return False
 
+    def is_database_error(self, exception):
+        """Check if an exception is related to database connectivity"""
+        return is_database_error(exception)
+
     def handle_database_error(self, request, error):
         """
-        Handle database connection errors with user-friendly message
+        Handle database connection errors with the pre-rendered 503 page,
+        which needs neither the database nor the session
         """
-        context = {
-            'error_type': 'Database Connection Error',
-            'error_message': 'Unable to connect to the database. Please try again later.',
-            'suggestion': 'This is usually a temporary issue. Please refresh the page or try again in a few moments.',
-            'technical_details': str(error) if hasattr(error, '__str__') else 'Connection failed',
-        }
-        
-        try:
-            return render(request, 'feedback/error.html', context, status=503)
-        except:
-            # Fallback to simple HTTP response if template rendering fails
-            return HttpResponse(
-                """
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>Database Connection Error</title>
-                    <style>
-                        body { font-family: Arial, sans-serif; margin: 50px; background-color: #f8f9fa; }
-                        .container { max-width: 600px; margin: 0 auto; padding: 20px; background: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-                        .error-icon { color: #dc3545; font-size: 48px; }
-                        .btn { display: inline-block; padding: 10px 20px; margin: 10px 5px; text-decoration: none; border-radius: 5px; }
-                        .btn-primary { background-color: #007bff; color: white; }
-                        .btn-secondary { background-color: #6c757d; color: white; }
-                        .alert { padding: 15px; margin: 20px 0; border-radius: 5px; background-color: #fff3cd; border: 1px solid #ffeaa7; }
-                    </style>
-                </head>
-                <body>
-                    <div class="container">
-                        <div class="error-icon">⚠️</div>
-                        <h1>Database Connection Error</h1>
-                        <div class="alert">
-                            <p><strong>Unable to connect to the database.</strong></p>
-                            <p>This is usually a temporary issue. Please try again in a few moments.</p>
-                        </div>
-                        <h3>What you can do:</h3>
-                        <ul>
-                            <li>Refresh the page and try again</li>
-                            <li>Check your internet connection</li>
-                            <li>Wait a few moments and try again</li>
-                            <li>Contact support if the problem persists</li>
-                        </ul>
-                        <div>
-                            <a href="/" class="btn btn-primary">Return to Home</a>
-                            <a href="javascript:window.location.reload()" class="btn btn-secondary">Refresh Page</a>
-                        </div>
-                    </div>
-                </body>
-                </html>
-                """,
-                status=503,
-                content_type='text/html'
-            )
+        return error_response(503)
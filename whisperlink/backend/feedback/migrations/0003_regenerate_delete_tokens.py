@@ -0,0 +1,28 @@
+from django.db import migrations
+import uuid
+
+
+def regenerate_duplicate_delete_tokens(apps, schema_editor):
+    """
+    0002 added delete_token with a callable default, which Django evaluates
+    once for existing rows, so older feedback shares a single token. Give
+    every duplicate a fresh token before the unique index is created.
+    """
+    AnonymousFeedback = apps.get_model('feedback', 'AnonymousFeedback')
+    seen = set()
+    for feedback in AnonymousFeedback.objects.only('id', 'delete_token').order_by('id').iterator():
+        if feedback.delete_token in seen:
+            feedback.delete_token = uuid.uuid4()
+            feedback.save(update_fields=['delete_token'])
+        seen.add(feedback.delete_token)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_anonymousfeedback_delete_token_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_delete_tokens, migrations.RunPython.noop),
+    ]
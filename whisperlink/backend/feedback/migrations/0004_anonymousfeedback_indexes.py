@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:15
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0003_regenerate_delete_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='anonymousfeedback',
+            name='delete_token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='anonymousfeedback',
+            index=models.Index(fields=['recipient', '-submitted_at', '-id'], name='feedback_recipient_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anonymousfeedback',
+            index=models.Index(fields=['-submitted_at'], name='feedback_submitted_at_idx'),
+        ),
+    ]
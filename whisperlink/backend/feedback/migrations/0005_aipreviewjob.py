@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:17
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0004_anonymousfeedback_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIPreviewJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_input', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('result', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preview_jobs', to='feedback.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='feedback_job_created_idx')],
+            },
+        ),
+    ]
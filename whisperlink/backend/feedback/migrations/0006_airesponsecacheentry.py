@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0005_aipreviewjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResponseCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('response', models.TextField()),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+    ]
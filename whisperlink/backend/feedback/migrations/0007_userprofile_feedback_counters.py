@@ -0,0 +1,55 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:23
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def populate_feedback_counters(apps, schema_editor):
+    UserProfile = apps.get_model('feedback', 'UserProfile')
+    AnonymousFeedback = apps.get_model('feedback', 'AnonymousFeedback')
+    stats = (
+        AnonymousFeedback.objects.order_by()
+        .values('recipient')
+        .annotate(
+            total=Count('id'),
+            ai_total=Count('id', filter=Q(is_ai_generated=True)),
+            latest=Max('submitted_at'),
+        )
+    )
+    profiles = []
+    for row in stats.iterator():
+        profiles.append(UserProfile(
+            id=row['recipient'],
+            feedback_count=row['total'],
+            ai_feedback_count=row['ai_total'],
+            last_feedback_at=row['latest'],
+        ))
+    UserProfile.objects.bulk_update(
+        profiles, ['feedback_count', 'ai_feedback_count', 'last_feedback_at'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0006_airesponsecacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='ai_feedback_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='feedback_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_feedback_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_feedback_counters, migrations.RunPython.noop),
+    ]
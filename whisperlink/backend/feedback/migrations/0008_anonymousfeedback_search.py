@@ -0,0 +1,82 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:12
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL: a GIN-indexed tsvector column kept current by the built-in
+# tsvector_update_trigger, so bulk_create and raw SQL writes are indexed too.
+POSTGRES_FORWARDS = [
+    "UPDATE feedback_anonymousfeedback SET search_vector = to_tsvector('pg_catalog.english', message)",
+    "CREATE INDEX feedback_search_vector_idx ON feedback_anonymousfeedback USING gin (search_vector)",
+    """
+    CREATE TRIGGER feedback_search_vector_update
+    BEFORE INSERT OR UPDATE OF message ON feedback_anonymousfeedback
+    FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.english', message)
+    """,
+]
+POSTGRES_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS feedback_search_vector_update ON feedback_anonymousfeedback",
+    "DROP INDEX IF EXISTS feedback_search_vector_idx",
+]
+
+# SQLite (local development and tests): an external-content FTS5 table over
+# message, kept in sync with triggers.
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE feedback_anonymousfeedback_fts USING fts5(
+        message, content='feedback_anonymousfeedback', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER feedback_fts_insert AFTER INSERT ON feedback_anonymousfeedback BEGIN
+        INSERT INTO feedback_anonymousfeedback_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER feedback_fts_delete AFTER DELETE ON feedback_anonymousfeedback BEGIN
+        INSERT INTO feedback_anonymousfeedback_fts(feedback_anonymousfeedback_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER feedback_fts_update AFTER UPDATE OF message ON feedback_anonymousfeedback BEGIN
+        INSERT INTO feedback_anonymousfeedback_fts(feedback_anonymousfeedback_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+        INSERT INTO feedback_anonymousfeedback_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    "INSERT INTO feedback_anonymousfeedback_fts(feedback_anonymousfeedback_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS feedback_fts_insert",
+    "DROP TRIGGER IF EXISTS feedback_fts_delete",
+    "DROP TRIGGER IF EXISTS feedback_fts_update",
+    "DROP TABLE IF EXISTS feedback_anonymousfeedback_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0007_userprofile_feedback_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='anonymousfeedback',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARDS, SQLITE_FORWARDS),
+            run_for_vendor(POSTGRES_BACKWARDS, SQLITE_BACKWARDS),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0008_anonymousfeedback_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFeedback',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('submitted_at', models.DateTimeField()),
+                ('is_ai_generated', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_feedback', to='feedback.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipient', '-submitted_at'], name='feedback_archive_recent_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0009_archivedfeedback'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedfeedback',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0010_archivedfeedback_bigint_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='airesponsecacheentry',
+            name='created_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
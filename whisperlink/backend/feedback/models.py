@@ -1,12 +1,26 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 import uuid
 
 
+class UserProfileManager(models.Manager):
+    """Always joins the user, which __str__ and every profile page read"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     unique_link = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized inbox stats, maintained by feedback.counters
+    feedback_count = models.PositiveIntegerField(default=0)
+    ai_feedback_count = models.PositiveIntegerField(default=0)
+    last_feedback_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = UserProfileManager()
     
     def __str__(self):
         return f"{self.user.username}'s profile"
@@ -15,6 +29,28 @@ class UserProfile(models.Model):
         return f"/feedback/{self.unique_link}/"
 
 
+class AnonymousFeedbackQuerySet(models.QuerySet):
+    # Columns the feedback list templates read; the rest (IP address, delete
+    # token) stays out of list queries
+    LIST_FIELDS = [
+        'recipient__user__username',
+        'message',
+        'submitted_at',
+        'is_ai_generated',
+        'original_input',
+    ]
+
+    def for_listing(self):
+        return self.only(*self.LIST_FIELDS)
+
+
+class AnonymousFeedbackManager(models.Manager.from_queryset(AnonymousFeedbackQuerySet)):
+    """Always joins recipient and user, which __str__ reads; never loads the search vector"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('recipient__user').defer('search_vector')
+
+
 class AnonymousFeedback(models.Model):
     recipient = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='received_feedback')
     message = models.TextField()
@@ -22,13 +58,92 @@ class AnonymousFeedback(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     is_ai_generated = models.BooleanField(default=False)
     original_input = models.TextField(null=True, blank=True)  # Store original user input before AI processing
-    delete_token = models.UUIDField(default=uuid.uuid4, editable=False)  # For anonymous deletion
+    delete_token = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)  # For anonymous deletion
+    # Full-text index of message, maintained by a database trigger on PostgreSQL
+    # (see migration 0008 and feedback/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = AnonymousFeedbackManager()
     
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Dashboard: filter by recipient, keyset-paginate on (submitted_at, id)
+            models.Index(fields=['recipient', '-submitted_at', '-id'], name='feedback_recipient_recent_idx'),
+            # Admin changelist and global ordering
+            models.Index(fields=['-submitted_at'], name='feedback_submitted_at_idx'),
+        ]
     
     def __str__(self):
         return f"Feedback for {self.recipient.user.username} at {self.submitted_at}"
     
     def get_delete_link(self):
         return f"/delete-feedback/{self.delete_token}/"
+
+
+class ArchivedFeedback(models.Model):
+    """
+    Feedback moved out of AnonymousFeedback by the retention pipeline
+    (feedback/retention.py). Keeps the original id; IP address, original
+    input and delete token are not carried over. On PostgreSQL the table can
+    be range-partitioned by month with the partition_feedback_archive command.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='archived_feedback')
+    message = models.TextField()
+    submitted_at = models.DateTimeField()
+    is_ai_generated = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-submitted_at'], name='feedback_archive_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived feedback {self.id} from {self.submitted_at:%Y-%m-%d}"
+
+
+class AIPreviewJob(models.Model):
+    """Queued AI preview generation, processed off the request thread"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    recipient = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='preview_jobs')
+    user_input = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='feedback_job_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"AI preview job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class AIResponseCacheEntry(models.Model):
+    """Persistent tier of the AI feedback response cache"""
+    key = models.CharField(max_length=64, primary_key=True)  # sha256 hex digest
+    response = models.TextField()
+    created_at = models.DateTimeField(db_index=True)  # expired entries are purged by range
+
+    def __str__(self):
+        return f"AI response cache entry {self.key[:12]}"
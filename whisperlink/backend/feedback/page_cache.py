@@ -0,0 +1,141 @@
+import hashlib
+import uuid
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from .health import db_health
+
+# Rendered into cached pages in place of the CSRF token and swapped for the
+# visitor's own token on the way out, so one cached copy serves everyone.
+CSRF_PLACEHOLDER = 'PAGECACHECSRFTOKENPLACEHOLDER'
+
+
+def cache_policy(name):
+    """Cache lifetime in seconds for a view or fragment (PAGE_CACHE), 0 when disabled"""
+    return getattr(settings, 'PAGE_CACHE', {}).get(name, 0)
+
+
+def is_cacheable(request):
+    """
+    Only anonymous GET/HEAD requests without pending flash messages can be
+    served from the page cache. Visitors with a session cookie may be logged
+    in, and finding out would cost a session lookup, so they always get a
+    fresh render.
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def version_cache():
+    """
+    Cache holding the scope versions (PAGE_CACHE_VERSION_ALIAS). Invalidation
+    only reaches the workers sharing it; on a per-process cache the others
+    serve their copy of a changed page until its PAGE_CACHE lifetime runs out.
+    """
+    return caches[getattr(settings, 'PAGE_CACHE_VERSION_ALIAS', 'default')]
+
+
+def _scope_version(scope):
+    versions = version_cache()
+    key = f'pagecache:version:{scope}'
+    version = versions.get(key)
+    if version is None:
+        versions.add(key, uuid.uuid4().hex, None)
+        version = versions.get(key)
+    return version
+
+
+def invalidate_page_cache(scope):
+    """Drop every cached page of scope (e.g. a profile's feedback link) by bumping its version"""
+    version_cache().delete(f'pagecache:version:{scope}')
+
+
+def page_cache_key(name, request, scope=None):
+    # Host changes the rendered links and the database banner depends on the
+    # circuit state. The query string is left out so arbitrary parameters
+    # can't fill the cache; cached pages must not render it.
+    variant = f'{request.build_absolute_uri(request.path)}|{db_health.is_available()}'
+    if scope is not None:
+        variant = f'{variant}|{_scope_version(scope)}'
+    return f'pagecache:{name}:{hashlib.sha256(variant.encode()).hexdigest()}'
+
+
+def _with_csrf_token(request, content):
+    if CSRF_PLACEHOLDER.encode() in content:
+        content = content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+    return content
+
+
+def _lookup(name, request, scope):
+    key = page_cache_key(name, request, scope)
+    return key, cache.get(key)
+
+
+def _cached_response(request, cached):
+    content_type, content = cached
+    response = HttpResponse(_with_csrf_token(request, content), content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def _store(request, response, key, timeout):
+    if response.status_code == 200 and not response.cookies and request.method == 'GET':
+        cache.set(key, (response['Content-Type'], response.content), timeout)
+        response['X-Page-Cache'] = 'miss'
+    response.content = _with_csrf_token(request, response.content)
+    return response
+
+
+def cache_anonymous_page(name, scope_kwarg=None):
+    """
+    Serve a view's rendered page from the cache to anonymous visitors for
+    PAGE_CACHE[name] seconds. CSRF tokens are punched back in per request.
+    Pages depending on a model instance pass scope_kwarg, the view argument
+    identifying it, so invalidate_page_cache() can drop them when it changes.
+    Works on both sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                timeout = cache_policy(name)
+                if not timeout or not is_cacheable(request):
+                    return await view_func(request, *args, **kwargs)
+
+                scope = str(kwargs[scope_kwarg]) if scope_kwarg else None
+                # Cache backends are synchronous; one hop covers the key's version lookup too
+                key, cached = await sync_to_async(_lookup)(name, request, scope)
+                if cached is not None:
+                    return _cached_response(request, cached)
+
+                request.csrf_token_placeholder = CSRF_PLACEHOLDER
+                response = await view_func(request, *args, **kwargs)
+                if response.streaming:
+                    return response
+                return await sync_to_async(_store)(request, response, key, timeout)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            timeout = cache_policy(name)
+            if not timeout or not is_cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            scope = str(kwargs[scope_kwarg]) if scope_kwarg else None
+            key, cached = _lookup(name, request, scope)
+            if cached is not None:
+                return _cached_response(request, cached)
+
+            request.csrf_token_placeholder = CSRF_PLACEHOLDER
+            response = view_func(request, *args, **kwargs)
+            if response.streaming:
+                return response
+            return _store(request, response, key, timeout)
+        return wrapper
+    return decorator
@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+
+DASHBOARD_PAGE_SIZE = 20
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(feedback):
+    """
+    Encode the (submitted_at, id) position of a feedback row into an opaque,
+    URL-safe cursor string
+    """
+    raw = f"{feedback.submitted_at.isoformat()}|{feedback.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into (submitted_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        submitted_at, feedback_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(submitted_at), int(feedback_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def _page_queryset(queryset, cursor, page_size):
+    queryset = queryset.order_by('-submitted_at', '-id')
+    if cursor:
+        submitted_at, feedback_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(submitted_at__lt=submitted_at) |
+            Q(submitted_at=submitted_at, id__lt=feedback_id)
+        )
+    return queryset[:page_size + 1]
+
+
+def _split_page(items, page_size):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+    return items, next_cursor
+
+
+def paginate_feedback(queryset, cursor=None, page_size=DASHBOARD_PAGE_SIZE):
+    """
+    Keyset pagination over feedback ordered by (-submitted_at, -id).
+
+    Fetches at most page_size + 1 rows so we know whether another page exists
+    without issuing a COUNT. Returns (items, next_cursor); next_cursor is None
+    on the last page.
+    """
+    return _split_page(list(_page_queryset(queryset, cursor, page_size)), page_size)
+
+
+async def apaginate_feedback(queryset, cursor=None, page_size=DASHBOARD_PAGE_SIZE):
+    """Async paginate_feedback(), fetching the page with the async ORM"""
+    items = [item async for item in _page_queryset(queryset, cursor, page_size)]
+    return _split_page(items, page_size)
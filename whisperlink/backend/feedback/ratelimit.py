@@ -0,0 +1,131 @@
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+
+class MemoryBackend:
+    """
+    Per-process window counters. Entries older than two windows are pruned
+    periodically so a flood of distinct keys cannot grow memory without bound.
+    """
+
+    def __init__(self, prune_every=1000):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._prune_every = prune_every
+        self._calls = 0
+
+    def increment(self, key, window_index, window, amount=1):
+        """Count amount hits in window_index; return (current_count, previous_count)"""
+        with self._lock:
+            self._calls += 1
+            if self._calls % self._prune_every == 0:
+                self._prune(window_index)
+            counters = self._counters.get(key)
+            if counters is None or counters[0] < window_index - 1:
+                counters = [window_index, 0, 0]
+            elif counters[0] == window_index - 1:
+                counters = [window_index, 0, counters[1]]
+            counters[1] += amount
+            self._counters[key] = counters
+            return counters[1], counters[2]
+
+    def counts(self, key, window_index):
+        """(current_count, previous_count) for window_index without counting a hit"""
+        with self._lock:
+            counters = self._counters.get(key)
+            if counters is None or counters[0] < window_index - 1:
+                return 0, 0
+            if counters[0] == window_index - 1:
+                return 0, counters[1]
+            return counters[1], counters[2]
+
+    def _prune(self, window_index):
+        stale = [key for key, counters in self._counters.items() if counters[0] < window_index - 1]
+        for key in stale:
+            del self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheBackend:
+    """Window counters in a Django cache, shared by every worker process"""
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def increment(self, key, window_index, window, amount=1):
+        cache = caches[self.alias]
+        current_key = f'ratelimit:{key}:{window_index}'
+        # add() is a no-op if the key exists; keep it until the next window ends
+        cache.add(current_key, 0, timeout=window * 2)
+        current = cache.incr(current_key, amount)
+        previous = cache.get(f'ratelimit:{key}:{window_index - 1}', 0)
+        return current, previous
+
+    def counts(self, key, window_index):
+        current_key, previous_key = f'ratelimit:{key}:{window_index}', f'ratelimit:{key}:{window_index - 1}'
+        values = caches[self.alias].get_many([current_key, previous_key])
+        return values.get(current_key, 0), values.get(previous_key, 0)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window rate limiter. The rate is estimated as the current fixed
+    window's count plus the previous window's count weighted by how much of
+    it still overlaps the sliding window, which needs two counters per key
+    instead of a log of timestamps.
+    """
+
+    def __init__(self, backend, clock=time.time):
+        self.backend = backend
+        self.clock = clock
+
+    def hit(self, key, limit, window, cost=1):
+        """
+        Record a request costing cost hits for key and return (allowed,
+        retry_after_seconds). Rejected requests are counted too, so hammering
+        a limit keeps it shut.
+        """
+        now = self.clock()
+        window_index = int(now // window)
+        current, previous = self.backend.increment(key, window_index, window, cost)
+        return self._decide(current, previous, limit, window, now - window_index * window)
+
+    def peek(self, key, limit, window, cost=1):
+        """Whether a request costing cost hits would be allowed now, as hit() returns it; records nothing"""
+        now = self.clock()
+        window_index = int(now // window)
+        current, previous = self.backend.counts(key, window_index)
+        return self._decide(current + cost, previous, limit, window, now - window_index * window)
+
+    def _decide(self, current, previous, limit, window, elapsed):
+        estimate = previous * (1 - elapsed / window) + current
+        if estimate <= limit:
+            return True, 0
+
+        if current > limit or not previous:
+            retry_after = window - elapsed
+        else:
+            # Wait until the previous window's share decays below the headroom
+            retry_after = window * (1 - (limit - current) / previous) - elapsed
+        return False, max(1, math.ceil(retry_after))
+
+
+def build_limiter():
+    config = getattr(settings, 'RATE_LIMIT', {})
+    if config.get('BACKEND', 'memory') == 'cache':
+        backend = CacheBackend(config.get('CACHE_ALIAS', 'default'))
+    else:
+        backend = MemoryBackend()
+    return SlidingWindowLimiter(backend)
+
+
+limiter = build_limiter()
@@ -0,0 +1,56 @@
+import uuid
+from django.conf import settings
+
+# Delete receipts let an anonymous submitter delete what they sent without
+# touching the session table: the delete tokens of their most recent
+# submissions live in one signed (HMAC) cookie, capped at MAX entries.
+RECEIPT_COOKIE = 'feedback_receipts'
+RECEIPT_SALT = 'feedback.receipts'
+
+
+def _config():
+    config = getattr(settings, 'FEEDBACK_RECEIPTS', {})
+    return config.get('MAX', 10), config.get('MAX_AGE', 7 * 24 * 3600)
+
+
+def get_receipts(request):
+    """Delete tokens from the receipt cookie, newest first; [] if missing or tampered with"""
+    max_receipts, max_age = _config()
+    value = request.get_signed_cookie(RECEIPT_COOKIE, default='', salt=RECEIPT_SALT, max_age=max_age)
+    receipts = []
+    for token in value.split(',') if value else []:
+        try:
+            receipts.append(uuid.UUID(hex=token))
+        except ValueError:
+            continue
+    return receipts[:max_receipts]
+
+
+def set_receipts(request, response, receipts):
+    max_receipts, max_age = _config()
+    receipts = receipts[:max_receipts]
+    if not receipts:
+        response.delete_cookie(RECEIPT_COOKIE, samesite='Lax')
+        return
+    response.set_signed_cookie(
+        RECEIPT_COOKIE,
+        ','.join(token.hex for token in receipts),
+        salt=RECEIPT_SALT,
+        max_age=max_age,
+        secure=request.is_secure(),
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def add_receipt(request, response, delete_token):
+    """Put delete_token at the front of the receipt cookie, dropping the oldest beyond MAX"""
+    receipts = [token for token in get_receipts(request) if token != delete_token]
+    set_receipts(request, response, [delete_token] + receipts)
+
+
+def remove_receipt(request, response, delete_token):
+    receipts = get_receipts(request)
+    if delete_token in receipts:
+        receipts.remove(delete_token)
+        set_receipts(request, response, receipts)
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+from .models import UserProfile
+
+
+class Recipient(namedtuple('Recipient', ['profile_id', 'username', 'unique_link'])):
+    """Lightweight, read-only stand-in for a UserProfile on the feedback link paths"""
+    __slots__ = ()
+
+    def get_feedback_link(self):
+        return f"/feedback/{self.unique_link}/"
+
+
+class RecipientCache:
+    """
+    Maps a profile's unique_link to its Recipient.
+
+    The memory tier is an LRU bounded by max_entries. Its short TTL bounds
+    how long other worker processes can serve a renamed or deleted recipient,
+    since invalidate() only reaches this process and the shared tier. The
+    optional shared tier keeps entries in a Django cache so a link that is
+    hot in one worker is warm in all of them.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, shared_alias=None, shared_ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+        self.shared_ttl = shared_ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_local(self, unique_link):
+        """Memory tier only; never does I/O, so async views can call it directly"""
+        with self._lock:
+            entry = self._entries.get(unique_link)
+            if entry is not None:
+                recipient, expires_at = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(unique_link)
+                    self.hits += 1
+                    return recipient
+                del self._entries[unique_link]
+        return None
+
+    def get(self, unique_link):
+        """Return the Recipient for unique_link, or None if no profile has it"""
+        recipient = self.get_local(unique_link)
+        if recipient is not None:
+            return recipient
+
+        key = self._shared_key(unique_link)
+        if self.shared_alias:
+            cached = caches[self.shared_alias].get(key)
+            if cached is not None:
+                recipient = Recipient(*cached)
+                self._set_local(unique_link, recipient)
+                with self._lock:
+                    self.hits += 1
+                return recipient
+
+        with self._lock:
+            self.misses += 1
+        row = (
+            UserProfile.objects.filter(unique_link=unique_link)
+            .values_list('id', 'user__username', 'unique_link')
+            .first()
+        )
+        if row is None:
+            # Unknown links aren't cached, so random UUIDs can't flood the LRU
+            return None
+
+        recipient = Recipient(*row)
+        self._set_local(unique_link, recipient)
+        if self.shared_alias:
+            caches[self.shared_alias].set(key, tuple(recipient), self.shared_ttl)
+        return recipient
+
+    async def aget(self, unique_link):
+        """Async get(); only a memory-tier miss leaves the event loop"""
+        recipient = self.get_local(unique_link)
+        if recipient is not None:
+            return recipient
+        return await sync_to_async(self.get)(unique_link)
+
+    def invalidate(self, unique_link):
+        with self._lock:
+            self._entries.pop(unique_link, None)
+        if self.shared_alias:
+            caches[self.shared_alias].delete(self._shared_key(unique_link))
+
+    def _set_local(self, unique_link, recipient):
+        with self._lock:
+            self._entries[unique_link] = (recipient, self.clock() + self.ttl)
+            self._entries.move_to_end(unique_link)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared_key(self, unique_link):
+        return f'recipient:{unique_link}'
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_config = getattr(settings, 'RECIPIENT_CACHE', {})
+
+recipient_cache = RecipientCache(
+    max_entries=_config.get('MAX_ENTRIES', 1024),
+    ttl=_config.get('TTL', 60),
+    shared_alias=_config.get('SHARED_ALIAS'),
+    shared_ttl=_config.get('SHARED_TTL', 3600),
+)
+
+
+def get_recipient_or_404(unique_link):
+    recipient = recipient_cache.get(unique_link)
+    if recipient is None:
+        raise Http404("No feedback link matches the given query.")
+    return recipient
+
+
+async def aget_recipient_or_404(unique_link):
+    recipient = await recipient_cache.aget(unique_link)
+    if recipient is None:
+        raise Http404("No feedback link matches the given query.")
+    return recipient
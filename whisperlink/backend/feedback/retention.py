@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from .counters import record_feedback_deleted
+from .models import AnonymousFeedback, ArchivedFeedback
+
+# Columns kept once a row is archived. IP addresses, original input and
+# delete tokens are never archived.
+ARCHIVE_FIELDS = ['id', 'recipient_id', 'message', 'submitted_at', 'is_ai_generated']
+
+# AnonymousFeedback field -> FEEDBACK_RETENTION setting with its lifetime in days
+SCRUBBED_FIELDS = {
+    'ip_address': 'IP_ADDRESS_DAYS',
+    'original_input': 'ORIGINAL_INPUT_DAYS',
+}
+
+
+def retention_policy():
+    """FEEDBACK_RETENTION with defaults filled in"""
+    config = getattr(settings, 'FEEDBACK_RETENTION', {})
+    return {
+        'IP_ADDRESS_DAYS': config.get('IP_ADDRESS_DAYS', 30),
+        'ORIGINAL_INPUT_DAYS': config.get('ORIGINAL_INPUT_DAYS', 90),
+        'ARCHIVE_AFTER_DAYS': config.get('ARCHIVE_AFTER_DAYS', 365),
+        'ARCHIVE_TO': config.get('ARCHIVE_TO', 'table'),
+        'ARCHIVE_DIR': config.get('ARCHIVE_DIR', settings.BASE_DIR / 'archive'),
+        'BATCH_SIZE': config.get('BATCH_SIZE', 1000),
+    }
+
+
+def expired_before(days, now=None):
+    """Submission time before which data older than days has expired, None if it never does"""
+    if days is None:
+        return None
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def scrub_expired_field(field, cutoff, batch_size=1000):
+    """
+    Clear field on feedback submitted before cutoff, one short UPDATE per
+    batch of ids so no long lock is held. Yields the rows updated per batch;
+    stopping early is safe, the next run picks up what is left.
+    """
+    pending = AnonymousFeedback.objects.filter(submitted_at__lt=cutoff, **{f'{field}__isnull': False}).order_by()
+    while True:
+        ids = list(pending.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield AnonymousFeedback.objects.filter(id__in=ids).update(**{field: None})
+
+
+def write_archive_file(rows, archive_dir):
+    """
+    Write rows as gzipped JSONL under archive_dir/<YYYY-MM>/, named after the
+    batch's id range. A batch retried after a crash gets the same name, so the
+    file is replaced rather than duplicated. Returns the path.
+    """
+    first = rows[0]
+    directory = Path(archive_dir) / f"{first['submitted_at']:%Y-%m}"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"feedback-{first['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+    partial = path.with_name(path.name + '.partial')
+    with gzip.open(partial, 'wt', encoding='utf-8') as archive:
+        for row in rows:
+            archive.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+    os.replace(partial, path)
+    return path
+
+
+def archive_expired_feedback(cutoff, batch_size=1000, target='table', archive_dir=None):
+    """
+    Move feedback submitted before cutoff out of AnonymousFeedback, oldest
+    first, into ArchivedFeedback (target='table') or gzipped JSONL files
+    (target='jsonl'). Each batch is copied, deleted and taken off the
+    recipients' counters in one transaction, so an interrupted run resumes
+    where it stopped. Yields the rows archived per batch.
+    """
+    if target not in ('table', 'jsonl'):
+        raise ValueError(f"Unknown archive target {target!r}")
+
+    expired = (
+        AnonymousFeedback.objects.filter(submitted_at__lt=cutoff)
+        .select_related(None)
+        .order_by('submitted_at', 'id')
+    )
+    while True:
+        with transaction.atomic():
+            # skip_locked lets two runs overlap without archiving a row twice
+            rows = list(expired.select_for_update(skip_locked=True).values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                return
+
+            if target == 'jsonl':
+                write_archive_file(rows, archive_dir)
+            else:
+                ArchivedFeedback.objects.bulk_create(
+                    [ArchivedFeedback(**row) for row in rows], ignore_conflicts=True
+                )
+            AnonymousFeedback.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+            archived = Counter(row['recipient_id'] for row in rows)
+            archived_ai = Counter(row['recipient_id'] for row in rows if row['is_ai_generated'])
+            for profile_id, count in archived.items():
+                record_feedback_deleted(profile_id, count, archived_ai[profile_id])
+        yield len(rows)
@@ -0,0 +1,74 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Routing decision of the request being handled in the current thread/task,
+# set by ReplicaRoutingMiddleware. Outside requests (commands, background
+# jobs) there is none and everything uses the primary.
+_current = ContextVar('feedback_db_routing', default=None)
+
+
+class RoutingState:
+    """Whether the current request may read from a replica"""
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICATION', {}).get('REPLICAS', [])
+
+
+@contextmanager
+def route_request(use_replica):
+    """Route the reads of the code run inside to a replica if use_replica"""
+    state = RoutingState(use_replica and bool(replica_aliases()))
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def use_primary():
+    """Send the rest of the current request's reads to the primary"""
+    state = _current.get()
+    if state is not None:
+        state.use_replica = False
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads of read-only requests go to a random replica from
+    DATABASE_REPLICATION['REPLICAS']; writes always go to the primary.
+
+    After a request writes, the rest of it reads from the primary, and
+    ReplicaRoutingMiddleware pins the client to the primary for a few
+    seconds, so it reads its own writes while the replicas catch up.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or not state.use_replica:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its writes
+            return DEFAULT_DB_ALIAS
+        return random.choice(replica_aliases())
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
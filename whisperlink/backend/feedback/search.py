@@ -0,0 +1,65 @@
+import re
+from datetime import datetime, time, timedelta
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+# Text search configuration used by the search_vector trigger (migration 0008)
+SEARCH_CONFIG = 'english'
+
+FTS_TABLE = 'feedback_anonymousfeedback_fts'
+
+
+def fts5_query(text):
+    """Turn free text into an FTS5 query matching every word, with no FTS5 syntax exposed"""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def search_feedback(queryset, text):
+    """
+    Restrict a feedback queryset to messages matching text.
+
+    PostgreSQL uses the GIN-indexed search_vector with websearch syntax
+    ("quoted phrases", -excluded, or). SQLite uses the FTS5 table created by
+    migration 0008, matching all words. Other backends fall back to a
+    case-insensitive substring match.
+    """
+    text = text.strip()
+    if not text:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return queryset.filter(
+            search_vector=SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        )
+    if vendor == 'sqlite':
+        query = fts5_query(text)
+        if not query:
+            return queryset.none()
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [query])
+        )
+    return queryset.filter(message__icontains=text)
+
+
+def filter_feedback(queryset, filters):
+    """
+    Apply FeedbackFilterForm.cleaned_data to a feedback queryset. Date bounds
+    are turned into a submitted_at range (whole days, in the current time
+    zone) so they can use the (recipient, submitted_at) index.
+    """
+    if filters.get('q'):
+        queryset = search_feedback(queryset, filters['q'])
+    if filters.get('date_from'):
+        start = timezone.make_aware(datetime.combine(filters['date_from'], time.min))
+        queryset = queryset.filter(submitted_at__gte=start)
+    if filters.get('date_to'):
+        end = timezone.make_aware(datetime.combine(filters['date_to'] + timedelta(days=1), time.min))
+        queryset = queryset.filter(submitted_at__lt=end)
+    if filters.get('source') == 'ai':
+        queryset = queryset.filter(is_ai_generated=True)
+    elif filters.get('source') == 'human':
+        queryset = queryset.filter(is_ai_generated=False)
+    return queryset
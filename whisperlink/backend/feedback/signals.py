@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserProfile
+from .page_cache import invalidate_page_cache
+from .recipients import recipient_cache
 
 
 @receiver(post_save, sender=User)
@@ -11,6 +13,22 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
+def invalidate_user_profile_caches(sender, instance, created, update_fields=None, **kwargs):
+    # The feedback form and the recipient cache carry the username. The
+    # profile itself is not re-saved: that would write its stale counters
+    # over concurrent increments. Logins only touch last_login.
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    for unique_link in UserProfile.objects.filter(user_id=instance.pk).values_list('unique_link', flat=True):
+        invalidate_link_caches(unique_link)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_caches(sender, instance, **kwargs):
+    invalidate_link_caches(instance.unique_link)
+
+
+def invalidate_link_caches(unique_link):
+    invalidate_page_cache(str(unique_link))
+    recipient_cache.invalidate(unique_link)
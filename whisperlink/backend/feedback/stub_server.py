@@ -0,0 +1,104 @@
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # A client that timed out and hung up is expected, not a server error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeTogetherServer:
+    """
+    Local stand-in for the Together AI chat completions API, used by the
+    tests and the AI client benchmarks.
+
+    Streaming requests get the configured tokens as server-sent events, one
+    every token_delay seconds; other requests get a regular JSON completion
+    after latency seconds (slow_latency for a slow_fraction of requests).
+    The first fail_first requests are answered with a 503. A stream is cut
+    off without [DONE] after drop_after tokens when that is set.
+    """
+
+    def __init__(self, tokens=('Hello', ' there', '!'), token_delay=0.0, latency=0.0,
+                 slow_fraction=0.0, slow_latency=0.0, fail_first=0, drop_after=None, seed=0):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.latency = latency
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self.fail_first = fail_first
+        self.drop_after = drop_after
+        self.requests = []
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; without TCP_NODELAY a
+            # keep-alive client waits out the delayed ACK on every response
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server._lock:
+                    server.requests.append(body)
+                    attempt = len(server.requests)
+                    slow = server._random.random() < server.slow_fraction
+
+                if attempt <= server.fail_first:
+                    self.send_json(503, {'error': 'overloaded'})
+                elif body.get('stream'):
+                    self.send_stream()
+                else:
+                    time.sleep(server.slow_latency if slow else server.latency)
+                    self.send_json(200, {'choices': [{'message': {'content': ''.join(server.tokens)}}]})
+
+            def send_json(self, status, payload):
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def send_stream(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                for token in server.tokens[:server.drop_after]:
+                    time.sleep(server.token_delay)
+                    chunk = {'choices': [{'delta': {'content': token}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                if server.drop_after is None:
+                    self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = QuietHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v1/chat/completions"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,3 +1,1296 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import importlib
+import json
+import re
+import runpy
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
+from django.contrib.auth.models import User
+from django.apps import apps
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection, connections, utils as db_utils
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from .ai_service import ResponseCache, TogetherAIService, ai_service
+from .counters import rebuild_counters
+from .error_pages import error_pages
+from .health import MAX_CHAIN_DEPTH, DatabaseHealth, db_health, is_database_error, report_query
+from .instrumentation import registry
+from .loadtest import cleanup_seed_data
+from .jobs import is_queued, running_stale_after, submit_preview_job
+from .middleware import ReplicaRoutingMiddleware
+from .models import AnonymousFeedback, AIPreviewJob, AIResponseCacheEntry, ArchivedFeedback, UserProfile
+from .pagination import DASHBOARD_PAGE_SIZE
+from .receipts import RECEIPT_COOKIE
+from .recipients import RecipientCache, recipient_cache
+from .search import search_feedback
+from .export import EXPORT_FIELDS, iterate_rows
+from .ratelimit import MemoryBackend, SlidingWindowLimiter, limiter
+from .retention import archive_expired_feedback, scrub_expired_field
+from .routers import PrimaryReplicaRouter, route_request
+from .stub_server import FakeTogetherServer
+from .views import remove_feedback
 
-# Create your tests here.
+
+class DashboardPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.client.login(username='recipient', password='pass12345')
+
+    def create_feedback(self, count):
+        AnonymousFeedback.objects.bulk_create([
+            AnonymousFeedback(recipient=self.profile, message=f'Message {i}')
+            for i in range(count)
+        ])
+        rebuild_counters()
+
+    def test_dashboard_renders_one_bounded_page(self):
+        self.create_feedback(DASHBOARD_PAGE_SIZE + 5)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(len(response.context['feedback_list']), DASHBOARD_PAGE_SIZE)
+        self.assertEqual(response.context['profile'].feedback_count, DASHBOARD_PAGE_SIZE + 5)
+        self.assertIsNotNone(response.context['next_cursor'])
+
+    def test_feed_walks_every_row_exactly_once(self):
+        self.create_feedback(DASHBOARD_PAGE_SIZE * 2 + 3)
+        response = self.client.get(reverse('dashboard'))
+        seen = [feedback.id for feedback in response.context['feedback_list']]
+        cursor = response.context['next_cursor']
+        pages = 0
+        while cursor:
+            data = self.client.get(reverse('dashboard_feed'), {'cursor': cursor}).json()
+            pages += 1
+            ids = [int(i) for i in re.findall(r'/delete-received-feedback/(\d+)/', data['html'])]
+            self.assertEqual(len(ids), data['count'])
+            seen.extend(ids)
+            cursor = data['next_cursor']
+        self.assertEqual(pages, 2)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), DASHBOARD_PAGE_SIZE * 2 + 3)
+
+    def test_feed_rejects_malformed_cursor(self):
+        response = self.client.get(reverse('dashboard_feed'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DatabaseHealthTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.health = DatabaseHealth(failure_threshold=2, reset_timeout=30, clock=lambda: self.now)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.health.record_failure(Exception('connection refused'))
+        self.assertTrue(self.health.is_available())
+        self.health.record_failure(Exception('connection refused'))
+        self.assertEqual(self.health.state, DatabaseHealth.OPEN)
+        self.assertFalse(self.health.is_available())
+
+    def test_half_open_trial_closes_or_reopens_circuit(self):
+        self.health.record_failure(Exception('down'))
+        self.health.record_failure(Exception('down'))
+        self.now = 31
+        self.assertEqual(self.health.state, DatabaseHealth.HALF_OPEN)
+        self.health.record_failure(Exception('still down'))
+        self.assertEqual(self.health.state, DatabaseHealth.OPEN)
+        self.now = 62
+        self.assertEqual(self.health.state, DatabaseHealth.HALF_OPEN)
+        self.health.record_success()
+        self.assertEqual(self.health.state, DatabaseHealth.CLOSED)
+
+    def test_successful_query_resets_failure_count(self):
+        self.addCleanup(db_health.reset)
+        self.assertIn(report_query, connection.execute_wrappers)
+        db_health.record_failure(Exception('deadlock detected'))
+        db_health.record_failure(Exception('statement timeout'))
+        User.objects.exists()
+        db_health.record_failure(Exception('deadlock detected'))
+        self.assertEqual(db_health.state, DatabaseHealth.CLOSED)
+
+    def test_probe_result_is_cached_for_ttl(self):
+        self.assertTrue(self.health.probe())
+        with self.assertNumQueries(0):
+            self.assertTrue(self.health.probe())
+
+
+class DatabaseErrorClassifierTests(TestCase):
+    def raised_from(self, error, cause):
+        try:
+            try:
+                raise cause
+            except Exception:
+                raise error
+        except Exception as exc:
+            return exc
+
+    def test_connectivity_errors_are_classified_by_type(self):
+        self.assertTrue(is_database_error(db_utils.OperationalError('anything')))
+        self.assertTrue(is_database_error(db_utils.InterfaceError('connection already closed')))
+        self.assertFalse(is_database_error(db_utils.IntegrityError('duplicate key')))
+        # A message that merely mentions the database is not a database error
+        self.assertFalse(is_database_error(ValueError('database connection string is invalid')))
+
+    def test_exception_chain_is_walked_up_to_max_depth(self):
+        self.assertTrue(is_database_error(self.raised_from(ValueError('wrapped'), db_utils.OperationalError())))
+        error = db_utils.OperationalError()
+        for i in range(MAX_CHAIN_DEPTH):
+            error = self.raised_from(RuntimeError(i), error)
+        self.assertFalse(is_database_error(error))
+
+    def test_cyclic_chain_terminates(self):
+        first, second = KeyError('first'), ValueError('second')
+        first.__context__, second.__context__ = second, first
+        self.assertFalse(is_database_error(first))
+
+
+class ErrorPageTests(TestCase):
+    def setUp(self):
+        error_pages.clear()
+        self.addCleanup(error_pages.clear)
+
+    def test_database_error_is_answered_from_memory(self):
+        error = db_utils.OperationalError('connection to server failed')
+        # Warm the probe cache so the failing request issues no query itself
+        self.client.get('/health/')
+        self.addCleanup(db_health.reset)
+        with mock.patch('feedback.views.health_response', side_effect=error):
+            with self.assertLogs('feedback.middleware', 'ERROR'), self.assertNumQueries(0):
+                response = self.client.get('/health/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(db_health.reset_timeout))
+        self.assertContains(response, 'Database Connection Error', status_code=503)
+        self.assertNotContains(response, 'connection to server failed', status_code=503)
+        self.assertEqual(db_health.last_error, str(error))
+
+    def test_not_found_page_is_rendered_once(self):
+        self.client.get('/no-such-page/')
+        with mock.patch('feedback.error_pages.render_to_string') as render:
+            response = self.client.get('/another-missing-page/')
+        render.assert_not_called()
+        self.assertContains(response, 'Page Not Found', status_code=404)
+
+    def test_unrenderable_template_falls_back_without_caching(self):
+        with mock.patch('feedback.error_pages.render_to_string', side_effect=ValueError('missing manifest')):
+            with self.assertLogs('feedback.error_pages', 'ERROR'):
+                page = error_pages.get(500)
+        self.assertIn(b'Internal Server Error', page)
+        self.assertIn(b'mt-4', error_pages.get(500))
+
+    @override_settings(LAZY_STARTUP=True)
+    def test_pages_are_built_at_startup_even_when_lazy(self):
+        with mock.patch('feedback.ai_service.warm_up') as warm_up:
+            apps.get_app_config('feedback').ready()
+        warm_up.assert_not_called()
+        with mock.patch('feedback.error_pages.render_to_string') as render:
+            response = self.client.get('/no-such-page/')
+        render.assert_not_called()
+        self.assertContains(response, 'Page Not Found', status_code=404)
+
+    def test_failed_prebuild_warns_and_renders_on_first_use(self):
+        with mock.patch('feedback.error_pages.render_to_string', side_effect=ValueError('missing manifest')):
+            with self.assertLogs('feedback.error_pages', 'WARNING') as logs:
+                error_pages.build()
+        self.assertTrue(all(record.levelname == 'WARNING' for record in logs.records))
+        self.assertIn(b'mt-4', error_pages.get(500))
+
+
+@override_settings(AI_PREVIEW_WORKERS=0)
+class AIPreviewJobTests(TestCase):
+    def setUp(self):
+        self.profile = User.objects.create_user(username='recipient').userprofile
+        self.url = reverse('feedback_form', args=[self.profile.unique_link])
+
+    @mock.patch('feedback.jobs.ai_service.generate_feedback', return_value='Polished feedback')
+    def test_generate_preview_queues_job_and_status_returns_result(self, generate_feedback):
+        response = self.client.post(self.url, {'user_input': 'raw thoughts', 'generate_preview': ''})
+        job = response.context['preview_job']
+        generate_feedback.assert_called_once_with('raw thoughts', 'recipient')
+
+        data = self.client.get(reverse('preview_status', args=[job.id])).json()
+        self.assertEqual(data, {'status': 'done', 'preview': 'Polished feedback'})
+
+    @mock.patch('feedback.jobs.ai_service.generate_feedback', return_value='Polished feedback')
+    def test_status_redispatches_lost_pending_job(self, generate_feedback):
+        job = AIPreviewJob.objects.create(recipient=self.profile, user_input='raw thoughts')
+        AIPreviewJob.objects.filter(id=job.id).update(created_at=job.created_at - timedelta(minutes=10))
+
+        self.client.get(reverse('preview_status', args=[job.id]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AIPreviewJob.STATUS_DONE)
+
+    @override_settings(AI_PREVIEW_WORKERS=2)
+    @mock.patch('feedback.jobs.ai_service.generate_feedback', return_value='Polished feedback')
+    def test_polls_do_not_queue_a_job_twice(self, generate_feedback):
+        with mock.patch('feedback.jobs.get_executor') as get_executor:
+            job = submit_preview_job(self.profile.id, 'raw thoughts')
+            AIPreviewJob.objects.filter(id=job.id).update(created_at=job.created_at - timedelta(minutes=10))
+            for _ in range(3):
+                self.client.get(reverse('preview_status', args=[job.id]))
+        submit = get_executor.return_value.submit
+        submit.assert_called_once()
+
+        # Once the worker finished with it, a lost job can be queued again
+        with mock.patch('feedback.jobs.connection'):
+            submit.call_args.args[0](*submit.call_args.args[1:])
+        job.refresh_from_db()
+        self.assertEqual(job.status, AIPreviewJob.STATUS_DONE)
+        self.assertFalse(is_queued(job.id))
+
+    @mock.patch('feedback.jobs.ai_service.generate_feedback', return_value='Polished feedback')
+    def test_running_job_outlives_ai_retries_before_recovery(self, generate_feedback):
+        job = AIPreviewJob.objects.create(recipient=self.profile, user_input='raw thoughts')
+        status_url = reverse('preview_status', args=[job.id])
+        in_flight = timezone.now() - timedelta(seconds=ai_service.max_request_seconds)
+        AIPreviewJob.objects.filter(id=job.id).update(status=AIPreviewJob.STATUS_RUNNING, started_at=in_flight)
+        self.client.get(status_url)
+        generate_feedback.assert_not_called()
+
+        lost = timezone.now() - running_stale_after() - timedelta(seconds=1)
+        AIPreviewJob.objects.filter(id=job.id).update(started_at=lost)
+        self.client.get(status_url)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AIPreviewJob.STATUS_DONE)
+
+
+@override_settings(TOGETHER_API_KEY='test-key')
+class AIResponseCacheTests(TestCase):
+    def setUp(self):
+        self.service = TogetherAIService()
+
+    def test_repeat_generation_is_served_from_cache(self):
+        with mock.patch.object(self.service, '_request_generation', return_value='Polished') as request:
+            self.assertEqual(self.service.generate_feedback('great  work ', 'alice'), 'Polished')
+            self.assertEqual(self.service.generate_feedback('great work', 'alice'), 'Polished')
+            self.service.generate_feedback('great work', 'bob')
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(self.service.cache.stats()['memory_hits'], 1)
+
+    def test_failed_generation_is_not_cached(self):
+        with mock.patch.object(self.service, '_request_generation', return_value=None) as request:
+            self.assertEqual(self.service.generate_feedback('great work', 'alice'), 'great work')
+            self.service.generate_feedback('great work', 'alice')
+        self.assertEqual(request.call_count, 2)
+
+    def test_memory_tier_evicts_least_recently_used_and_expired(self):
+        now = [0]
+        cache = ResponseCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        cache.get('a')
+        cache.set('c', 'C')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        now[0] = 11
+        self.assertIsNone(cache.get('a'))
+
+    def test_persistent_tier_purges_expired_rows_on_write(self):
+        cache = ResponseCache(ttl=60, persistent=True, purge_every=2)
+        cache.set('old', 'stale')
+        AIResponseCacheEntry.objects.filter(key='old').update(created_at=timezone.now() - timedelta(minutes=2))
+        cache.set('new', 'fresh')
+        self.assertEqual(list(AIResponseCacheEntry.objects.values_list('key', flat=True)), ['new'])
+
+    def test_persistent_tier_survives_memory_clear(self):
+        cache = ResponseCache(persistent=True)
+        cache.set('key', 'value')
+        cache.clear()
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual(cache.stats()['persistent_hits'], 1)
+
+
+class StreamingPreviewTests(TestCase):
+    def setUp(self):
+        self.profile = User.objects.create_user(username='recipient').userprofile
+
+    async def test_stream_feedback_yields_tokens_as_they_arrive(self):
+        # httpx is imported lazily on the first stream; keep that one-time
+        # cost out of the time-to-first-token measurement
+        import httpx  # noqa: F401
+        with FakeTogetherServer(token_delay=0.2) as server:
+            with self.settings(TOGETHER_API_KEY='test-key', TOGETHER_API_URL=server.url):
+                service = TogetherAIService()
+                start = time.perf_counter()
+                stream = service.stream_feedback('raw thoughts', 'recipient')
+                first = await stream.__anext__()
+                time_to_first_token = time.perf_counter() - start
+                rest = [chunk async for chunk in stream]
+        self.assertEqual([first] + rest, ['Hello', ' there', '!'])
+        self.assertLess(time_to_first_token, 0.5)
+        self.assertTrue(server.requests[0]['stream'])
+        self.assertEqual(service.cache.stats()['entries'], 1)
+
+    async def test_streams_share_one_client_with_the_configured_timeout(self):
+        with FakeTogetherServer() as server:
+            with self.settings(TOGETHER_API_KEY='test-key', TOGETHER_API_URL=server.url, AI_HTTP={'TIMEOUT': 7}):
+                service = TogetherAIService()
+                client = service.stream_client()
+                self.assertEqual(client.timeout.read, 7)
+                first = [chunk async for chunk in service.stream_feedback('raw thoughts', 'recipient')]
+                second = [chunk async for chunk in service.stream_feedback('other thoughts', 'recipient')]
+        self.assertEqual(first, ['Hello', ' there', '!'])
+        self.assertEqual(second, first)
+        self.assertIs(service.stream_client(), client)
+        self.assertFalse(client.is_closed)
+        self.assertEqual(len(server.requests), 2)
+        await client.aclose()
+
+    async def test_stream_preview_view_emits_server_sent_events(self):
+        with FakeTogetherServer() as server:
+            with mock.patch.multiple(ai_service, api_key='test-key', base_url=server.url):
+                response = await self.async_client.post(
+                    reverse('stream_preview', args=[self.profile.unique_link]),
+                    {'user_input': 'raw thoughts'},
+                )
+                body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('data: {"token": " there"}', body)
+        self.assertIn('event: done\ndata: {"preview": "Hello there!"}', body)
+
+    async def test_interrupted_stream_is_not_cached_or_offered(self):
+        with FakeTogetherServer(drop_after=2) as server:
+            with mock.patch.multiple(ai_service, api_key='test-key', base_url=server.url):
+                with mock.patch.object(ai_service.cache, 'set') as cache_set:
+                    response = await self.async_client.post(
+                        reverse('stream_preview', args=[self.profile.unique_link]),
+                        {'user_input': 'raw thoughts'},
+                    )
+                    body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        cache_set.assert_not_called()
+        self.assertIn('data: {"token": " there"}', body)
+        self.assertIn('event: error\n', body)
+        self.assertNotIn('event: done', body)
+
+
+class AIHttpClientTests(TestCase):
+    def make_service(self, server, **http_config):
+        config = {'BACKOFF_FACTOR': 0, **http_config}
+        with self.settings(TOGETHER_API_KEY='test-key', TOGETHER_API_URL=server.url, AI_HTTP=config):
+            return TogetherAIService()
+
+    def test_calls_reuse_pooled_connection(self):
+        with FakeTogetherServer() as server:
+            service = self.make_service(server)
+            for i in range(5):
+                self.assertEqual(service._request_generation(f'input {i}', 'alice'), 'Hello there!')
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(service.latency.snapshot()['calls'], 5)
+
+    def test_server_errors_are_retried(self):
+        with FakeTogetherServer(fail_first=2) as server:
+            service = self.make_service(server, MAX_RETRIES=3)
+            self.assertEqual(service._request_generation('input', 'alice'), 'Hello there!')
+        self.assertEqual(len(server.requests), 3)
+
+    def test_retries_are_bounded(self):
+        with FakeTogetherServer(fail_first=10) as server:
+            service = self.make_service(server, MAX_RETRIES=2)
+            self.assertIsNone(service._request_generation('input', 'alice'))
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(service.latency.snapshot()['errors'], 1)
+
+    def test_read_timeout_is_not_retried(self):
+        with FakeTogetherServer(latency=0.5) as server:
+            service = self.make_service(server, MAX_RETRIES=3, TIMEOUT=0.1)
+            with self.assertLogs('feedback.ai_service', 'ERROR'):
+                self.assertIsNone(service._request_generation('input', 'alice'))
+        self.assertEqual(len(server.requests), 1)
+
+    def test_slow_call_is_hedged(self):
+        with FakeTogetherServer(latency=0.01) as server:
+            service = self.make_service(server, HEDGE_PERCENTILE=50, HEDGE_MIN_SAMPLES=5)
+            for i in range(5):
+                service._request_generation(f'input {i}', 'alice')
+            server.latency = 0.3
+            server.slow_fraction, server.slow_latency = 0.5, 0.01
+            for i in range(5):
+                service._request_generation(f'slow {i}', 'alice')
+        self.assertGreater(service.latency.snapshot()['hedged'], 0)
+
+
+class BulkFeedbackTests(TestCase):
+    """Runs under the default FEEDBACK_RATE_LIMITS, as integrations would"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice').userprofile
+        self.bob = User.objects.create_user(username='bob').userprofile
+        self.url = reverse('bulk_feedback')
+        self.addCleanup(limiter.backend.clear)
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_batch_is_inserted_in_one_statement(self):
+        items = [{'link': str(profile.unique_link), 'message': f'Retro note {i}'}
+                 for i, profile in enumerate([self.alice, self.bob] * 50)]
+        # profile lookup, savepoint, insert, one counter update per recipient, release
+        with self.assertNumQueries(6):
+            response = self.post({'feedback': items})
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['created'], 100)
+        self.assertEqual(self.alice.received_feedback.count(), 50)
+        token = data['feedback'][1]['delete_token']
+        self.assertEqual(AnonymousFeedback.objects.get(delete_token=token).recipient, self.bob)
+
+    def test_retro_sized_batches_pass_the_rate_limits(self):
+        team = [User.objects.create_user(username=f'member{i}').userprofile for i in range(5)]
+        for batch in range(2):
+            items = [{'link': str(profile.unique_link), 'message': f'Retro {batch} note {i}'}
+                     for i, profile in enumerate(team * 100)]
+            response = self.post({'feedback': items})
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['created'], 500)
+        self.assertEqual(AnonymousFeedback.objects.count(), 1000)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        response = self.post({'feedback': [
+            {'link': str(self.alice.unique_link), 'message': 'Fine'},
+            {'link': 'not-a-uuid', 'message': 'Lost'},
+            {'link': str(self.bob.unique_link), 'message': ''},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'1', '2'})
+        self.assertFalse(AnonymousFeedback.objects.exists())
+
+
+@override_settings(AI_PREVIEW_WORKERS=0)
+class FeedbackCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.form_url = reverse('feedback_form', args=[self.profile.unique_link])
+
+    def test_counters_follow_submissions_and_deletions(self):
+        self.client.post(self.form_url, {'message': 'First'})
+        self.client.post(self.form_url, {
+            'confirm_ai_feedback': '', 'original_input': 'raw', 'generated_message': 'Polished',
+        })
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.feedback_count, self.profile.ai_feedback_count), (2, 1))
+
+        ai_feedback = AnonymousFeedback.objects.get(is_ai_generated=True)
+        self.client.post(reverse('delete_feedback', args=[ai_feedback.delete_token]))
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.feedback_count, self.profile.ai_feedback_count), (1, 0))
+        self.assertEqual(self.profile.last_feedback_at, AnonymousFeedback.objects.get().submitted_at)
+
+        self.client.login(username='recipient', password='pass12345')
+        remaining = AnonymousFeedback.objects.get()
+        self.client.post(reverse('delete_received_feedback', args=[remaining.id]))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.feedback_count, 0)
+        self.assertIsNone(self.profile.last_feedback_at)
+
+    def test_user_saves_and_logins_keep_counters(self):
+        self.client.post(self.form_url, {'message': 'First'})
+        # self.user.userprofile was loaded before the submission and is stale
+        self.assertEqual(self.user.userprofile.feedback_count, 0)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.client.login(username='recipient', password='pass12345')
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.feedback_count, 1)
+
+    def test_double_delete_is_counted_once(self):
+        self.client.post(self.form_url, {'message': 'First'})
+        self.client.post(self.form_url, {'message': 'Second'})
+        feedback = AnonymousFeedback.objects.first()
+        duplicate = AnonymousFeedback.objects.get(pk=feedback.pk)
+        remove_feedback(feedback)
+        remove_feedback(duplicate)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.feedback_count, 1)
+
+    def test_rebuild_repairs_drift(self):
+        AnonymousFeedback.objects.create(recipient=self.profile, message='Untracked', is_ai_generated=True)
+        rebuild_counters()
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.feedback_count, self.profile.ai_feedback_count), (1, 1))
+
+
+@override_settings(FEEDBACK_RATE_LIMITS={'ip': (3, 60), 'link': (5, 60), 'bulk': (4, 60)})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        self.profile = User.objects.create_user(username='recipient').userprofile
+        self.url = reverse('feedback_form', args=[self.profile.unique_link])
+        self.addCleanup(limiter.backend.clear)
+
+    def post_from(self, ip):
+        return self.client.post(self.url, {'message': 'Hello'}, REMOTE_ADDR=ip)
+
+    def test_ip_limit_returns_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.post_from('10.0.0.1').status_code, 302)
+        response = self.post_from('10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(AnonymousFeedback.objects.count(), 3)
+
+    def test_link_limit_applies_across_clients(self):
+        for i in range(5):
+            self.assertEqual(self.post_from(f'10.0.1.{i}').status_code, 302)
+        self.assertEqual(self.post_from('10.0.1.99').status_code, 429)
+
+    def post_bulk_from(self, ip, count):
+        items = [{'link': str(self.profile.unique_link), 'message': 'Hello'}] * count
+        return self.client.post(
+            reverse('bulk_feedback'), json.dumps({'feedback': items}),
+            content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_bulk_items_are_charged_in_their_own_scope(self):
+        self.assertEqual(self.post_bulk_from('10.0.3.1', 3).status_code, 201)
+        # The form's per-IP window is untouched
+        self.assertEqual(self.post_from('10.0.3.1').status_code, 302)
+        response = self.post_bulk_from('10.0.3.1', 2)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('retry_after', response.json())
+        # The rejected batch was not counted
+        self.assertEqual(self.post_bulk_from('10.0.3.1', 1).status_code, 201)
+        self.assertEqual(AnonymousFeedback.objects.count(), 5)
+
+    def test_batch_larger_than_a_limit_is_refused_without_charge(self):
+        self.assertEqual(self.post_bulk_from('10.0.3.1', 6).status_code, 413)
+        for i in range(5):
+            self.assertEqual(self.post_from(f'10.0.4.{i}').status_code, 302)
+
+    def test_bulk_items_count_against_their_link(self):
+        for i in range(4):
+            self.assertEqual(self.post_from(f'10.0.4.{i}').status_code, 302)
+        self.assertEqual(self.post_bulk_from('10.0.4.99', 2).status_code, 429)
+        self.assertEqual(self.post_from('10.0.4.98').status_code, 302)
+
+    def test_get_requests_are_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.0.2.1').status_code, 200)
+
+    def test_previous_window_decays(self):
+        now = [0.0]
+        sliding = SlidingWindowLimiter(MemoryBackend(), clock=lambda: now[0])
+        for _ in range(4):
+            self.assertTrue(sliding.hit('key', 4, 60)[0])
+        now[0] = 61  # previous window still weighs ~98%
+        allowed, retry_after = sliding.hit('key', 4, 60)
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+        now[0] = 115  # previous window weighs ~8%
+        self.assertTrue(sliding.hit('key', 4, 60)[0])
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.client.login(username='recipient', password='pass12345')
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def test_server_timing_header_reports_queries(self):
+        response = self.client.get(reverse('dashboard'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'app;dur=[\d.]+')
+        queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+        self.assertGreater(queries, 0)
+
+    def test_requests_are_recorded_per_url_name(self):
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('dashboard'))
+        self.client.get('/no-such-page/')
+        stats = registry.snapshot()
+        self.assertEqual(list(stats), ['dashboard'])
+        self.assertEqual(stats['dashboard']['requests'], 2)
+        self.assertGreater(stats['dashboard']['queries']['p50'], 0)
+
+    @override_settings(PERFORMANCE_METRICS={'QUERY_BUDGET': 10, 'QUERY_BUDGETS': {'dashboard': 1}})
+    def test_query_budget_overrun_is_logged(self):
+        with self.assertLogs('feedback.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('dashboard'))
+        self.assertIn('dashboard ran', logs.output[0])
+        self.assertEqual(registry.snapshot()['dashboard']['over_query_budget'], 1)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('performance_metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse('dashboard'))
+        data = self.client.get(reverse('performance_metrics')).json()
+        self.assertIn('dashboard', data['views'])
+        self.assertIn('p95_ms', data['ai_service'])
+
+
+@override_settings(PAGE_CACHE={})
+class QueryCountTests(TestCase):
+    """Views and admin listings run a fixed number of queries however many rows exist"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.client.login(username='recipient', password='pass12345')
+        self.admin = User.objects.create_superuser(username='admin', password='pass12345')
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def add_feedback(self, count):
+        AnonymousFeedback.objects.bulk_create([
+            AnonymousFeedback(recipient=self.profile, message=f'Message {i}', is_ai_generated=i % 2 == 0,
+                              original_input=f'Input {i}')
+            for i in range(count)
+        ])
+        rebuild_counters()
+
+    def assertConstantQueries(self, num, get_url, client=None):
+        client = client or self.client
+        for rows in (1, DASHBOARD_PAGE_SIZE * 2):
+            self.add_feedback(rows)
+            url = get_url()
+            with self.subTest(url=url, rows=rows), self.assertNumQueries(num):
+                self.assertEqual(client.get(url).status_code, 200)
+
+    def test_dashboard(self):
+        # session, user, profile, feedback page
+        self.assertConstantQueries(4, lambda: reverse('dashboard'))
+
+    def test_dashboard_feed(self):
+        # session, user, profile, feedback page
+        self.assertConstantQueries(4, lambda: reverse('dashboard_feed'))
+
+    def test_feedback_form(self):
+        url = reverse('feedback_form', args=[self.profile.unique_link])
+        self.client_class().get(url)
+        # The recipient comes from the recipient cache once the link is warm
+        self.assertConstantQueries(0, lambda: url, self.client_class())
+
+    def test_delete_pages(self):
+        latest = lambda: AnonymousFeedback.objects.first()
+        self.assertConstantQueries(1, lambda: reverse('delete_feedback', args=[latest().delete_token]), self.client_class())
+        self.assertConstantQueries(3, lambda: reverse('delete_received_feedback', args=[latest().id]))
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.admin)
+        self.assertConstantQueries(5, lambda: reverse('admin:feedback_anonymousfeedback_changelist'))
+        self.assertConstantQueries(5, lambda: reverse('admin:feedback_userprofile_changelist'))
+
+    def test_str_does_not_query(self):
+        self.add_feedback(3)
+        feedback_list = list(AnonymousFeedback.objects.for_listing())
+        profiles = list(UserProfile.objects.all())
+        with self.assertNumQueries(0):
+            [str(feedback) for feedback in feedback_list]
+            [str(profile) for profile in profiles]
+
+
+@override_settings(FEEDBACK_RECEIPTS={'MAX': 3, 'MAX_AGE': 3600})
+class DeleteReceiptTests(TestCase):
+    def setUp(self):
+        self.profile = User.objects.create_user(username='recipient', password='pass12345').userprofile
+        self.url = reverse('feedback_form', args=[self.profile.unique_link])
+        limiter.backend.clear()
+        self.addCleanup(limiter.backend.clear)
+
+    def submit(self, message='Nice work'):
+        response = self.client.post(self.url, {'message': message})
+        self.assertRedirects(response, reverse('feedback_success'))
+        return AnonymousFeedback.objects.latest('id')
+
+    def test_submission_writes_no_session_rows(self):
+        for i in range(5):
+            self.submit(f'Message {i}')
+            self.client.get(reverse('feedback_success'))
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_success_page_links_latest_receipt(self):
+        feedback = self.submit()
+        response = self.client.get(reverse('feedback_success'))
+        self.assertContains(response, reverse('delete_feedback', args=[feedback.delete_token]))
+
+    def test_receipts_are_capped(self):
+        sent = [self.submit(f'Message {i}') for i in range(5)]
+        cookie = self.client.cookies[RECEIPT_COOKIE].value
+        self.assertNotIn(sent[0].delete_token.hex, cookie)
+        self.assertIn(sent[4].delete_token.hex, cookie)
+        self.assertEqual(cookie.split(':')[0].count(',') + 1, 3)
+
+    def test_tampered_cookie_is_ignored(self):
+        self.submit()
+        self.client.cookies[RECEIPT_COOKIE] = self.client.cookies[RECEIPT_COOKIE].value.replace('a', 'b', 1) + 'x'
+        response = self.client.get(reverse('feedback_success'))
+        self.assertIsNone(response.context['delete_token'])
+
+    def test_deleting_feedback_drops_its_receipt(self):
+        feedback = self.submit()
+        self.client.post(reverse('delete_feedback', args=[feedback.delete_token]))
+        self.assertFalse(AnonymousFeedback.objects.filter(id=feedback.id).exists())
+        self.assertIsNone(self.client.get(reverse('feedback_success')).context['delete_token'])
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.form_url = reverse('feedback_form', args=[self.user.userprofile.unique_link])
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_anonymous_hits_run_no_queries(self):
+        self.assertEqual(self.client.get(reverse('home'))['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(self.form_url)['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.form_url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'recipient')
+
+    def test_cached_form_gets_each_visitors_csrf_token(self):
+        self.client.get(self.form_url)
+        limiter.backend.clear()
+        self.addCleanup(limiter.backend.clear)
+        tokens = set()
+        for _ in range(2):
+            client = Client(enforce_csrf_checks=True)
+            response = client.get(self.form_url)
+            self.assertEqual(response['X-Page-Cache'], 'hit')
+            self.assertNotContains(response, 'PAGECACHECSRFTOKENPLACEHOLDER')
+            token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+            tokens.add(token)
+            response = client.post(self.form_url, {'message': 'Hello', 'csrfmiddlewaretoken': token})
+            self.assertRedirects(response, reverse('feedback_success'))
+        self.assertEqual(len(tokens), 2)
+
+    def test_logged_in_users_bypass_the_page_cache(self):
+        self.client.login(username='recipient', password='pass12345')
+        self.client.get(reverse('home'))
+        response = self.client.get(reverse('home'))
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'Go to Dashboard')
+
+    def test_profile_change_invalidates_feedback_form(self):
+        self.client.get(self.form_url)
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(self.form_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'renamed')
+
+    def test_query_strings_share_one_cached_page(self):
+        self.assertEqual(self.client.get(self.form_url, {'utm_source': 'a'})['X-Page-Cache'], 'miss')
+        response = self.client.get(self.form_url, {'utm_source': 'b'})
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, f'value="http://testserver{self.form_url}"')
+        self.assertNotContains(response, 'utm_source')
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pages'},
+            'versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'versions'},
+        },
+        PAGE_CACHE_VERSION_ALIAS='versions',
+    )
+    def test_scope_versions_live_in_the_configured_alias(self):
+        versions = caches['versions']
+        self.addCleanup(versions.clear)
+        version_key = f'pagecache:version:{self.user.userprofile.unique_link}'
+        self.client.get(self.form_url)
+        version = versions.get(version_key)
+        self.assertIsNotNone(version)
+        self.assertIsNone(cache.get(version_key))
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(self.client.get(self.form_url)['X-Page-Cache'], 'miss')
+        self.assertNotEqual(versions.get(version_key), version)
+
+
+@override_settings(PAGE_CACHE={})
+class RecipientCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient')
+        self.link = self.user.userprofile.unique_link
+        recipient_cache.clear()
+        self.addCleanup(recipient_cache.clear)
+
+    def test_hot_link_runs_no_recipient_queries(self):
+        form_url = reverse('feedback_form', args=[self.link])
+        self.client.get(form_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(form_url)
+            self.client.get(reverse('share_whatsapp', args=[self.link]))
+        self.assertContains(response, 'recipient')
+        self.assertEqual(recipient_cache.stats()['misses'], 1)
+
+    def test_user_and_profile_changes_invalidate(self):
+        self.assertEqual(recipient_cache.get(self.link).username, 'recipient')
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(recipient_cache.get(self.link).username, 'renamed')
+        self.user.delete()
+        self.assertIsNone(recipient_cache.get(self.link))
+
+    def test_unknown_links_are_not_cached(self):
+        response = self.client.get(reverse('feedback_form', args=['00000000-0000-0000-0000-000000000000']))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(recipient_cache.stats()['entries'], 0)
+
+    def test_memory_tier_is_bounded_lru(self):
+        cache_ = RecipientCache(max_entries=2)
+        links = [User.objects.create_user(username=f'user{i}').userprofile.unique_link for i in range(3)]
+        cache_.get(links[0])
+        cache_.get(links[1])
+        cache_.get(links[0])
+        cache_.get(links[2])
+        self.assertIsNotNone(cache_.get_local(links[0]))
+        self.assertIsNone(cache_.get_local(links[1]))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'recipients'}})
+    def test_shared_tier_warms_other_processes(self):
+        writer = RecipientCache(shared_alias='default')
+        reader = RecipientCache(shared_alias='default')
+        writer.get(self.link)
+        with self.assertNumQueries(0):
+            self.assertEqual(reader.get(self.link).username, 'recipient')
+
+
+class FeedbackSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.client.login(username='recipient', password='pass12345')
+
+    def add(self, message, days_ago=0, ai=False, profile=None):
+        feedback = AnonymousFeedback.objects.create(
+            recipient=profile or self.profile, message=message, is_ai_generated=ai
+        )
+        AnonymousFeedback.objects.filter(id=feedback.id).update(
+            submitted_at=feedback.submitted_at - timedelta(days=days_ago)
+        )
+        return feedback
+
+    def search(self, **params):
+        response = self.client.get(reverse('dashboard'), params)
+        return [feedback.message for feedback in response.context['feedback_list']]
+
+    def test_search_matches_words_within_own_inbox(self):
+        self.add('Great presentation skills')
+        self.add('Your presentations run long')
+        self.add('Always on time')
+        other = User.objects.create_user(username='other').userprofile
+        self.add('Presentation was fine', profile=other)
+        self.assertEqual(
+            sorted(self.search(q='presentation')),
+            ['Great presentation skills', 'Your presentations run long'],
+        )
+        self.assertEqual(self.search(q='presentation long'), ['Your presentations run long'])
+
+    def test_index_follows_bulk_creates_updates_and_deletes(self):
+        AnonymousFeedback.objects.bulk_create([AnonymousFeedback(recipient=self.profile, message='Bulk kindness')])
+        feedback = self.add('Needs more patience')
+        search = lambda text: list(search_feedback(AnonymousFeedback.objects.all(), text).values_list('message', flat=True))
+        self.assertEqual(search('kindness'), ['Bulk kindness'])
+        AnonymousFeedback.objects.filter(id=feedback.id).update(message='Needs more focus')
+        self.assertEqual(search('patience'), [])
+        self.assertEqual(search('focus'), ['Needs more focus'])
+        feedback.delete()
+        self.assertEqual(search('focus'), [])
+
+    def test_search_syntax_is_not_exposed(self):
+        self.add('Clear "communication" style')
+        self.assertEqual(self.search(q='communication" *('), ['Clear "communication" style'])
+        self.assertEqual(self.search(q='"" ***'), [])
+
+    def test_source_and_date_filters(self):
+        self.add('Old human note', days_ago=10)
+        self.add('Old ai note', days_ago=10, ai=True)
+        self.add('New ai note', ai=True)
+        today = timezone.now().date()
+        self.assertEqual(self.search(source='ai'), ['New ai note', 'Old ai note'])
+        self.assertEqual(self.search(source='human'), ['Old human note'])
+        self.assertEqual(
+            self.search(date_from=today - timedelta(days=11), date_to=today - timedelta(days=9), source='ai'),
+            ['Old ai note'],
+        )
+
+    def test_feed_pages_through_filtered_results(self):
+        AnonymousFeedback.objects.bulk_create(
+            [AnonymousFeedback(recipient=self.profile, message=f'Teamwork note {i}') for i in range(DASHBOARD_PAGE_SIZE + 3)]
+            + [AnonymousFeedback(recipient=self.profile, message=f'Other note {i}') for i in range(5)]
+        )
+        response = self.client.get(reverse('dashboard'), {'q': 'teamwork'})
+        self.assertEqual(len(response.context['feedback_list']), DASHBOARD_PAGE_SIZE)
+        data = self.client.get(
+            reverse('dashboard_feed'), {'q': 'teamwork', 'cursor': response.context['next_cursor']}
+        ).json()
+        self.assertEqual(data['count'], 3)
+        self.assertIsNone(data['next_cursor'])
+        self.assertNotIn('Other note', data['html'])
+
+    def test_invalid_date_range_is_rejected(self):
+        response = self.client.get(reverse('dashboard_feed'), {'date_from': '2026-02-01', 'date_to': '2026-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class FeedbackExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.client.login(username='recipient', password='pass12345')
+        AnonymousFeedback.objects.bulk_create([
+            AnonymousFeedback(recipient=self.profile, message=f'Note {i}, "quoted"', is_ai_generated=i == 0,
+                              ip_address='10.0.0.1')
+            for i in range(5)
+        ])
+        other = User.objects.create_user(username='other').userprofile
+        AnonymousFeedback.objects.create(recipient=other, message='Not yours')
+
+    def export(self, fmt, **params):
+        response = self.client.get(reverse('export_feedback', args=[fmt]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_contains_only_own_feedback(self):
+        rows = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        self.assertEqual([row[2] for row in rows[1:]], [f'Note {i}, "quoted"' for i in range(5)])
+        self.assertNotIn('10.0.0.1', self.export('csv'))
+
+    def test_csv_export_neutralises_formulas(self):
+        AnonymousFeedback.objects.filter(recipient=self.profile).delete()
+        for message in ['=HYPERLINK("http://evil")', '+1', '-2+3', '@SUM(A1)', 'Fine = good']:
+            AnonymousFeedback.objects.create(recipient=self.profile, message=message)
+        rows = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(
+            [row[2] for row in rows[1:]],
+            ['\'=HYPERLINK("http://evil")', "'+1", "'-2+3", "'@SUM(A1)", 'Fine = good'],
+        )
+        # JSON lines are data, not spreadsheet cells, and stay verbatim
+        first = json.loads(self.export('jsonl').splitlines()[0])
+        self.assertEqual(first['message'], '=HYPERLINK("http://evil")')
+
+    def test_jsonl_export_honours_filters(self):
+        lines = [json.loads(line) for line in self.export('jsonl', source='ai').splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['message'], 'Note 0, "quoted"')
+        self.assertTrue(lines[0]['is_ai_generated'])
+
+    def test_unknown_format_is_404(self):
+        self.assertEqual(self.client.get(reverse('export_feedback', args=['xml'])).status_code, 404)
+
+    def test_keyset_batches_match_server_side_cursor(self):
+        queryset = AnonymousFeedback.objects.all()
+        expected = list(iterate_rows(queryset, EXPORT_FIELDS, chunk_size=2))
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            # 6 rows in batches of 2: three full batches and an empty one
+            with self.assertNumQueries(4):
+                batched = list(iterate_rows(queryset, EXPORT_FIELDS, chunk_size=2))
+        self.assertEqual(batched, expected)
+        self.assertEqual(len(batched), 6)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.profile = User.objects.create_user(username='recipient').userprofile
+        now = timezone.now()
+        for age_days, message in [(400, 'ancient'), (100, 'old'), (40, 'recent'), (1, 'new')]:
+            feedback = AnonymousFeedback.objects.create(
+                recipient=self.profile, message=message, original_input=f'{message} input',
+                ip_address='10.0.0.1', is_ai_generated=message == 'ancient',
+            )
+            AnonymousFeedback.objects.filter(pk=feedback.pk).update(submitted_at=now - timedelta(days=age_days))
+        rebuild_counters()
+        self.now = now
+
+    def test_scrub_clears_only_expired_values_in_batches(self):
+        batches = list(scrub_expired_field('ip_address', self.now - timedelta(days=30), batch_size=2))
+        self.assertEqual(batches, [2, 1])
+        kept = AnonymousFeedback.objects.exclude(ip_address=None).values_list('message', flat=True)
+        self.assertEqual(list(kept), ['new'])
+        self.assertEqual(list(scrub_expired_field('ip_address', self.now - timedelta(days=30))), [])
+
+    def test_archive_to_table_moves_rows_and_updates_counters(self):
+        archived = list(archive_expired_feedback(self.now - timedelta(days=90), batch_size=1))
+        self.assertEqual(archived, [1, 1])
+        self.assertEqual(
+            list(ArchivedFeedback.objects.order_by('submitted_at').values_list('message', flat=True)),
+            ['ancient', 'old'],
+        )
+        self.assertFalse(AnonymousFeedback.objects.filter(message__in=['ancient', 'old']).exists())
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.feedback_count, self.profile.ai_feedback_count), (2, 0))
+
+    def test_archive_keeps_ids_beyond_32_bits(self):
+        AnonymousFeedback.objects.filter(message='ancient').update(id=2**31 + 7)
+        list(archive_expired_feedback(self.now - timedelta(days=300)))
+        self.assertEqual(ArchivedFeedback.objects.get().id, 2**31 + 7)
+
+    def test_archive_to_jsonl_writes_gzipped_batches(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            list(archive_expired_feedback(self.now - timedelta(days=90), target='jsonl', archive_dir=archive_dir))
+            files = sorted(Path(archive_dir).rglob('*.jsonl.gz'))
+            self.assertEqual(len(files), 1)
+            with gzip.open(files[0], 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+        self.assertEqual([row['message'] for row in rows], ['ancient', 'old'])
+        self.assertNotIn('ip_address', rows[0])
+        self.assertFalse(ArchivedFeedback.objects.exists())
+        self.assertEqual(AnonymousFeedback.objects.count(), 2)
+
+    def test_apply_retention_command(self):
+        out = io.StringIO()
+        call_command('apply_retention', '--dry-run', stdout=out)
+        self.assertIn('1 row(s) older than 365 days would be archived', out.getvalue())
+        self.assertEqual(AnonymousFeedback.objects.count(), 4)
+
+        call_command('apply_retention', stdout=io.StringIO())
+        remaining = {f.message: f for f in AnonymousFeedback.objects.all()}
+        self.assertEqual(sorted(remaining), ['new', 'old', 'recent'])
+        self.assertIsNone(remaining['old'].original_input)
+        self.assertIsNone(remaining['recent'].ip_address)
+        self.assertEqual(remaining['recent'].original_input, 'recent input')
+        self.assertEqual(remaining['new'].ip_address, '10.0.0.1')
+        self.assertEqual(ArchivedFeedback.objects.get().message, 'ancient')
+
+
+@override_settings(AI_PREVIEW_WORKERS=0)
+class LoadTestSuiteTests(TestCase):
+    def test_bench_flows_smoke_run_writes_json_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command(
+                'bench_flows', '--users', '3', '--feedback', '30', '--requests', '4', '--driver', 'client',
+                '--ai-latency', '0', '--output', str(output), stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        self.assertEqual(report['meta']['database'], connection.vendor)
+        self.assertEqual(len(report['results']), 6)
+        for result in report['results']:
+            self.assertEqual((result['requests'], result['errors']), (4, 0), result)
+            self.assertIn('p95', result['latency_ms'])
+        self.assertFalse(User.objects.filter(username__startswith='bench_flows_').exists())
+
+    def test_seed_data_refuses_remote_database(self):
+        User.objects.create_user(username='bench_flows_00000')
+        remote = {'HOST': 'aws-0-eu-north-1.pooler.supabase.com'}
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.dict(connection.settings_dict, remote):
+            with self.assertRaises(CommandError):
+                call_command('bench_flows', '--users', '1', '--feedback', '1', stderr=io.StringIO())
+            with self.assertRaises(CommandError):
+                cleanup_seed_data()
+        self.assertTrue(User.objects.filter(username='bench_flows_00000').exists())
+
+
+class DatabaseSettingsTests(TestCase):
+    """The DATABASES strategy built from the environment in settings.py"""
+
+    def load_database(self, psycopg3=False, **env):
+        path = Path(__file__).resolve().parent.parent / 'whisperlink_backend' / 'settings.py'
+        find_spec = mock.Mock(side_effect=lambda name: object() if psycopg3 and name == 'psycopg' else None)
+        with mock.patch.dict('os.environ', env), mock.patch('importlib.util.find_spec', find_spec):
+            return runpy.run_path(str(path))['DATABASES']['default']
+
+    def test_pooler_defaults_keep_connections_without_server_side_state(self):
+        database = self.load_database()
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        # psycopg2 never prepares statements and rejects psycopg 3 options
+        self.assertNotIn('prepare_threshold', database['OPTIONS'])
+
+    def test_psycopg3_never_prepares_statements_behind_the_pooler(self):
+        database = self.load_database(psycopg3=True, DB_SERVER_SIDE_BINDING='True')
+        self.assertIsNone(database['OPTIONS']['prepare_threshold'])
+        self.assertFalse(database['OPTIONS']['server_side_binding'])
+
+        direct = self.load_database(psycopg3=True, DB_TRANSACTION_POOLER='False', DB_SERVER_SIDE_BINDING='True')
+        self.assertNotIn('prepare_threshold', direct['OPTIONS'])
+        self.assertTrue(direct['OPTIONS']['server_side_binding'])
+        self.assertFalse(direct['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_pool_replaces_persistent_connections(self):
+        database = self.load_database(psycopg3=True, DB_POOL='True', DB_POOL_MAX_SIZE='4')
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 4)
+
+    def test_sqlite_engine_switch(self):
+        database = self.load_database(DB_ENGINE='sqlite3', DB_SQLITE_PATH='/tmp/whisperlink.sqlite3')
+        self.assertEqual(database['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(database['NAME'], '/tmp/whisperlink.sqlite3')
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_database(DB_ENGINE='mysql')
+
+    def test_pool_without_psycopg3_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_database(DB_POOL='True')
+
+    @skipUnless(connection.vendor == 'postgresql', 'compares PostgreSQL connection strategies')
+    def test_bench_db_connections_reports_each_strategy(self):
+        stdout = io.StringIO()
+        call_command('bench_db_connections', '--requests', '3', stdout=stdout, stderr=io.StringIO())
+        rows = {line[:30].strip(): line.split()[-1] for line in stdout.getvalue().splitlines()[1:]}
+        self.assertEqual(rows['new connection per request'], '3')
+        self.assertEqual(rows['persistent'], '0')
+
+
+@override_settings(DATABASE_REPLICATION={'REPLICAS': ['replica'], 'PIN_SECONDS': 5})
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_replica_only_in_read_only_requests(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        with route_request(False):
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        with route_request(True) as state:
+            self.assertEqual(self.router.db_for_read(User), 'replica')
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            # Reads after a write see it
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertTrue(state.wrote)
+
+    def test_writing_request_pins_client_to_primary(self):
+        factory = RequestFactory()
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse())
+        self.assertTrue(middleware.may_use_replica(factory.get('/')))
+        self.assertFalse(middleware.may_use_replica(factory.post('/')))
+
+        def writing_view(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(writing_view)(factory.post('/'))
+        cookie = response.cookies[ReplicaRoutingMiddleware.COOKIE_NAME]
+        self.assertEqual(cookie['max-age'], 5)
+        pinned = factory.get('/')
+        pinned.COOKIES[cookie.key] = cookie.value
+        self.assertFalse(middleware.may_use_replica(pinned))
+        self.assertNotIn(cookie.key, middleware(factory.get('/')).cookies)
+
+
+# Any second configured database (settings.py names them replica_1, ...)
+# can stand in for the replica
+TEST_REPLICA = next((alias for alias in settings.DATABASES if alias != 'default'), None)
+
+
+@skipUnless(TEST_REPLICA, "needs a second configured database to stand in for a replica")
+@override_settings(DATABASE_REPLICATION={'REPLICAS': [TEST_REPLICA], 'PIN_SECONDS': 5}, PAGE_CACHE={})
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Two real databases; nothing is replicated, so the replica stands for one
+    that is lagging behind the primary. TransactionTestCase because the
+    router keeps reads inside transactions on the primary.
+    """
+    databases = {'default', TEST_REPLICA} - {None}
+
+    def test_read_only_request_reads_from_replica(self):
+        profile = User.objects.create_user(username='recipient').userprofile
+        with CaptureQueriesContext(connections[TEST_REPLICA]) as replica_queries:
+            response = self.client.get(reverse('feedback_form', args=[profile.unique_link]))
+        # The replica hasn't replayed the new profile yet
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(replica_queries.captured_queries)
+
+    def test_dashboard_after_deletion_reads_from_primary(self):
+        user = User.objects.create_user(username='recipient')
+        feedback = AnonymousFeedback.objects.create(recipient=user.userprofile, message='Remove me')
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('delete_received_feedback', args=[feedback.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(ReplicaRoutingMiddleware.COOKIE_NAME, response.cookies)
+
+        with CaptureQueriesContext(connections[TEST_REPLICA]) as replica_queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica_queries.captured_queries, [])
+        self.assertNotContains(response, 'Remove me')
+
+        # Once the pin expires the session is read from the replica, which lacks it
+        with mock.patch('feedback.middleware.time.time', return_value=time.time() + 6):
+            with CaptureQueriesContext(connections[TEST_REPLICA]) as replica_queries:
+                response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(replica_queries.captured_queries)
+
+
+def reload_urlconf():
+    """Rebuild the URLconf, whose hot views depend on ASYNC_VIEWS"""
+    from whisperlink_backend import urls as root_urls
+    from . import urls
+    importlib.reload(urls)
+    importlib.reload(root_urls)
+    clear_url_caches()
+
+
+class ViewFlavourTests(SimpleTestCase):
+    def test_hot_views_are_sync_by_default(self):
+        # Under WSGI an async view would cost an event loop per request
+        for url in (reverse('dashboard'), reverse('health_check')):
+            self.assertFalse(iscoroutinefunction(resolve(url).func), url)
+
+
+@override_settings(PAGE_CACHE={})
+class AsyncViewTests(TestCase):
+    """The async flavours of the hot views, through the ASGI handler and its async middleware chain"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Cleanups run last-in first-out: settings are restored before the reload
+        cls.addClassCleanup(reload_urlconf)
+        cls.enterClassContext(override_settings(ASYNC_VIEWS=True))
+        reload_urlconf()
+
+    def test_hot_views_resolve_to_async_flavours(self):
+        for url in (reverse('dashboard'), reverse('health_check')):
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='recipient', password='pass12345')
+        self.profile = self.user.userprofile
+        self.client = AsyncClient()
+
+    async def test_dashboard_counts_async_orm_queries(self):
+        await AnonymousFeedback.objects.acreate(recipient=self.profile, message='Async hello')
+        await self.client.aforce_login(self.user)
+        response = await self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Async hello')
+        # session, user, profile and the feedback page, all run from worker threads
+        self.assertIn('desc="4 queries"', response['Server-Timing'])
+
+    async def test_feedback_form_post_and_delete(self):
+        url = reverse('feedback_form', args=[self.profile.unique_link])
+        self.assertEqual((await self.client.get(url)).status_code, 200)
+        response = await self.client.post(url, {'message': 'Sent over ASGI'})
+        self.assertRedirects(response, reverse('feedback_success'), fetch_redirect_response=False)
+
+        feedback = await AnonymousFeedback.objects.aget(message='Sent over ASGI')
+        await self.profile.arefresh_from_db()
+        self.assertEqual(self.profile.feedback_count, 1)
+
+        response = await self.client.post(reverse('delete_feedback', args=[feedback.delete_token]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await AnonymousFeedback.objects.filter(id=feedback.id).aexists())
+        await self.profile.arefresh_from_db()
+        self.assertEqual(self.profile.feedback_count, 0)
+
+    async def test_health_check(self):
+        response = await self.client.get(reverse('health_check'))
+        self.assertEqual(response.json()['status'], 'healthy')
@@ -1,7 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
 
+
+def hot_view(name):
+    """
+    The async flavour of a hot view when ASYNC_VIEWS is on (ASGI), the sync
+    one otherwise: under WSGI an async view costs an event loop per request
+    """
+    return getattr(views, f'a{name}' if settings.ASYNC_VIEWS else name)
+
+
 urlpatterns = [
     path('', views.home, name='home'),
     path('register/', views.register, name='register'),
@@ -17,13 +27,19 @@ urlpatterns = [
     path('password-reset/done/', auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name='password_reset_done'),
     path('reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(template_name='registration/password_reset_confirm.html'), name='password_reset_confirm'),
     path('reset/done/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name='password_reset_complete'),
-    path('dashboard/', views.dashboard, name='dashboard'),
-    path('feedback/<uuid:link_id>/', views.feedback_form, name='feedback_form'),
+    path('dashboard/', hot_view('dashboard'), name='dashboard'),
+    path('dashboard/feed/', views.dashboard_feed, name='dashboard_feed'),
+    path('dashboard/export.<str:fmt>', views.export_feedback, name='export_feedback'),
+    path('feedback/<uuid:link_id>/', hot_view('feedback_form'), name='feedback_form'),
+    path('feedback/<uuid:link_id>/stream-preview/', views.stream_preview, name='stream_preview'),
+    path('feedback/preview/<uuid:job_id>/', views.preview_status, name='preview_status'),
+    path('api/feedback/bulk/', views.bulk_feedback, name='bulk_feedback'),
     path('feedback-success/', views.feedback_success, name='feedback_success'),
     path('profile-settings/', views.profile_settings, name='profile_settings'),
-    path('delete-feedback/<uuid:delete_token>/', views.delete_feedback, name='delete_feedback'),
+    path('delete-feedback/<uuid:delete_token>/', hot_view('delete_feedback'), name='delete_feedback'),
     path('delete-received-feedback/<int:feedback_id>/', views.delete_received_feedback, name='delete_received_feedback'),
     path('share-whatsapp/<uuid:link_id>/', views.share_whatsapp, name='share_whatsapp'),
     path('about-developer/', views.about_developer, name='about_developer'),
-    path('health/', views.health_check, name='health_check'),
+    path('health/', hot_view('health_check'), name='health_check'),
+    path('metrics/performance/', views.performance_metrics, name='performance_metrics'),
 ]
@@ -0,0 +1,30 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.urls import resolve
+
+
+def get_client_ip(request):
+    """Get client IP address"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip
+
+
+def resolve_view(path):
+    """Resolve the view serving path, callable synchronously whichever flavour is routed"""
+    view = resolve(path).func
+    if iscoroutinefunction(view):
+        return async_to_sync(view)
+    return view
+
+
+def attach_user(request, user):
+    """Set request.user and request.auser as AuthenticationMiddleware would"""
+    async def auser():
+        return user
+
+    request.user = user
+    request.auser = auser
+    return request
@@ -1,26 +1,45 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth import login, authenticate
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, Http404
+from django.template.loader import render_to_string
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.db import connection
-from django.db.utils import OperationalError
-from .models import UserProfile, AnonymousFeedback
-from .forms import FeedbackForm, AIFeedbackForm
-from .ai_service import ai_service
+from django.db import transaction
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from .models import UserProfile, AnonymousFeedback, AIPreviewJob
+from .forms import FeedbackForm, AIFeedbackForm, FeedbackFilterForm
+from .ai_service import StreamInterrupted, ai_service
+from .jobs import submit_preview_job, recover_stale_job
+from .pagination import apaginate_feedback, paginate_feedback, InvalidCursor
+from .search import filter_feedback
+from .export import EXPORT_FORMATS, export_lines
+from .counters import record_feedback_created, record_feedback_deleted
+from .decorators import primary_database, rate_limited
+from .page_cache import cache_anonymous_page, cache_policy
+from .recipients import aget_recipient_or_404, get_recipient_or_404
+from .receipts import add_receipt, get_receipts, remove_receipt
+from .utils import get_client_ip
+from .health import db_health
+from .instrumentation import registry
 import json
 import urllib.parse
+import uuid
+from collections import Counter
 
 
+@cache_anonymous_page('home')
 def home(request):
     """Home page view"""
-    return render(request, 'feedback/home.html')
+    return render(request, 'feedback/home.html', {'cache_ttl': cache_policy('home')})
 
 
 def register(request):
@@ -37,6 +56,59 @@ def register(request):
     return render(request, 'registration/register.html', {'form': form})
 
 
+async def resolve_user(request):
+    """
+    Load request.user with the async ORM. Async views call this before
+    rendering, since templates read the user and the lazy request.user would
+    hit the session store from the event loop.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+def save_new_feedback(feedback):
+    """Save new feedback and bump its recipient's counters in one transaction"""
+    with transaction.atomic():
+        feedback.save()
+        record_feedback_created(
+            feedback.recipient_id, ai_count=int(feedback.is_ai_generated), submitted_at=feedback.submitted_at,
+        )
+
+
+def remove_feedback(feedback):
+    """
+    Delete feedback and take it off its recipient's counters in one
+    transaction. A concurrent delete that got there first is not counted twice.
+    """
+    with transaction.atomic():
+        _, deleted = feedback.delete()
+        if deleted.get(AnonymousFeedback._meta.label):
+            record_feedback_deleted(feedback.recipient_id, ai_count=int(feedback.is_ai_generated))
+
+
+def dashboard_listing(request, profile):
+    """The dashboard's feedback queryset, narrowed by its filter form"""
+    # Stats come from the denormalized counters on the profile
+    feedback = AnonymousFeedback.objects.for_listing().filter(recipient=profile)
+    filter_form = FeedbackFilterForm(request.GET or None)
+    if filter_form.is_valid():
+        feedback = filter_feedback(feedback, filter_form.cleaned_data)
+    return feedback, filter_form
+
+
+def render_dashboard(request, profile, filter_form, page):
+    feedback_list, next_cursor = page
+    context = {
+        'profile': profile,
+        'feedback_list': feedback_list,
+        'next_cursor': next_cursor,
+        'feedback_link': request.build_absolute_uri(profile.get_feedback_link()),
+        'filter_form': filter_form,
+        'is_filtering': filter_form.is_filtering(),
+    }
+    return render(request, 'feedback/dashboard.html', context)
+
+
 @login_required
 def dashboard(request):
     """User dashboard showing received feedback"""
@@ -45,20 +117,130 @@ def dashboard(request):
     except UserProfile.DoesNotExist:
         profile = UserProfile.objects.create(user=request.user)
     
-    feedback_list = AnonymousFeedback.objects.filter(recipient=profile)
-    feedback_link = request.build_absolute_uri(profile.get_feedback_link())
+    feedback, filter_form = dashboard_listing(request, profile)
+    return render_dashboard(request, profile, filter_form, paginate_feedback(feedback))
+
+
+@login_required
+async def adashboard(request):
+    """dashboard on the async ORM, served instead of it under ASGI"""
+    user = await resolve_user(request)
+    try:
+        profile = await UserProfile.objects.aget(user=user)
+    except UserProfile.DoesNotExist:
+        profile = await UserProfile.objects.acreate(user=user)
     
-    context = {
-        'profile': profile,
+    feedback, filter_form = dashboard_listing(request, profile)
+    return render_dashboard(request, profile, filter_form, await apaginate_feedback(feedback))
+
+
+@login_required
+@require_http_methods(["GET"])
+def dashboard_feed(request):
+    """
+    JSON "load more" endpoint returning the next page of received feedback,
+    with the same search and filter parameters as the dashboard
+    """
+    try:
+        profile = request.user.userprofile
+    except UserProfile.DoesNotExist:
+        return JsonResponse({'html': '', 'count': 0, 'next_cursor': None})
+    
+    filter_form = FeedbackFilterForm(request.GET)
+    if not filter_form.is_valid():
+        return JsonResponse({'errors': filter_form.errors}, status=400)
+    
+    try:
+        feedback_list, next_cursor = paginate_feedback(
+            filter_feedback(
+                AnonymousFeedback.objects.for_listing().filter(recipient=profile),
+                filter_form.cleaned_data,
+            ),
+            request.GET.get('cursor'),
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    html = render_to_string('feedback/includes/feedback_items.html', {
         'feedback_list': feedback_list,
-        'feedback_link': feedback_link,
+        'append': True,
+    })
+    return JsonResponse({
+        'html': html,
+        'count': len(feedback_list),
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def export_feedback(request, fmt):
+    """
+    Stream the user's received feedback as CSV or JSONL, honouring the
+    dashboard's search and filter parameters. Rows are read in chunks and
+    written as they are produced, so memory use does not grow with the inbox.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise Http404("Unknown export format.")
+    
+    filter_form = FeedbackFilterForm(request.GET)
+    if not filter_form.is_valid():
+        return JsonResponse({'errors': filter_form.errors}, status=400)
+    
+    try:
+        profile = request.user.userprofile
+    except UserProfile.DoesNotExist:
+        raise Http404("No feedback to export.")
+    
+    queryset = filter_feedback(AnonymousFeedback.objects.filter(recipient=profile), filter_form.cleaned_data)
+    content_type, _ = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(export_lines(queryset, fmt), content_type=content_type)
+    filename = f"whisperlink-feedback-{timezone.now():%Y%m%d}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def submitted_response(request, feedback, message):
+    """Redirect after a submission, handing the sender a delete receipt"""
+    messages.success(request, message)
+    response = redirect('feedback_success')
+    # The delete receipt goes in a signed cookie, not the session
+    add_receipt(request, response, feedback.delete_token)
+    return response
+
+
+def confirmed_ai_feedback(request, recipient):
+    """The AI-enhanced feedback the sender confirmed from the preview"""
+    return AnonymousFeedback(
+        recipient_id=recipient.profile_id,
+        message=request.POST.get('generated_message'),
+        original_input=request.POST.get('original_input'),
+        is_ai_generated=True,
+        ip_address=get_client_ip(request)
+    )
+
+
+def render_feedback_form(request, recipient, form, ai_form, preview_job=None, user_input=None):
+    context = {
+        'form': form,
+        'ai_form': ai_form,
+        'recipient': recipient,
     }
-    return render(request, 'feedback/dashboard.html', context)
+    if preview_job is not None:
+        context.update({
+            'preview_job': preview_job,
+            'generated_preview': preview_job.result,
+            'original_input': user_input,
+            'show_preview': True,
+        })
+    return render(request, 'feedback/feedback_form.html', context)
 
 
+@cache_anonymous_page('feedback_form', scope_kwarg='link_id')
+@rate_limited()
 def feedback_form(request, link_id):
     """Anonymous feedback submission form"""
-    profile = get_object_or_404(UserProfile, unique_link=link_id)
+    recipient = get_recipient_or_404(link_id)
     
     if request.method == 'POST':
         form = FeedbackForm(request.POST)
@@ -66,74 +248,230 @@ def feedback_form(request, link_id):
         
         if form.is_valid():
             feedback = form.save(commit=False)
-            feedback.recipient = profile
+            feedback.recipient_id = recipient.profile_id
             feedback.ip_address = get_client_ip(request)
-            feedback.save()
-            
-            # Store delete token in session for showing delete link
-            request.session[f'feedback_delete_token_{feedback.id}'] = str(feedback.delete_token)
-            
-            messages.success(request, 'Your feedback has been submitted anonymously!')
-            return redirect('feedback_success')
+            save_new_feedback(feedback)
+            return submitted_response(request, feedback, 'Your feedback has been submitted anonymously!')
         
         elif ai_form.is_valid() and 'generate_preview' in request.POST:
-            # Generate AI preview
+            # Queue the AI preview; the page polls preview_status for the result
             user_input = ai_form.cleaned_data['user_input']
-            generated_message = ai_service.generate_feedback(user_input, profile.user.username)
-            
-            context = {
-                'form': form,
-                'ai_form': ai_form,
-                'profile': profile,
-                'generated_preview': generated_message,
-                'original_input': user_input,
-                'show_preview': True,
-            }
-            return render(request, 'feedback/feedback_form.html', context)
+            preview_job = submit_preview_job(recipient.profile_id, user_input)
+            # Fast jobs (or inline workers) may already be finished
+            preview_job.refresh_from_db()
+            return render_feedback_form(request, recipient, form, ai_form, preview_job, user_input)
+        
+        elif 'confirm_ai_feedback' in request.POST:
+            feedback = confirmed_ai_feedback(request, recipient)
+            save_new_feedback(feedback)
+            return submitted_response(request, feedback, 'Your AI-enhanced feedback has been submitted anonymously!')
+    else:
+        form = FeedbackForm()
+        ai_form = AIFeedbackForm()
+    
+    return render_feedback_form(request, recipient, form, ai_form)
+
+
+@cache_anonymous_page('feedback_form', scope_kwarg='link_id')
+@rate_limited()
+async def afeedback_form(request, link_id):
+    """feedback_form on the async ORM, served instead of it under ASGI"""
+    recipient = await aget_recipient_or_404(link_id)
+    await resolve_user(request)
+    
+    if request.method == 'POST':
+        form = FeedbackForm(request.POST)
+        ai_form = AIFeedbackForm(request.POST)
+        
+        if form.is_valid():
+            feedback = form.save(commit=False)
+            feedback.recipient_id = recipient.profile_id
+            feedback.ip_address = get_client_ip(request)
+            await sync_to_async(save_new_feedback)(feedback)
+            return submitted_response(request, feedback, 'Your feedback has been submitted anonymously!')
+        
+        elif ai_form.is_valid() and 'generate_preview' in request.POST:
+            user_input = ai_form.cleaned_data['user_input']
+            preview_job = await sync_to_async(submit_preview_job)(recipient.profile_id, user_input)
+            await preview_job.arefresh_from_db()
+            return render_feedback_form(request, recipient, form, ai_form, preview_job, user_input)
         
         elif 'confirm_ai_feedback' in request.POST:
-            # Confirm and submit AI feedback
-            user_input = request.POST.get('original_input')
-            generated_message = request.POST.get('generated_message')
-            
-            feedback = AnonymousFeedback.objects.create(
-                recipient=profile,
-                message=generated_message,
-                original_input=user_input,
-                is_ai_generated=True,
-                ip_address=get_client_ip(request)
-            )
-            
-            # Store delete token in session
-            request.session[f'feedback_delete_token_{feedback.id}'] = str(feedback.delete_token)
-            
-            messages.success(request, 'Your AI-enhanced feedback has been submitted anonymously!')
-            return redirect('feedback_success')
+            feedback = confirmed_ai_feedback(request, recipient)
+            await sync_to_async(save_new_feedback)(feedback)
+            return submitted_response(request, feedback, 'Your AI-enhanced feedback has been submitted anonymously!')
     else:
         form = FeedbackForm()
         ai_form = AIFeedbackForm()
     
+    return render_feedback_form(request, recipient, form, ai_form)
+
+
+@require_http_methods(["POST"])
+@rate_limited(json=True)
+async def stream_preview(request, link_id):
+    """
+    Stream an AI preview to the browser as server-sent events while the model
+    generates it. Only streams incrementally when served over ASGI.
+    """
+    recipient = await aget_recipient_or_404(link_id)
+    
+    ai_form = AIFeedbackForm(request.POST)
+    if not ai_form.is_valid():
+        return JsonResponse({'errors': ai_form.errors}, status=400)
+    
+    response = StreamingHttpResponse(
+        preview_events(ai_form.cleaned_data['user_input'], recipient.username),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def preview_events(user_input, recipient_name):
+    """
+    Format streamed preview chunks as server-sent events. A stream that broke
+    off ends with an error event instead of done, so the partial text is not
+    offered for submission.
+    """
+    chunks = []
+    try:
+        async for chunk in ai_service.stream_feedback(user_input, recipient_name):
+            chunks.append(chunk)
+            yield f"data: {json.dumps({'token': chunk})}\n\n"
+    except StreamInterrupted:
+        yield f"event: error\ndata: {json.dumps({'error': 'The preview was interrupted, please try again.'})}\n\n"
+        return
+    yield f"event: done\ndata: {json.dumps({'preview': ''.join(chunks).strip()})}\n\n"
+
+
+@require_http_methods(["GET"])
+@primary_database
+def preview_status(request, job_id):
+    """Polling endpoint for a queued AI preview"""
+    job = get_object_or_404(AIPreviewJob, id=job_id)
+    if not job.is_finished:
+        recover_stale_job(job)
+    
+    data = {'status': job.status}
+    if job.is_finished:
+        data['preview'] = job.result
+    return JsonResponse(data)
+
+
+def feedback_success(request):
+    """Success page after feedback submission, with a delete link for the latest receipt"""
+    receipts = get_receipts(request)
     context = {
-        'form': form,
-        'ai_form': ai_form,
-        'profile': profile,
+        'delete_token': receipts[0] if receipts else None,
+        'cache_ttl': cache_policy('feedback_success'),
     }
-    return render(request, 'feedback/feedback_form.html', context)
+    return render(request, 'feedback/feedback_success.html', context)
 
 
-def feedback_success(request):
-    """Success page after feedback submission"""
-    return render(request, 'feedback/feedback_success.html')
+def bulk_charges(request, kwargs):
+    """
+    Rate limit hits of a bulk submission: one per item on the client IP's
+    bulk scope, which is sized for batches, and one per item on that item's
+    feedback link, which it shares with the form. A body without items is
+    charged as one item.
+    """
+    try:
+        items = json.loads(request.body)['feedback']
+    except (ValueError, KeyError, TypeError):
+        items = None
+    if not isinstance(items, list) or not items:
+        return {('bulk', get_client_ip(request)): 1}
+    
+    charges = Counter({('bulk', get_client_ip(request)): len(items)})
+    for item in items:
+        try:
+            charges[('link', uuid.UUID(str(item.get('link'))))] += 1
+        except (AttributeError, ValueError):
+            pass
+    return charges
 
 
-def get_client_ip(request):
-    """Get client IP address"""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limited(json=True, charges=bulk_charges, count_rejected=False)
+def bulk_feedback(request):
+    """
+    JSON bulk submission endpoint for integrations.
+
+    Expects {"feedback": [{"link": "<unique_link>", "message": "..."}, ...]}.
+    Items are rate limited in a bulk scope per client IP and on their link
+    (see bulk_charges); rejected batches are not counted.
+    Every item is validated with FeedbackForm; if any item is invalid nothing
+    is written and the errors are returned by index. Otherwise all rows are
+    inserted with a single bulk_create and their delete tokens are returned
+    in the same order.
+    """
+    try:
+        items = json.loads(request.body)['feedback']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected a JSON object with a "feedback" list.'}, status=400)
+    
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'error': '"feedback" must be a non-empty list.'}, status=400)
+    if len(items) > settings.BULK_FEEDBACK_MAX_ITEMS:
+        return JsonResponse(
+            {'error': f'At most {settings.BULK_FEEDBACK_MAX_ITEMS} items can be submitted per request.'},
+            status=400,
+        )
+    
+    links = set()
+    for item in items:
+        try:
+            links.add(uuid.UUID(str(item.get('link'))))
+        except (AttributeError, ValueError):
+            pass
+    profiles = UserProfile.objects.in_bulk(links, field_name='unique_link')
+    
+    ip_address = get_client_ip(request)
+    errors = {}
+    feedback_objects = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {'__all__': ['Each item must be an object.']}
+            continue
+        try:
+            profile = profiles.get(uuid.UUID(str(item.get('link'))))
+        except ValueError:
+            profile = None
+        form = FeedbackForm({'message': item.get('message')})
+        if profile is None:
+            errors[index] = {'link': ['No feedback link matches this value.']}
+        elif not form.is_valid():
+            errors[index] = form.errors.get_json_data()
+        else:
+            feedback = form.save(commit=False)
+            feedback.recipient = profile
+            feedback.ip_address = ip_address
+            feedback_objects.append(feedback)
+    
+    if errors:
+        return JsonResponse({'errors': errors}, status=400)
+    
+    with transaction.atomic():
+        AnonymousFeedback.objects.bulk_create(feedback_objects, batch_size=500)
+        per_profile = Counter(feedback.recipient_id for feedback in feedback_objects)
+        submitted_at = max(feedback.submitted_at for feedback in feedback_objects)
+        for profile_id, count in per_profile.items():
+            record_feedback_created(profile_id, count=count, submitted_at=submitted_at)
+    
+    return JsonResponse({
+        'created': len(feedback_objects),
+        'feedback': [
+            {
+                'link': str(feedback.recipient.unique_link),
+                'delete_token': str(feedback.delete_token),
+                'delete_url': request.build_absolute_uri(feedback.get_delete_link()),
+            }
+            for feedback in feedback_objects
+        ],
+    }, status=201)
 
 
 @login_required
@@ -149,19 +487,34 @@ def profile_settings(request):
     return render(request, 'feedback/profile_settings.html', context)
 
 
+def deleted_response(request, feedback):
+    messages.success(request, 'Your feedback has been deleted successfully!')
+    response = redirect('home')
+    remove_receipt(request, response, feedback.delete_token)
+    return response
+
+
 def delete_feedback(request, delete_token):
     """Delete feedback using delete token"""
     feedback = get_object_or_404(AnonymousFeedback, delete_token=delete_token)
     
     if request.method == 'POST':
-        feedback.delete()
-        messages.success(request, 'Your feedback has been deleted successfully!')
-        return redirect('home')
+        remove_feedback(feedback)
+        return deleted_response(request, feedback)
     
-    context = {
-        'feedback': feedback,
-    }
-    return render(request, 'feedback/delete_feedback.html', context)
+    return render(request, 'feedback/delete_feedback.html', {'feedback': feedback})
+
+
+async def adelete_feedback(request, delete_token):
+    """delete_feedback on the async ORM, served instead of it under ASGI"""
+    feedback = await aget_object_or_404(AnonymousFeedback, delete_token=delete_token)
+    await resolve_user(request)
+    
+    if request.method == 'POST':
+        await sync_to_async(remove_feedback)(feedback)
+        return deleted_response(request, feedback)
+    
+    return render(request, 'feedback/delete_feedback.html', {'feedback': feedback})
 
 
 @login_required
@@ -174,7 +527,7 @@ def delete_received_feedback(request, feedback_id):
         return redirect('dashboard')
     
     if request.method == 'POST':
-        feedback.delete()
+        remove_feedback(feedback)
         messages.success(request, 'Feedback has been deleted from your dashboard!')
         return redirect('dashboard')
     
@@ -186,8 +539,8 @@ def delete_received_feedback(request, feedback_id):
 
 def share_whatsapp(request, link_id):
     """Generate WhatsApp sharing link"""
-    profile = get_object_or_404(UserProfile, unique_link=link_id)
-    feedback_link = request.build_absolute_uri(profile.get_feedback_link())
+    recipient = get_recipient_or_404(link_id)
+    feedback_link = request.build_absolute_uri(recipient.get_feedback_link())
     
     message = f"Hi! I'd love to get your honest feedback about me. You can share your thoughts anonymously here: {feedback_link}"
     whatsapp_url = f"https://wa.me/?text={urllib.parse.quote(message)}"
@@ -195,26 +548,45 @@ def share_whatsapp(request, link_id):
     return redirect(whatsapp_url)
 
 
+@cache_anonymous_page('about_developer')
 def about_developer(request):
     """About the developer page"""
-    return render(request, 'feedback/about_developer.html')
+    return render(request, 'feedback/about_developer.html', {'cache_ttl': cache_policy('about_developer')})
 
 
-def health_check(request):
-    """Health check endpoint to test database connectivity"""
-    try:
-        # Test database connection
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            db_status = "connected"
-    except OperationalError as e:
-        db_status = f"error: {str(e)}"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
-    
+def health_response(connected):
+    db_status = "connected" if connected else f"error: {db_health.last_error}"
     status = {
         'database': db_status,
-        'status': 'healthy' if db_status == 'connected' else 'unhealthy'
+        'circuit': db_health.state,
+        'status': 'healthy' if connected else 'unhealthy'
     }
-    
     return JsonResponse(status)
+
+
+def health_check(request):
+    """
+    Health check endpoint to test database connectivity.
+
+    The SELECT 1 probe result is cached for DATABASE_HEALTH['PROBE_TTL']
+    seconds, so frequent monitoring does not add a round trip per hit.
+    """
+    return health_response(db_health.probe())
+
+
+async def ahealth_check(request):
+    """health_check without leaving the event loop on a cached probe, served under ASGI"""
+    return health_response(await db_health.aprobe())
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def performance_metrics(request):
+    """
+    Per-view latency, query and outbound HTTP percentiles recorded by
+    PerformanceMiddleware in this worker process, plus AI client stats.
+    """
+    return JsonResponse({
+        'views': registry.snapshot(),
+        'ai_service': ai_service.latency.snapshot(),
+    })
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'whisperlink_backend.settings')
+# Persistent connections would belong to per-request threads under ASGI;
+# pool with DB_POOL=True instead (see DATABASES in settings)
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+# Serve the async flavours of the hot views
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -11,15 +11,19 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Load environment variables from backend/.env when there is one. Serverless
+# deployments set real environment variables, so skip the import there.
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -55,8 +59,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'feedback.middleware.PerformanceMiddleware',
+    'feedback.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'feedback.middleware.StaticFilesMiddleware',  # WhiteNoise, async capable
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +85,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'feedback.context_processors.safe_user_context',
+                'feedback.context_processors.page_cache_csrf',
                 'django.contrib.messages.context_processors.messages',
             ],
         },
@@ -86,11 +93,66 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'whisperlink_backend.wsgi.application'
+# The hot views (feedback form, dashboard, delete, health) have async
+# flavours and the middleware is async-capable; serve this with an ASGI
+# server, e.g.
+#   uvicorn whisperlink_backend.asgi:application
+# to run them on the event loop (see the bench_asgi command for a comparison)
+ASGI_APPLICATION = 'whisperlink_backend.asgi.application'
+
+# Route the hot views to their async flavours. asgi.py turns this on; WSGI
+# keeps the sync views, which don't pay for an event loop per request.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# 'postgresql' (default) or 'sqlite3'. SQLite keeps everything in a local file
+# (DB_SQLITE_PATH) for development and the load-test commands; for a local
+# PostgreSQL point DB_HOST/DB_PORT/DB_USER/DB_PASSWORD at it and set
+# DB_SSLMODE=disable and DB_TRANSACTION_POOLER=False.
+DB_ENGINE = os.getenv('DB_ENGINE', 'postgresql')
+if DB_ENGINE not in ('postgresql', 'sqlite3'):
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'postgresql' or 'sqlite3', not {DB_ENGINE!r}.")
+
+# The default host is Supabase's transaction-mode pooler (port 6543,
+# pgbouncer compatible). Consecutive transactions may run on different server
+# connections, so no server-side state may outlive a transaction: no
+# server-side cursors and no prepared statements. Set this to False when
+# connecting directly (port 5432).
+DB_TRANSACTION_POOLER = os.getenv('DB_TRANSACTION_POOLER', 'True').lower() == 'true'
+
+# Django uses psycopg 3 when it is installed and psycopg2 otherwise
+DB_PSYCOPG3 = importlib.util.find_spec('psycopg') is not None
+
+# psycopg 3's own connection pool (needs psycopg[pool]). Preferred under ASGI,
+# where persistent connections would be tied to short-lived request threads.
+DB_POOL = os.getenv('DB_POOL', 'False').lower() == 'true'
+if DB_POOL and not DB_PSYCOPG3:
+    # Without it there would be neither a pool nor persistent connections
+    raise ImproperlyConfigured("DB_POOL=True needs psycopg 3; install psycopg[pool] or unset DB_POOL.")
+
+DATABASE_OPTIONS = {
+    'sslmode': os.getenv('DB_SSLMODE', 'require'),
+    'connect_timeout': 10,
+}
+if DB_PSYCOPG3:
+    # Django binds parameters client-side by default, which never prepares
+    # statements. Server-side binding makes psycopg prepare statements it
+    # sees repeatedly, so it is only allowed without a transaction pooler.
+    DATABASE_OPTIONS['server_side_binding'] = (
+        not DB_TRANSACTION_POOLER and os.getenv('DB_SERVER_SIDE_BINDING', 'False').lower() == 'true'
+    )
+    if DB_TRANSACTION_POOLER:
+        DATABASE_OPTIONS['prepare_threshold'] = None
+    if DB_POOL:
+        DATABASE_OPTIONS['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': 10,
+        }
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -99,12 +161,51 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'Stevoh@Stevoh2020.'),
         'HOST': os.getenv('DB_HOST', 'aws-0-eu-north-1.pooler.supabase.com'),
         'PORT': os.getenv('DB_PORT', '6543'),
-        'OPTIONS': {
-            'sslmode': 'require',
-            'connect_timeout': 10,
-        },
+        'OPTIONS': DATABASE_OPTIONS,
+        # Keep connections open between requests (seconds), so a request
+        # doesn't pay for TCP, TLS and authentication. A pool replaces this.
+        # asgi.py defaults it to 0: under ASGI each request runs its sync code
+        # in a new thread, and a persistent connection would outlive it.
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        # Check a persistent connection with a cheap query before reusing it
+        # in a new request, so a connection the pooler dropped is replaced
+        # instead of failing the request
+        'CONN_HEALTH_CHECKS': True,
+        # Server-side cursors stream exports on direct connections; they
+        # can't be kept open across transactions behind the pooler.
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv(
+            'DB_DISABLE_SERVER_SIDE_CURSORS', str(DB_TRANSACTION_POOLER),
+        ).lower() == 'true',
     }
 }
+if DB_ENGINE == 'sqlite3':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+    }
+
+
+# Read replicas, as comma-separated host or host:port, using the primary's
+# credentials. Read-only requests read from a random replica; see
+# feedback/routers.py. After a request writes, its client reads from the
+# primary for PIN_SECONDS, which should exceed the usual replication lag.
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'],
+        HOST=replica_host,
+        PORT=replica_port or DATABASES['default']['PORT'],
+        OPTIONS=dict(DATABASES['default']['OPTIONS']),
+        # Tests use the primary's test database instead of creating one
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_REPLICATION = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': int(os.getenv('DB_REPLICA_PIN_SECONDS', '5')),
+}
+
+DATABASE_ROUTERS = ['feedback.routers.PrimaryReplicaRouter']
 
 
 # Password validation
@@ -172,6 +273,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'feedback.instrumentation': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': True,
+        },
         'django.db.backends': {
             'handlers': ['console'],
             'level': 'ERROR',
@@ -180,8 +286,120 @@ LOGGING = {
     },
 }
 
+# Database health circuit breaker (see feedback/health.py)
+DATABASE_HEALTH = {
+    'FAILURE_THRESHOLD': int(os.getenv('DB_HEALTH_FAILURE_THRESHOLD', '3')),  # consecutive failures before opening
+    'RESET_TIMEOUT': int(os.getenv('DB_HEALTH_RESET_TIMEOUT', '30')),  # seconds before a half-open trial
+    'PROBE_TTL': int(os.getenv('DB_HEALTH_PROBE_TTL', '5')),  # seconds /health/ caches its SELECT 1 result
+}
+
 # Together AI API Configuration
 TOGETHER_API_KEY = os.getenv('TOGETHER_API_KEY', 'your-together-api-key-here')
+TOGETHER_API_URL = os.getenv('TOGETHER_API_URL', 'https://api.together.xyz/v1/chat/completions')
+
+# HTTP client for the Together AI API (see feedback/ai_service.py)
+AI_HTTP = {
+    'TIMEOUT': 30,  # seconds per attempt
+    'POOL_SIZE': int(os.getenv('AI_HTTP_POOL_SIZE', '10')),  # keep-alive connections per worker process
+    'MAX_RETRIES': 3,  # retries on failed connects, 429 and 5xx; never after a read timeout
+    'BACKOFF_FACTOR': 0.5,  # exponential backoff: 0.5s, 1s, 2s...
+    'BACKOFF_MAX': 4,  # longest wait between attempts, Retry-After included
+    'HEDGE_PERCENTILE': None,  # e.g. 95 to fire a second request when a call is slower than p95
+}
+
+# Content-addressed cache for AI generated feedback (see feedback/ai_service.py)
+AI_RESPONSE_CACHE = {
+    'MAX_ENTRIES': int(os.getenv('AI_CACHE_MAX_ENTRIES', '512')),
+    'TTL': int(os.getenv('AI_CACHE_TTL', '86400')),  # seconds
+    'PERSISTENT': os.getenv('AI_CACHE_PERSISTENT', 'False').lower() == 'true',  # also store in the database
+}
+
+# Flood protection for feedback submission: (requests, window seconds) per scope
+FEEDBACK_RATE_LIMITS = {
+    'ip': (20, 60),  # POSTs per client IP
+    'link': (200, 60),  # POSTs per feedback link, across all clients, bulk items included
+    'bulk': (2000, 60),  # items per client IP through the bulk API
+}
+RATE_LIMIT = {
+    'BACKEND': os.getenv('RATE_LIMIT_BACKEND', 'memory'),  # 'memory' (per process) or 'cache' (shared)
+    'CACHE_ALIAS': 'default',
+}
+
+# Delete receipts for anonymous submitters, kept in a signed cookie instead of
+# the session (see feedback/receipts.py)
+FEEDBACK_RECEIPTS = {
+    'MAX': 10,  # most recent submissions that stay deletable from one browser
+    'MAX_AGE': 7 * 24 * 3600,  # seconds
+}
+
+# Retention of received feedback, in days after submission (see
+# feedback/retention.py and the apply_retention command). None keeps forever.
+FEEDBACK_RETENTION = {
+    'IP_ADDRESS_DAYS': 30,  # then ip_address is set to NULL
+    'ORIGINAL_INPUT_DAYS': 90,  # then original_input is dropped
+    'ARCHIVE_AFTER_DAYS': 365,  # then the row leaves AnonymousFeedback
+    'ARCHIVE_TO': os.getenv('RETENTION_ARCHIVE_TO', 'table'),  # 'table' (ArchivedFeedback) or 'jsonl' (gzipped files)
+    'ARCHIVE_DIR': os.getenv('RETENTION_ARCHIVE_DIR', str(BASE_DIR / 'archive')),
+    'BATCH_SIZE': 1000,  # rows per transaction
+}
+
+# Largest batch accepted by the bulk feedback API. Its throughput limit is
+# FEEDBACK_RATE_LIMITS['bulk'], which should allow at least one full batch.
+BULK_FEEDBACK_MAX_ITEMS = int(os.getenv('BULK_FEEDBACK_MAX_ITEMS', '1000'))
+
+# Defer heavy imports (AI service HTTP clients) until first use. Keep this on
+# for serverless cold starts; long-running servers can set it to False to warm
+# everything up at startup instead.
+LAZY_STARTUP = os.getenv('LAZY_STARTUP', 'True').lower() == 'true'
+
+# Per-request instrumentation (see feedback/middleware.py PerformanceMiddleware)
+PERFORMANCE_METRICS = {
+    'WINDOW': 500,  # samples kept per view for the percentile histograms
+    'QUERY_BUDGET': int(os.getenv('QUERY_BUDGET', '10')),  # queries per request before a warning is logged
+    'QUERY_BUDGETS': {},  # per URL name overrides, e.g. {'bulk_feedback': 20}
+}
+
+# Cache backend: 'locmem' (per process) or 'file' (shared by the workers of one host)
+if os.getenv('CACHE_BACKEND', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/whisperlink-cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'whisperlink',
+        }
+    }
+
+# Page and fragment cache lifetimes in seconds, per view (see feedback/page_cache.py).
+# Anonymous visitors get the whole page from the cache; everyone else gets the
+# view's static fragments. 0 disables caching for that view.
+PAGE_CACHE = {
+    'home': int(os.getenv('PAGE_CACHE_HOME', '600')),
+    'about_developer': int(os.getenv('PAGE_CACHE_ABOUT', '3600')),
+    'feedback_success': int(os.getenv('PAGE_CACHE_FEEDBACK_SUCCESS', '3600')),
+    'feedback_form': int(os.getenv('PAGE_CACHE_FEEDBACK_FORM', '300')),
+}
+# Cache alias holding the per-scope versions that invalidate cached pages. With
+# the per-process 'locmem' backend a profile change only reaches the worker that
+# made it; the others serve the old form for up to PAGE_CACHE_FEEDBACK_FORM
+# seconds. CACHE_BACKEND=file (or an alias shared by all workers) removes that.
+PAGE_CACHE_VERSION_ALIAS = os.getenv('PAGE_CACHE_VERSION_ALIAS', 'default')
+
+# unique_link -> recipient lookups on the feedback link paths (see feedback/recipients.py)
+RECIPIENT_CACHE = {
+    'MAX_ENTRIES': 1024,
+    'TTL': 60,  # seconds in process memory; bounds how stale other workers can be
+    'SHARED_ALIAS': os.getenv('RECIPIENT_CACHE_ALIAS') or None,  # e.g. 'default' to share entries between workers
+    'SHARED_TTL': 3600,
+}
+
+# Background worker threads for AI preview jobs (0 runs jobs inline in the request)
+AI_PREVIEW_WORKERS = int(os.getenv('AI_PREVIEW_WORKERS', '4'))
 
 # Email Configuration for Password Reset
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development - prints emails to console